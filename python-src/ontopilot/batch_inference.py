@@ -0,0 +1,321 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a batch version of the inference pipeline that adds inferred axioms
+# to many data sets that share the same imported TBox.  The imports are only
+# loaded and classified once, and each data set is then reasoned over by the
+# same (buffering) reasoner, which only needs to process the changed ABox.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+from ontopilot import logger
+import oom_manager
+from ontology import Ontology
+from inferred_axiom_adder import InferredAxiomAdder
+from partitioned_inference import ABOX_INFERENCE_TYPES
+from reasoner_manager import hasNominals
+
+# Java imports.
+from java.io import File
+from java.util import HashSet
+from org.semanticweb.owlapi.model import AxiomType
+
+
+class BatchInferencePipeline:
+    """
+    Adds inferred axioms to a sequence of ontologies/data sets.  All data sets
+    are loaded by the same OWL API ontology manager, so imported ontologies
+    are only parsed once.  The axioms of the imports closure of a data set
+    (the shared TBox) are copied to a working ontology, and all inference
+    types other than ABox inferences (types and property values) are
+    generated once for the working ontology.  The axioms of each data set are
+    then added to the working ontology, the ontology is checked for
+    consistency, the ABox inferences are generated by a buffering reasoner
+    that is kept for all data sets, and the data set's axioms are removed
+    again.  A data set that contains its own TBox axioms or that uses
+    nominals (directly or in its imports closure) is processed separately, as
+    in the regular inference pipeline, because its ABox axioms might change
+    the TBox inferences.
+    """
+    def __init__(
+        self, reasoner_str, inference_types, annotate=False,
+        add_inverses=False
+    ):
+        """
+        reasoner_str: A string indicating the type of reasoner to use.
+        inference_types: A list of strings specifying the kinds of inferred
+            axioms to generate.  See InferredAxiomAdder.addInferredAxioms().
+        annotate (optional): If True, annotate inferred axioms to mark them as
+            inferred.
+        add_inverses (optional): If True, inverse property assertions will be
+            explicitly added to each data set prior to running the reasoner.
+        """
+        self.reasoner_str = reasoner_str
+        self.annotate = annotate
+        self.add_inverses = add_inverses
+
+        self.inference_types = inference_types
+        self.abox_types = [
+            inftype for inftype in inference_types
+            if inftype in ABOX_INFERENCE_TYPES
+        ]
+        self.tbox_types = [
+            inftype for inftype in inference_types
+            if inftype not in ABOX_INFERENCE_TYPES
+        ]
+
+        self.ontman = oom_manager.getNewOWLOntologyManager()
+
+        self.timeout = 0
+        self.max_memory = 0
+        self.etfpath = ''
+        self.cache = None
+
+        # The working ontology with the shared TBox, the key of the imports
+        # closure it was built from, the InferredAxiomAdder for the working
+        # ontology, and the inferred TBox axioms.
+        self.tboxont = None
+        self.tbox_key = None
+        self.iaa = None
+        self.tbox_inferred = HashSet()
+
+        # Maps imports closure keys to whether the imports closures use
+        # nominals.
+        self.imports_nominals = {}
+
+    def setReasonerLimits(self, timeout=0, max_memory=0):
+        """
+        Sets the limits for all reasoners.  See
+        ReasonerManager.setReasonerLimits().
+        """
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+    def setReasoningCache(self, cache):
+        """
+        Sets a cache for reasoning results.  The cache is only used for the
+        shared TBox, because the results for each data set are unlikely to be
+        reused.
+
+        cache: A ReasoningCache, or None to disable caching.
+        """
+        self.cache = cache
+
+    def loadExcludedTypes(self, etfpath):
+        """
+        Sets a tabular data file containing information about the classes to
+        exclude from inferred type/class assertions.  See
+        InferredAxiomAdder.loadExcludedTypes().
+
+        etfpath: The path of a tabular data file.
+        """
+        self.etfpath = etfpath
+
+    def _getAdder(self, ontology, buffering):
+        """
+        Returns a new InferredAxiomAdder for an ontology that uses the
+        settings of this BatchInferencePipeline.
+        """
+        ontology.getReasonerManager().setReasonerLimits(
+            self.timeout, self.max_memory
+        )
+
+        iaa = InferredAxiomAdder(ontology, self.reasoner_str, buffering)
+        if self.etfpath != '':
+            iaa.loadExcludedTypes(self.etfpath)
+
+        return iaa
+
+    def _hasTBoxAxioms(self, owlont):
+        """
+        Returns True if an OWL API ontology (not including its imports)
+        contains any logical axioms that are not ABox axioms.
+        """
+        for axiom in owlont.getAxioms():
+            if axiom.isLogicalAxiom() and not(
+                axiom.isOfType(AxiomType.ABoxAxiomTypes)
+            ):
+                return True
+
+        return False
+
+    def _usesNominals(self, owlont):
+        """
+        Returns True if any logical axiom in an OWL API ontology or its imports
+        closure contains a nominal.  With nominals, ABox axioms can entail
+        TBox axioms, so the TBox inferences cannot be shared.  The results for
+        each imports closure are cached.
+        """
+        for axiom in owlont.getAxioms():
+            if axiom.isLogicalAxiom() and hasNominals(axiom):
+                return True
+
+        imports_key = self._getImportsKey(owlont)
+        if imports_key not in self.imports_nominals:
+            self.imports_nominals[imports_key] = any(
+                axiom.isLogicalAxiom() and hasNominals(axiom)
+                for importont in owlont.getImports()
+                for axiom in importont.getAxioms()
+            )
+
+        return self.imports_nominals[imports_key]
+
+    def _getImportsKey(self, owlont):
+        """
+        Returns a key that identifies the imports closure of an OWL API
+        ontology, not including the ontology itself.
+        """
+        return frozenset([
+            importont.getOntologyID().toString()
+            for importont in owlont.getImports()
+        ])
+
+    def _prepareTBox(self, owlont):
+        """
+        Makes sure that the working ontology contains the shared TBox for an
+        OWL API ontology.  If the working ontology was built for a different
+        imports closure, it is replaced, and the TBox inferences are generated
+        for the new working ontology.
+        """
+        tbox_key = self._getImportsKey(owlont)
+        if self.tboxont is not None and tbox_key == self.tbox_key:
+            return
+
+        self.dispose()
+
+        logger.info('Classifying the shared TBox of the data sets...')
+        self.tboxont = Ontology(self.ontman.createOntology())
+        self.tbox_key = tbox_key
+
+        workont = self.tboxont.getOWLOntology()
+        for importont in owlont.getImports():
+            self.ontman.addAxioms(workont, importont.getAxioms())
+        oldaxioms = workont.getAxioms()
+
+        self.iaa = self._getAdder(self.tboxont, True)
+
+        if len(self.tbox_types) > 0:
+            self.iaa.setReasoningCache(self.cache)
+            try:
+                self.iaa.addInferredAxioms(self.tbox_types, self.annotate)
+            finally:
+                self.iaa.setReasoningCache(None)
+
+        self.tbox_inferred = HashSet(workont.getAxioms())
+        self.tbox_inferred.removeAll(oldaxioms)
+
+    def _processStandalone(self, ontology, reason):
+        """
+        Adds inferred axioms to an ontology without using the shared TBox.
+
+        ontology: The Ontology to process.
+        reason: A string that explains why the shared TBox cannot be used.
+        """
+        logger.info(
+            'The data set {0}, so it cannot share the classified TBox; '
+            'reasoning over the data set separately.'.format(reason)
+        )
+
+        iaa = self._getAdder(ontology, False)
+        try:
+            iaa.addInferredAxioms(
+                self.inference_types, self.annotate, self.add_inverses
+            )
+        finally:
+            iaa.dispose()
+            ontology.getReasonerManager().disposeReasoners()
+
+    def _processWithTBox(self, ontology):
+        """
+        Adds inferred axioms to an ontology that only contains ABox axioms by
+        reasoning over the ontology's axioms together with the shared TBox.
+        """
+        owlont = ontology.getOWLOntology()
+        self._prepareTBox(owlont)
+
+        inferred = HashSet(self.tbox_inferred)
+
+        workont = self.tboxont.getOWLOntology()
+        oldaxioms = workont.getAxioms()
+
+        self.ontman.addAxioms(workont, owlont.getAxioms())
+        self.tboxont.getReasonerManager().flushReasoners()
+
+        # Even if no ABox inferences are requested, this checks that the data
+        # set is consistent with the shared TBox (and adds inverse property
+        # assertions, if requested).
+        try:
+            self.iaa.addInferredAxioms(
+                self.abox_types, self.annotate, self.add_inverses
+            )
+        finally:
+            # Restore the shared TBox.  The buffering reasoner processes these
+            # changes together with the next data set.
+            newaxioms = workont.getAxioms()
+            added = HashSet(newaxioms)
+            added.removeAll(oldaxioms)
+            removed = HashSet(oldaxioms)
+            removed.removeAll(newaxioms)
+
+            self.ontman.removeAxioms(workont, added)
+            self.ontman.addAxioms(workont, removed)
+
+        inferred.addAll(added)
+
+        self.ontman.addAxioms(owlont, inferred)
+
+    def processOntology(self, inpath, outpath, format_str='RDF/XML'):
+        """
+        Loads an ontology/data set from a file, adds inferred axioms to it,
+        and writes the results to an output file.
+
+        inpath: The path of the source ontology/data set.
+        outpath: The path of the output file.
+        format_str: The format to use for the output file.
+        """
+        owlont = self.ontman.loadOntologyFromOntologyDocument(File(inpath))
+
+        try:
+            ontology = Ontology(owlont)
+            if self._hasTBoxAxioms(owlont):
+                self._processStandalone(ontology, 'contains TBox axioms')
+            elif self._usesNominals(owlont):
+                self._processStandalone(ontology, 'uses nominals')
+            else:
+                self._processWithTBox(ontology)
+
+            ontology.saveOntology(outpath, format_str)
+        finally:
+            # Only keep the shared imports in memory.
+            self.ontman.removeOntology(owlont)
+
+    def dispose(self):
+        """
+        Releases the working ontology and its reasoner.  This should be called
+        after the last data set is processed.
+        """
+        if self.iaa is not None:
+            self.iaa.dispose()
+
+        if self.tboxont is not None:
+            self.tboxont.getReasonerManager().disposeReasoners()
+            self.ontman.removeOntology(self.tboxont.getOWLOntology())
+
+        self.tboxont = None
+        self.tbox_key = None
+        self.iaa = None
+        self.tbox_inferred = HashSet()
@@ -32,6 +32,7 @@ from contextlib import contextmanager
 import tempfile
 from zipfile import ZipFile
 from ontoconfig import OntoConfig
+import oom_manager
 
 # Java imports.
 
@@ -52,6 +53,20 @@ class BuildTarget:
         # targets on which this target depends.
         self.products = {}
 
+        # A dictionary that maps each product name key to the build target
+        # instance that generated the product.  This allows the same product
+        # to reach a target through more than one dependency path (e.g., if
+        # two dependencies share a common dependency) without being mistaken
+        # for a product name collision.
+        self.product_sources = {}
+
+        # Flags that track whether this target has been run during the current
+        # build session and whether its build task was actually executed.
+        # These allow a target that is shared by several dependent targets (or
+        # by several build tasks) to be run only once per session.
+        self.has_run = False
+        self.was_built = False
+
         # Define default error messages for directory creation errors.
         self.bad_dirpath_msg = (
             'A file with the same name as the build target folder, "{0}", '
@@ -141,14 +156,55 @@ class BuildTarget:
         """
         self.dependencies.append(target)
 
+    def replaceDependency(self, oldtarget, newtarget):
+        """
+        Replaces one of this build target's dependencies with another build
+        target.  Any instance attributes that refer to the old dependency will
+        also be updated to refer to the new dependency.  This is used to merge
+        the dependency graphs of several build targets so that equivalent
+        targets are shared.
+
+        oldtarget: The dependency to replace.
+        newtarget: The replacement build target.
+        """
+        for index, dependency in enumerate(self.dependencies):
+            if dependency is oldtarget:
+                self.dependencies[index] = newtarget
+
+        for attrname, attrval in vars(self).items():
+            if attrval is oldtarget:
+                setattr(self, attrname, newtarget)
+
+    def getTargetKey(self):
+        """
+        Returns a hashable key that identifies the build operation performed by
+        this build target.  Two build targets with equal keys are assumed to be
+        interchangeable, which allows them to be merged into a single target
+        when several build tasks are run together.  The default implementation
+        returns None, which indicates that the target should never be merged
+        with any other target.  Child classes can override this method to
+        allow sharing.
+        """
+        return None
+
+    def hasRun(self):
+        """
+        Returns True if this build target has already been run during the
+        current build session.
+        """
+        return self.has_run
+
     def isBuildRequired(self):
         """
         Determines if the build task needs to be run.  Inspects the state of
         all dependencies as well as this build target.  If any dependencies
         require a build, than this method will automatically return True.
+        Likewise, if any dependencies were already built during the current
+        build session (e.g., because they are shared with another build task),
+        this method will return True.
         """
         for dependency in self.dependencies:
-            if dependency.isBuildRequired():
+            if dependency.was_built or dependency.isBuildRequired():
                 return True
 
         return self._isBuildRequired()
@@ -160,25 +216,42 @@ class BuildTarget:
         exceptions should be allowed to "bubble up" through the dependency
         chain so they can be properly handled by external client code.
 
+        Dependencies that have already been run during the current build
+        session (because they are shared with another target) are not run
+        again, but their build products are still used.
+
         force_build: If True, the build task (including all dependencies) will
             be run, even if all build products appear to be up to date.
         """
         # Invalidate any previous build products.
         self.products.clear()
+        self.product_sources.clear()
 
         dependencies_run = False
         for dependency in self.dependencies:
-            results = {}
-            if dependency.isBuildRequired() or force_build:
+            if dependency.has_run:
+                # The dependency is shared with another target and has already
+                # been run during this build session, so don't run it again.
+                # If it was actually built, though, this target must be
+                # rebuilt, too.
+                if dependency.was_built:
+                    dependencies_run = True
+            elif dependency.isBuildRequired() or force_build:
                 dependencies_run = True
-                results = dependency.run(force_build)
-
-            # Merge the results with the products dictionary, making sure we
-            # don't have any duplicate keys.
-            for key in results:
+                dependency.run(force_build)
+
+            # Merge the dependency's products with the products dictionary,
+            # making sure we don't have any duplicate keys.  Note that we do
+            # this even if the dependency was not run just now, because a
+            # dependency that is shared by more than one target might have
+            # already been run earlier in the build, and its products are
+            # still valid.
+            for key in dependency.products:
+                source = dependency.product_sources[key]
                 if key not in self.products:
-                    self.products[key] = results[key]
-                else:
+                    self.products[key] = dependency.products[key]
+                    self.product_sources[key] = source
+                elif self.product_sources[key] is not source:
                     raise RuntimeError(
                         'Unable to merge product returned from build target \
 {0} into the build products set for build target {1} because of a duplicate \
@@ -194,6 +267,7 @@ product name key: "{2}".'.format(
             results = self._run()
             if results is None:
                 results = {}
+            self.was_built = True
         else:
             results = {}
 
@@ -203,6 +277,7 @@ product name key: "{2}".'.format(
         for key in results:
             if key not in self.products:
                 self.products[key] = results[key]
+                self.product_sources[key] = self
             else:
                 raise RuntimeError(
                     'A build product from build target {0} could not be \
@@ -212,6 +287,8 @@ duplicates one of its dependency\'s product name keys: "{1}".'.format(
                     )
                 )
 
+        self.has_run = True
+
         return self.products
     
     def getBuildNotRequiredMsg(self):
@@ -236,7 +313,10 @@ duplicates one of its dependency\'s product name keys: "{1}".'.format(
         Runs the build task for this particular build target.  This method must
         be implemented by child classes.  When this method is invoked, all
         build targets on which this target depends will have already been run,
-        and the results will be in the dictionary self.products.  This method
+        and the results will be in the dictionary self.products.  Products are
+        typically live objects (e.g., Ontology instances) that might be shared
+        by several dependent targets, so targets that need to modify a
+        dependency's product should work on a copy of it.  This method
         should return a dictionary (which may be empty) of build products.
         Alternatively, the method can return None (or have no return statement)
         if no build products need to be passed up the dependency chain.
@@ -289,9 +369,33 @@ class BuildTargetWithConfig(BuildTarget):
                         'configuration file or path.'.format(cfilepath)
                     )
 
+        # If the project has an IRI catalog, make its mappings available to
+        # all ontology managers.
+        catalogpath = self.config.getIRICatalogFile()
+        if catalogpath != '':
+            try:
+                oom_manager.loadIRICatalog(catalogpath)
+            except oom_manager.CatalogError as err:
+                raise RuntimeError(unicode(err))
+
     def getConfig(self):
         """
         Returns the OntoConfig object associated with this build target.
         """
         return self.config
 
+    def getTargetKey(self):
+        """
+        Returns a hashable key that identifies the build operation performed by
+        this build target.  By default, targets of the same class that use the
+        same configuration file are considered interchangeable.  Child classes
+        whose behavior also depends on other arguments should extend the key.
+        """
+        cfilepath = self.config.getConfigFilePath()
+        if cfilepath is None:
+            # Without a configuration file, only targets that share the same
+            # OntoConfig object are equivalent.
+            cfilepath = id(self.config)
+
+        return (self.__class__, cfilepath)
+
@@ -22,6 +22,7 @@
 
 # Python imports.
 from __future__ import unicode_literals
+import copy
 from collections import namedtuple
 
 # Java imports.
@@ -310,3 +311,90 @@ class BuildTargetManager:
 
         return target
 
+    def _getSharedTarget(self, target, shared):
+        """
+        Returns the shared instance of a build target.  If no equivalent
+        target has been seen yet, the target becomes the shared instance.
+
+        target: A build target instance.
+        shared: A dictionary that maps target keys to shared target instances.
+        """
+        key = target.getTargetKey()
+        if key is None:
+            return target
+
+        if key not in shared:
+            shared[key] = target
+
+        return shared[key]
+
+    def _mergeTargetGraphs(self, targets):
+        """
+        Merges the dependency graphs of a list of build targets so that
+        equivalent targets (i.e., targets with equal target keys) are replaced
+        by a single, shared instance.  Returns a new list of top-level targets
+        with duplicates removed and the original order preserved.
+
+        targets: A list of build target instances.
+        """
+        shared = {}
+        merged = []
+        for target in targets:
+            shared_target = self._getSharedTarget(target, shared)
+            if not(any(shared_target is mtarget for mtarget in merged)):
+                merged.append(shared_target)
+
+        # Walk the dependency graphs, replacing equivalent dependencies with
+        # their shared instances.  Each target only needs to be visited once.
+        visited = set()
+        tstack = list(merged)
+        while len(tstack) > 0:
+            target = tstack.pop()
+            if id(target) in visited:
+                continue
+            visited.add(id(target))
+
+            for dependency in list(target.dependencies):
+                shared_dep = self._getSharedTarget(dependency, shared)
+                if shared_dep is not dependency:
+                    target.replaceDependency(dependency, shared_dep)
+                tstack.append(shared_dep)
+
+        return merged
+
+    def getBuildTargets(self, args, targetname_arg='', multiarg=''):
+        """
+        Returns a list of build target instances for a set of command-line
+        argument values in which one argument can have multiple values (e.g.,
+        "make imports ontology release").  A separate build target is matched
+        for each value of the multi-valued argument, and then the dependency
+        graphs of all matched targets are merged so that build targets that
+        are shared by more than one task (e.g., the compiled ontology) are
+        only instantiated, and therefore only run, once.  The targets are
+        returned in the order in which their argument values were provided,
+        with any duplicates removed.
+
+        args: A "struct" of command-line argument names and values.  Typically
+            obtained from ArgumentParser.
+        targetname_arg: The name of the argument that contains the main build
+            target/task name.  This is used only for generating useful error
+            messages.
+        multiarg: The name of the argument that can have multiple values.  The
+            argument value should be a list.  If multiarg is empty or the
+            argument value is not a list, this method behaves the same as
+            getBuildTarget(), except that the result is a list.
+        """
+        argvals = None
+        if multiarg != '':
+            argvals = getattr(args, multiarg, None)
+
+        if not(isinstance(argvals, list)):
+            return [self.getBuildTarget(args, targetname_arg)]
+
+        targets = []
+        for argval in argvals:
+            targetargs = copy.copy(args)
+            setattr(targetargs, multiarg, argval)
+            targets.append(self.getBuildTarget(targetargs, targetname_arg))
+
+        return self._mergeTargetGraphs(targets)
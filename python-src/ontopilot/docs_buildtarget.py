@@ -209,7 +209,14 @@ class DocsBuildTarget(BuildTargetWithConfig):
 
         logger.info('Creating ontology documentation files...')
 
-        ont = Ontology(self.mobt_reasoned.getOutputFilePath())
+        # Use the in-memory reasoned ontology if it was built as part of this
+        # build run.  Generating the documentation does not modify the
+        # ontology, so there is no need to make a copy.
+        ontpath = self.mobt_reasoned.getOutputFilePath()
+        if ontpath in self.products:
+            ont = self.products[ontpath]
+        else:
+            ont = Ontology(ontpath)
 
         # Create the documentation files.
         for foutinfo in fileoutinfos:
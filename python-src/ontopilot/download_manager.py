@@ -0,0 +1,490 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a class, DownloadManager, for downloading remote files (typically,
+# source ontologies) to local copies.  For HTTP and HTTPS resources, the
+# download manager supports resuming interrupted downloads with range requests
+# and revalidating local copies with conditional requests.  The information
+# needed for this (the ETag and Last-Modified values sent by the server) is
+# stored in a JSON "sidecar" metadata file next to each local copy.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+import os, sys
+import json
+import urlparse, httplib
+from urllib import FancyURLopener
+from urllib2 import HTTPError
+import socket
+import threading
+import Queue
+from ontopilot import logger
+
+# Java imports.
+
+
+# Policies for refreshing local copies of files that have already been
+# completely downloaded.
+#   never: Always use the existing local copy.
+#   check: Revalidate the local copy with the server using a conditional
+#       request and only download the file again if it has changed.
+#   always: Always download the file again.
+REFRESH_POLICIES = ('never', 'check', 'always')
+
+# File name suffixes for metadata files and incomplete downloads.
+METADATA_SUFFIX = '.metadata'
+PARTIAL_SUFFIX = '.part'
+
+# The maximum number of HTTP redirects to follow for a single request.
+MAX_REDIRECTS = 10
+
+# The size of the blocks, in bytes, to use when reading download data.
+BLOCKSIZE = 65536
+
+# HTTP status codes that indicate a redirect.
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class DownloadError(RuntimeError):
+    """
+    Represents errors that prevent a file from being downloaded.
+    """
+    pass
+
+
+class URLOpenerWithErrorHandling(FancyURLopener):
+    """
+    Extends FancyURLopener by adding better error handling for unrecoverable
+    HTTP errors (e.g., 404).
+    """
+    def http_error_default(self, url, fp, errcode, errmsg, headers):
+        raise HTTPError(url, errcode, errmsg, headers, fp)
+
+
+class DownloadManager:
+    """
+    Downloads remote files to local copies.  Each local file is only retrieved
+    once per DownloadManager instance, even if it is requested again or
+    requested concurrently by several threads, so a single instance should be
+    shared by all code that needs the same files during a build.  Whether
+    existing local copies are refreshed is determined by the refresh policy,
+    which must be one of the values in REFRESH_POLICIES.
+    """
+    def __init__(self, refresh_policy='never'):
+        """
+        refresh_policy (optional): The refresh policy for existing local
+            copies.
+        """
+        if refresh_policy not in REFRESH_POLICIES:
+            raise RuntimeError(
+                'Invalid source refresh policy: "{0}".  Supported values are: '
+                '{1}.'.format(
+                    refresh_policy, '"' + '", "'.join(REFRESH_POLICIES) + '"'
+                )
+            )
+
+        self.refresh_policy = refresh_policy
+
+        # A lock for each destination path, so that the same file is never
+        # downloaded by more than one thread at a time, and the set of
+        # destination paths that have already been retrieved.
+        self.lock = threading.Lock()
+        self.pathlocks = {}
+        self.retrieved = set()
+
+    def getRefreshPolicy(self):
+        """
+        Returns the refresh policy for existing local copies.
+        """
+        return self.refresh_policy
+
+    def _getPathLock(self, destpath):
+        with self.lock:
+            if destpath not in self.pathlocks:
+                self.pathlocks[destpath] = threading.Lock()
+
+            return self.pathlocks[destpath]
+
+    def readMetadata(self, destpath):
+        """
+        Returns the download metadata for a local file as a dictionary.  If
+        no metadata are available, or the metadata file cannot be read, an
+        empty dictionary is returned.
+
+        destpath: The path of the local file.
+        """
+        metapath = destpath + METADATA_SUFFIX
+        if not(os.path.isfile(metapath)):
+            return {}
+
+        try:
+            with open(metapath) as fin:
+                metadata = json.load(fin)
+        except (IOError, ValueError):
+            return {}
+
+        if not(isinstance(metadata, dict)):
+            return {}
+
+        return metadata
+
+    def _writeMetadata(self, destpath, metadata):
+        with open(destpath + METADATA_SUFFIX, 'w') as fout:
+            json.dump(metadata, fout, indent=2, sort_keys=True)
+
+    def isRetrieved(self, destpath):
+        """
+        Returns True if the local file has already been retrieved by this
+        DownloadManager.
+        """
+        with self.lock:
+            return destpath in self.retrieved
+
+    def retrieve(self, url, destpath, reporthook=None):
+        """
+        Makes sure that an up-to-date local copy of a remote file exists,
+        according to the refresh policy.  Returns True if the file was
+        downloaded, or False if the existing local copy was used.
+
+        url: The URL of the remote file.
+        destpath: The path of the local copy.
+        reporthook (optional): A function for reporting download progress.  It
+            is called with the same arguments as the reporthook of
+            urllib.urlretrieve(): the number of blocks transferred so far, the
+            block size, and the total file size (-1 if it is unknown).  If no
+            reporthook is provided, the start of the download is logged
+            instead.
+        """
+        with self._getPathLock(destpath):
+            if self.isRetrieved(destpath):
+                return False
+
+            downloaded = self._retrieve(url, destpath, reporthook)
+
+            with self.lock:
+                self.retrieved.add(destpath)
+
+        return downloaded
+
+    def retrieveAll(self, downloads, threadcnt):
+        """
+        Retrieves several remote files concurrently.  Download progress is not
+        reported, but the start of each download is logged.  If any downloads
+        fail, the first error is raised after all other downloads are
+        finished.  Returns a list of the destination paths of all files that
+        were downloaded.
+
+        downloads: A sequence of (url, destpath) tuples.
+        threadcnt: The maximum number of concurrent downloads.
+        """
+        jobqueue = Queue.Queue()
+        for download in downloads:
+            jobqueue.put(download)
+
+        downloaded = []
+        errors = []
+        workers = []
+        for cnt in range(max(1, min(threadcnt, len(downloads)))):
+            worker = threading.Thread(
+                target=self._retrieveWorker,
+                args=(jobqueue, downloaded, errors)
+            )
+            worker.start()
+            workers.append(worker)
+
+        for worker in workers:
+            worker.join()
+
+        if len(errors) > 0:
+            exc_type, exc_value, exc_tb = errors[0]
+            raise exc_type, exc_value, exc_tb
+
+        return downloaded
+
+    def _retrieveWorker(self, jobqueue, downloaded, errors):
+        """
+        The main function for download worker threads.
+        """
+        while True:
+            try:
+                url, destpath = jobqueue.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                if self.retrieve(url, destpath):
+                    downloaded.append(destpath)
+            except:
+                # Catch everything, including Java exceptions, so that the
+                # error can be reported by the main thread.
+                errors.append(sys.exc_info())
+
+    def _retrieve(self, url, destpath, reporthook):
+        """
+        Implements retrieve() without any synchronization.
+        """
+        exists = os.path.isfile(destpath)
+        if exists and self.refresh_policy == 'never':
+            return False
+
+        if reporthook is None:
+            reporthook = self._getDownloadLogger(url)
+
+        scheme = urlparse.urlsplit(url).scheme.lower()
+        if scheme in ('http', 'https'):
+            return self._retrieveHTTP(url, destpath, reporthook, exists)
+        else:
+            # For other kinds of URLs (e.g., "file:" or "ftp:" URLs), there is
+            # no way to revalidate an existing local copy.
+            if exists and self.refresh_policy == 'check':
+                return False
+
+            self._retrieveGeneric(url, destpath, reporthook)
+            return True
+
+    def _getDownloadLogger(self, url):
+        """
+        Returns a progress function that only logs the start of a download.
+        """
+        def logDownloadStart(blocks_transferred, blocksize, filesize):
+            if blocks_transferred == 0:
+                logger.info('Downloading ' + url)
+
+        return logDownloadStart
+
+    def _retrieveGeneric(self, url, destpath, reporthook):
+        """
+        Downloads a file from a non-HTTP(S) URL.
+        """
+        partpath = destpath + PARTIAL_SUFFIX
+        opener = URLOpenerWithErrorHandling()
+        try:
+            opener.retrieve(url, partpath, reporthook)
+        except (IOError, HTTPError) as err:
+            raise DownloadError(
+                'Unable to download the file at <{0}>: {1}'.format(
+                    url, unicode(err)
+                )
+            )
+
+        self._replaceFile(partpath, destpath)
+        self._writeMetadata(destpath, {'url': url})
+
+    def _openURL(self, url, headers):
+        """
+        Sends an HTTP GET request and returns the open connection, the
+        response, and the final URL.  Redirects are followed.
+        """
+        for cnt in range(MAX_REDIRECTS + 1):
+            parts = urlparse.urlsplit(url)
+
+            # Reconstruct the portion of the URL that comes after the scheme
+            # and host string.
+            location_part = urlparse.urlunsplit(('', '') + parts[2:5])
+            if location_part == '':
+                location_part = '/'
+
+            try:
+                if parts.scheme.lower() == 'https':
+                    conn = httplib.HTTPSConnection(parts.netloc)
+                else:
+                    conn = httplib.HTTPConnection(parts.netloc)
+
+                conn.request('GET', location_part, headers=headers)
+                response = conn.getresponse()
+            except (socket.error, httplib.HTTPException) as err:
+                raise DownloadError(
+                    'Unable to download the file at <{0}> due to a '
+                    'connection error: {1}.'.format(url, unicode(err))
+                )
+
+            location = response.getheader('location')
+            if response.status in REDIRECT_STATUSES and location is not None:
+                response.read()
+                conn.close()
+                url = urlparse.urljoin(url, location)
+            else:
+                return (conn, response, url)
+
+        raise DownloadError(
+            'Unable to download the file at <{0}> because the server '
+            'returned too many redirects.'.format(url)
+        )
+
+    def _getResumeOffset(self, partpath, metadata):
+        """
+        Returns the number of bytes of an incomplete download that can be
+        resumed, or 0 if the download cannot be resumed.  Resuming requires
+        a validator (an ETag or Last-Modified value) from the original
+        response so that the server can tell whether the remote file changed.
+        """
+        partial = metadata.get('partial', {})
+        if not(os.path.isfile(partpath)) or len(partial) == 0:
+            return 0
+
+        return os.path.getsize(partpath)
+
+    def _getRangeValidator(self, partial):
+        """
+        Returns a validator for an If-Range header.  Weak ETags cannot be
+        used with range requests, so the Last-Modified value is used instead
+        in that case.
+        """
+        etag = partial.get('etag', '')
+        if etag != '' and not(etag.startswith('W/')):
+            return etag
+
+        return partial.get('last_modified', '')
+
+    def _retrieveHTTP(self, url, destpath, reporthook, exists):
+        """
+        Downloads a file from an HTTP or HTTPS URL.  Incomplete downloads are
+        resumed, if possible, and an existing local copy is revalidated with a
+        conditional request if the refresh policy is "check".
+        """
+        metadata = self.readMetadata(destpath)
+        partpath = destpath + PARTIAL_SUFFIX
+
+        headers = {}
+        offset = self._getResumeOffset(partpath, metadata)
+        if offset > 0:
+            validator = self._getRangeValidator(metadata['partial'])
+            if validator != '':
+                headers['Range'] = 'bytes={0}-'.format(offset)
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+        elif exists and self.refresh_policy == 'check':
+            if metadata.get('etag', '') != '':
+                headers['If-None-Match'] = metadata['etag']
+            if metadata.get('last_modified', '') != '':
+                headers['If-Modified-Since'] = metadata['last_modified']
+
+        conn, response, finalurl = self._openURL(url, headers)
+        try:
+            if response.status == 304 and 'Range' not in headers:
+                logger.info(
+                    'The local copy of <{0}> is up to date.'.format(url)
+                )
+                return False
+
+            if response.status == 416:
+                # The server could not satisfy the range request, so the
+                # incomplete file is not usable.  Start over.
+                response.read()
+                conn.close()
+                os.remove(partpath)
+                metadata.pop('partial', None)
+                self._writeMetadata(destpath, metadata)
+                return self._retrieveHTTP(url, destpath, reporthook, exists)
+
+            if response.status not in (200, 206):
+                raise DownloadError(
+                    'Unable to download the file at <{0}>: the server '
+                    'returned HTTP status {1} ({2}).'.format(
+                        url, response.status, response.reason
+                    )
+                )
+
+            if response.status == 206:
+                # Make sure that the server is actually resuming the download
+                # at the right location.
+                crange = response.getheader('content-range', '')
+                if not(crange.startswith('bytes {0}-'.format(offset))):
+                    raise DownloadError(
+                        'Unable to resume the download of <{0}>: the server '
+                        'returned an unexpected content range ("{1}").'.format(
+                            url, crange
+                        )
+                    )
+                filemode = 'ab'
+            else:
+                offset = 0
+                filemode = 'wb'
+
+            # Record the validators for the incomplete download before
+            # transferring any data so that the download can be resumed if it
+            # is interrupted.
+            metadata['partial'] = {
+                'etag': response.getheader('etag', ''),
+                'last_modified': response.getheader('last-modified', '')
+            }
+            self._writeMetadata(destpath, metadata)
+
+            self._transferData(
+                url, response, partpath, filemode, offset, reporthook
+            )
+        finally:
+            conn.close()
+
+        self._replaceFile(partpath, destpath)
+
+        partial = metadata.pop('partial')
+        metadata['url'] = url
+        metadata['final_url'] = finalurl
+        metadata['etag'] = partial['etag']
+        metadata['last_modified'] = partial['last_modified']
+        self._writeMetadata(destpath, metadata)
+
+        return True
+
+    def _transferData(
+        self, url, response, partpath, filemode, offset, reporthook
+    ):
+        """
+        Writes the body of an HTTP response to a file.
+        """
+        length = response.getheader('content-length', '')
+        try:
+            totalsize = int(length) + offset
+        except ValueError:
+            totalsize = -1
+
+        blocknum = offset // BLOCKSIZE
+        if reporthook is not None:
+            reporthook(0, BLOCKSIZE, totalsize)
+
+        try:
+            with open(partpath, filemode) as fout:
+                data = response.read(BLOCKSIZE)
+                while len(data) > 0:
+                    fout.write(data)
+                    blocknum += 1
+                    if reporthook is not None:
+                        reporthook(blocknum, BLOCKSIZE, totalsize)
+                    data = response.read(BLOCKSIZE)
+        except (socket.error, httplib.HTTPException) as err:
+            raise DownloadError(
+                'The download of <{0}> was interrupted ({1}).  Run the build '
+                'again to resume the download.'.format(url, unicode(err))
+            )
+
+        if totalsize >= 0 and os.path.getsize(partpath) < totalsize:
+            raise DownloadError(
+                'The download of <{0}> is incomplete.  Run the build again '
+                'to resume the download.'.format(url)
+            )
+
+    def _replaceFile(self, srcpath, destpath):
+        """
+        Moves a completed download to its final location, replacing any
+        previous version of the file.
+        """
+        if os.path.exists(destpath):
+            os.remove(destpath)
+        os.rename(srcpath, destpath)
+
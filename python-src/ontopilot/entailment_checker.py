@@ -0,0 +1,321 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a two-tiered check for entailment errors (inconsistency and
+# unsatisfiable classes).  The fast ELK reasoner is first run on the OWL 2 EL
+# axioms of an ontology, and a complete DL reasoner is then only run on a
+# syntactic locality module for the classes whose satisfiability might depend
+# on the remaining axioms.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+import time
+from ontopilot import logger
+from reasoner_manager import getReasonerFactory, REASONER_NAMES
+from reasoner_manager import getELKUnsupportedAxioms
+from reasoner_manager import REASONER_LIMIT_EXCEPTIONS
+
+# Java imports.
+from java.util import HashSet
+from org.semanticweb.owlapi.apibinding import OWLManager
+from org.semanticweb.owlapi.model import AxiomType
+from org.semanticweb.owlapi.model.parameters import Imports
+from org.semanticweb.owlapi.profiles import OWL2ELProfile
+from org.semanticweb.owlapi.profiles.violations import UseOfUndeclaredClass
+from org.semanticweb.owlapi.profiles.violations import (
+    UseOfUndeclaredObjectProperty, UseOfUndeclaredDataProperty,
+    UseOfUndeclaredAnnotationProperty, UseOfUndeclaredDatatype
+)
+from uk.ac.manchester.cs.owlapi.modularity import SyntacticLocalityModuleExtractor
+from uk.ac.manchester.cs.owlapi.modularity import ModuleType
+
+
+# Profile violations that do not matter to ELK.
+IGNORED_VIOLATIONS = (
+    UseOfUndeclaredClass, UseOfUndeclaredObjectProperty,
+    UseOfUndeclaredDataProperty, UseOfUndeclaredAnnotationProperty,
+    UseOfUndeclaredDatatype
+)
+
+# Axiom types for which a bottom-locality module can only include an axiom if
+# the axiom's "trigger" entity (a named subclass or subproperty, or the
+# property of a domain or range axiom) is in the module's signature.
+SUB_AXIOM_TYPES = (
+    AxiomType.SUBCLASS_OF, AxiomType.SUB_OBJECT_PROPERTY,
+    AxiomType.SUB_DATA_PROPERTY
+)
+PROPERTY_AXIOM_TYPES = (
+    AxiomType.OBJECT_PROPERTY_DOMAIN, AxiomType.OBJECT_PROPERTY_RANGE,
+    AxiomType.DATA_PROPERTY_DOMAIN, AxiomType.DATA_PROPERTY_RANGE
+)
+
+
+class TieredEntailmentChecker:
+    """
+    Checks an ontology and its imports closure for entailment errors in two
+    tiers.  First, ELK is run on all axioms that are in the OWL 2 EL profile.
+    Any class that is unsatisfiable for these axioms is also unsatisfiable
+    for the full ontology, and if these axioms are inconsistent, so is the
+    full ontology.  Next, the axioms that are not in OWL 2 EL are used to
+    identify all classes whose bottom-locality module might include any of
+    those axioms.  The satisfiability of every other class is already decided
+    by ELK, so the DL reasoner is only run on the bottom-locality module for
+    the remaining classes, which also preserves the consistency of the
+    ontology.  If the module contains most of the ontology, the DL reasoner is
+    run on the full imports closure instead.  The results are the same as
+    running the DL reasoner on the full ontology.
+    """
+    # If a module for the DL reasoner contains more than this fraction of the
+    # logical axioms in the imports closure, the full ontology is used.
+    MAX_MODULE_FRACTION = 0.9
+
+    def __init__(self, ontology, reasoner_str='HermiT'):
+        """
+        ontology: The Ontology to check.
+        reasoner_str: The name of the DL reasoner for the second tier.
+        """
+        self.ontology = ontology
+        self.reasoner_str = reasoner_str.lower().strip()
+
+    def _partitionAxioms(self):
+        """
+        Returns a tuple containing Java sets of all logical axioms in the
+        imports closure and of the logical axioms that ELK cannot reason with
+        completely: the axioms that are not in OWL 2 EL and the OWL 2 EL axioms
+        that use features ELK does not support.
+        """
+        owlont = self.ontology.getOWLOntology()
+
+        axioms = HashSet()
+        for axiom in owlont.getAxioms(Imports.INCLUDED):
+            if axiom.isLogicalAxiom():
+                axioms.add(axiom)
+
+        nonel_axioms = HashSet()
+        report = OWL2ELProfile().checkOntology(owlont)
+        for violation in report.getViolations():
+            if isinstance(violation, IGNORED_VIOLATIONS):
+                continue
+
+            axiom = violation.getAxiom()
+            if axiom is not None and axiom.isLogicalAxiom():
+                nonel_axioms.add(axiom)
+
+        nonel_axioms.addAll(getELKUnsupportedAxioms(owlont))
+
+        return (axioms, nonel_axioms)
+
+    def _getTriggerEntities(self, axiom):
+        """
+        Returns the entities of an axiom at least one of which must be in a
+        signature for the axiom to be included in the signature's
+        bottom-locality module (assuming the axiom is not in the module for
+        the empty signature).  This is a superset of the entities that are
+        actually required, so it is safe to use for excluding axioms.
+        """
+        axiomtype = axiom.getAxiomType()
+
+        entity = None
+        if axiomtype in SUB_AXIOM_TYPES:
+            if axiomtype == AxiomType.SUBCLASS_OF:
+                subexp = axiom.getSubClass()
+            else:
+                subexp = axiom.getSubProperty()
+            if not(subexp.isAnonymous()):
+                entity = subexp.getSignature().iterator().next()
+        elif axiomtype in PROPERTY_AXIOM_TYPES:
+            propexp = axiom.getProperty()
+            if not(propexp.isAnonymous()):
+                entity = propexp.getSignature().iterator().next()
+
+        if entity is not None:
+            return [entity]
+        else:
+            return self._getSignature(axiom)
+
+    def _getSignature(self, axiom):
+        """
+        Returns a list of the entities in an axiom's signature, excluding
+        built-in entities, which are never replaced when checking locality.
+        """
+        return [
+            entity for entity in axiom.getSignature()
+            if not(entity.isBuiltIn())
+        ]
+
+    def _getTaintedEntities(self, axioms, nonel_axioms):
+        """
+        Returns the set of entities that, if they are in a signature, might
+        cause any of the axioms that are not in OWL 2 EL to be included in the
+        signature's bottom-locality module.  Module extraction repeatedly adds
+        the entities of included axioms to the signature, so an entity is
+        "tainted" if it triggers a non-EL axiom or triggers an axiom that
+        contains another tainted entity.
+
+        axioms: All logical axioms in the imports closure.
+        nonel_axioms: The axioms that are not in OWL 2 EL.
+        """
+        # Index the axioms by the entities in their signatures.
+        axioms_by_entity = {}
+        for axiom in axioms:
+            for entity in self._getSignature(axiom):
+                axioms_by_entity.setdefault(entity, []).append(axiom)
+
+        tainted = set()
+        queue = []
+        for axiom in nonel_axioms:
+            for entity in self._getTriggerEntities(axiom):
+                if entity not in tainted:
+                    tainted.add(entity)
+                    queue.append(entity)
+
+        while len(queue) > 0:
+            entity = queue.pop()
+            for axiom in axioms_by_entity.get(entity, ()):
+                for trigger in self._getTriggerEntities(axiom):
+                    if trigger not in tainted:
+                        tainted.add(trigger)
+                        queue.append(trigger)
+
+        return tainted
+
+    def _runReasoner(self, reasoner_name, axioms):
+        """
+        Runs a reasoner on a new ontology that contains a set of axioms and
+        returns an entailment check report for the ontology.  See
+        Ontology.checkEntailmentErrors().
+
+        reasoner_name: The name of the reasoner to use.
+        axioms: A Java collection of OWL API axioms.
+        """
+        # Use a separate ontology manager so that the temporary ontology does
+        # not interfere with any other ontologies.
+        oom = OWLManager.createOWLOntologyManager()
+        tmpont = oom.createOntology(HashSet(axioms))
+        rman = self.ontology.getReasonerManager()
+        config = rman.getReasonerConfiguration(reasoner_name)
+        reasoner = getReasonerFactory(reasoner_name).createNonBufferingReasoner(
+            tmpont, config
+        )
+        config.getProgressMonitor().setReasoner(reasoner)
+
+        try:
+            report = {
+                'is_consistent': reasoner.isConsistent(),
+                'unsatisfiable_classes': []
+            }
+
+            if report['is_consistent']:
+                owlnothing = self.ontology.df.getOWLNothing()
+                unsatisfiables = reasoner.getUnsatisfiableClasses().getEntities()
+                for unsatisfiable in unsatisfiables:
+                    if not(unsatisfiable.equals(owlnothing)):
+                        report['unsatisfiable_classes'].append(unsatisfiable)
+        except REASONER_LIMIT_EXCEPTIONS as err:
+            # Explain the error while the reasoner's progress monitor is still
+            # available.
+            raise rman.getLimitError(err, reasoner)
+        finally:
+            rman.disposeReasoner(reasoner)
+
+        return report
+
+    def checkEntailmentErrors(self):
+        """
+        Checks for entailment errors and returns a report object in the same
+        format as Ontology.checkEntailmentErrors().
+        """
+        axioms, nonel_axioms = self._partitionAxioms()
+        el_axioms = HashSet(axioms)
+        el_axioms.removeAll(nonel_axioms)
+
+        # Tier 1: run ELK on the OWL 2 EL axioms.
+        starttime = time.time()
+        el_report = self._runReasoner('elk', el_axioms)
+        logger.info(
+            'Checked {0} OWL 2 EL axioms with ELK in {1:.3g} s; {2} axioms '
+            'are not in OWL 2 EL.'.format(
+                el_axioms.size(), time.time() - starttime, nonel_axioms.size()
+            )
+        )
+
+        if not(el_report['is_consistent']) or nonel_axioms.isEmpty():
+            return el_report
+
+        # Find the classes whose satisfiability was not decided by ELK.
+        unsatisfiables = set(el_report['unsatisfiable_classes'])
+        tainted = self._getTaintedEntities(axioms, nonel_axioms)
+
+        slme = SyntacticLocalityModuleExtractor(
+            self.ontology.ontman, self.ontology.getOWLOntology(), axioms,
+            ModuleType.BOT
+        )
+
+        # The module for the empty signature is included in every module, and
+        # it determines the consistency of the ontology.  If it might include
+        # any non-EL axioms, every class must be checked.
+        basemodule = slme.extract(HashSet())
+        global_taint = False
+        for axiom in basemodule:
+            if nonel_axioms.contains(axiom) or any(
+                entity in tainted for entity in self._getSignature(axiom)
+            ):
+                global_taint = True
+                break
+
+        signature = HashSet()
+        for owlclass in self.ontology.getOWLOntology().getClassesInSignature(
+            Imports.INCLUDED
+        ):
+            if owlclass in unsatisfiables or owlclass.isBuiltIn():
+                continue
+            if global_taint or owlclass in tainted:
+                signature.add(owlclass)
+
+        if signature.isEmpty() and not(global_taint):
+            return el_report
+
+        # Tier 2: run the DL reasoner on the module for the undecided classes.
+        module = slme.extract(signature)
+        if module.size() > self.MAX_MODULE_FRACTION * axioms.size():
+            logger.info(
+                'The module for the {0} classes that might be affected by '
+                'non-EL axioms contains most of the ontology; checking the '
+                'full ontology with {1}.'.format(
+                    signature.size(), REASONER_NAMES[self.reasoner_str]
+                )
+            )
+            return self.ontology._checkEntailmentErrors(self.reasoner_str)
+
+        starttime = time.time()
+        dl_report = self._runReasoner(self.reasoner_str, module)
+        logger.info(
+            'Checked a module of {0} axioms for {1} classes with {2} in {3:.3g} '
+            's.'.format(
+                module.size(), signature.size(),
+                REASONER_NAMES[self.reasoner_str], time.time() - starttime
+            )
+        )
+
+        if not(dl_report['is_consistent']):
+            return dl_report
+
+        for owlclass in dl_report['unsatisfiable_classes']:
+            if signature.contains(owlclass):
+                el_report['unsatisfiable_classes'].append(owlclass)
+
+        return el_report
@@ -21,6 +21,7 @@ from ontology import Ontology
 from buildtarget import BuildTargetWithConfig
 from onto_buildtarget import OntoBuildTarget
 from basictimer import BasicTimer
+from reasoning_cache import getProjectReasoningCache
 
 # Java imports.
 
@@ -55,13 +56,26 @@ class ErrorCheckBuildTarget(BuildTargetWithConfig):
         """
         Checks for entailment errors in the main ontology.
         """
-        mainont = Ontology(self.obt.getOutputFilePath())
+        # Use the in-memory compiled ontology if it was built as part of this
+        # build run.  Checking for entailment errors does not modify the
+        # ontology, so there is no need to make a copy.
+        ontpath = self.obt.getOutputFilePath()
+        if ontpath in self.products:
+            mainont = self.products[ontpath]
+        else:
+            mainont = Ontology(ontpath)
         timer = BasicTimer()
 
+        mainont.getReasonerManager().setReasonerLimits(
+            self.config.getReasonerTimeout(), self.config.getReasonerMaxMemory()
+        )
+
         logger.info('Checking for entailment errors...')
         timer.start()
         entcheck_res = mainont.checkEntailmentErrors(
-            self.config.getReasonerStr()
+            self.config.getReasonerStr(),
+            getProjectReasoningCache(self.config),
+            tiered=self.config.getTieredEntailmentCheck()
         )
         logger.info(
             'Logical error check completed in {0} s'.format(timer.stop())
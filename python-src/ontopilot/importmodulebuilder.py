@@ -22,20 +22,22 @@
 # Python imports.
 from __future__ import unicode_literals
 import os
-from urllib import FancyURLopener
-from urllib2 import HTTPError
 import urllib, urlparse
 import math
+import time
+import json
 from progressbar import ProgressBar, Percentage, Bar, ETA
 from rfc3987 import rfc3987
 from ontopilot import logger
 import oom_manager
+from download_manager import DownloadManager, DownloadError
 from tablereaderfactory import TableReaderFactory
 from tablereader import TableRowError
 import ontopilot
 from ontopilot import TRUE_STRS
 from ontology import Ontology
-from ontopilot.module_extractor import ModuleExtractor
+from ontopilot.module_extractor import ModuleExtractor, RelationshipIndex
+from ontopilot.module_extractor import LocalityModuleExtractor
 from ontopilot.module_extractor import methods as me_methods, rel_axiom_types
 
 # Java imports.
@@ -45,6 +47,15 @@ from org.semanticweb.owlapi.model import OWLObjectPropertyExpression
 from org.semanticweb.owlapi.model import OWLObjectProperty, OWLDataProperty
 
 
+# The suffix for the files that record the state of import module builds.
+MODULE_STATE_SUFFIX = '.state'
+
+# Import module build strategies.  See ImportModuleBuilder._getBuildStrategy().
+FULL_BUILD = 'full'
+INCREMENTAL_BUILD = 'incremental'
+UNCHANGED_BUILD = 'unchanged'
+
+
 class ImportModSpecError(TableRowError):
     """
     An exception class for errors encountered in import module specifications
@@ -61,15 +72,6 @@ class ImportModSpecError(TableRowError):
         RuntimeError.__init__(self, new_msg)
 
 
-class URLOpenerWithErrorHandling(FancyURLopener):
-    """
-    Extends FancyURLopener by adding better error handling for unrecoverable
-    HTTP errors (e.g., 404).
-    """
-    def http_error_default(self, url, fp, errcode, errmsg, headers):
-        raise HTTPError(url, errcode, errmsg, headers, fp)
-
-
 class ImportModuleBuilder:
     """
     Builds import modules using terms from an external ontology.  The argument
@@ -87,7 +89,10 @@ class ImportModuleBuilder:
     # Default values for input table columns.
     DEFAULT_COL_VALS = {'Method': 'Locality'}
 
-    def __init__(self, base_IRI, module_suffix, builddir, outputdir=''):
+    def __init__(
+        self, base_IRI, module_suffix, builddir, outputdir='',
+        refresh_policy='never'
+    ):
         """
         ImportModuleBuilder constructor.
 
@@ -96,9 +101,13 @@ class ImportModuleBuilder:
         builddir: The build directory to use.
         outputdir: The directory in which to save the import module OWL files,
             if different from builddir.
+        refresh_policy: The policy for refreshing previously downloaded
+            source ontologies.  Must be one of the values in
+            download_manager.REFRESH_POLICIES.
         """
         self.progbar = None
         self.sourceOntologyIRI = ''
+        self.show_progress = True
 
         self.base_IRI = base_IRI
         self.mod_suffix = module_suffix
@@ -116,6 +125,9 @@ class ImportModuleBuilder:
         # Generate the directory name for local copies of source ontologies.
         self.ontcachedir = os.path.join(builddir, 'source_ontologies')
 
+        # The download manager for retrieving source ontologies.
+        self.downloader = DownloadManager(refresh_policy)
+
     def _checkOutputDirs(self):
         """
         Verifies that the output directory and ontology cache directory both
@@ -126,10 +138,16 @@ class ImportModuleBuilder:
         if not(os.path.isdir(self.builddir)):
             raise RuntimeError('The build directory could not be found: {0}.'.format(self.outputdir))
 
-        # Check the downloaded ontologies cache directory.
+        # Check the downloaded ontologies cache directory.  Several modules
+        # might be built concurrently, so another thread could create the
+        # directory between the existence check and the call to mkdir().
         if not(os.path.isdir(self.ontcachedir)):
             if not(os.path.exists(self.ontcachedir)):
-                os.mkdir(self.ontcachedir)
+                try:
+                    os.mkdir(self.ontcachedir)
+                except OSError:
+                    if not(os.path.isdir(self.ontcachedir)):
+                        raise
             else:
                 raise RuntimeError(
                     'A file with the name of the ontology cache directory '
@@ -144,6 +162,17 @@ class ImportModuleBuilder:
                     'The output directory could not be found: {0}.'.format(self.outputdir)
                 )
 
+    def setShowDownloadProgress(self, show_progress):
+        """
+        Sets whether to display a console progress bar when downloading source
+        ontologies.  Progress bars should be disabled when several modules are
+        built concurrently, because the progress bars would overwrite each
+        other.
+
+        show_progress (bool): Whether to display download progress bars.
+        """
+        self.show_progress = show_progress
+
     def _updateDownloadProgress(self, blocks_transferred, blocksize, filesize):
         """
         Instantiates and updates a console-based progress bar to indicate
@@ -164,36 +193,48 @@ class ImportModuleBuilder:
                 self.progbar.finish()
                 print
 
-    def _getOutputFileName(self, ontologyIRI):
+    def _getOutputFileName(self, ontologyIRI, name_qualifier=''):
         """
         Constructs the file name for the output import module file.
+
+        ontologyIRI: The IRI of the source ontology.
+        name_qualifier (optional): A string to add to the module file name.
+            This is needed to distinguish the modules if more than one module
+            is built from the same source ontology.
         """
         # Extract the name of the source ontology file from the IRI.
         ontfile = os.path.basename(ontologyIRI)
 
         # Generate the file name for the ouput ontology OWL file.
-        outputfile = os.path.splitext(ontfile)[0] + self.mod_suffix
+        outputfile = os.path.splitext(ontfile)[0]
+        if name_qualifier != '':
+            outputfile += '_' + name_qualifier
+        outputfile += self.mod_suffix
 
         return outputfile
 
-    def getModulePath(self, ontologyIRI):
+    def getModulePath(self, ontologyIRI, name_qualifier=''):
         """
         Returns the full path of the compiled import module file.
+
+        ontologyIRI: The IRI of the source ontology.
+        name_qualifier (optional): A string to add to the module file name.
         """
-        outputfile = self._getOutputFileName(ontologyIRI)
+        outputfile = self._getOutputFileName(ontologyIRI, name_qualifier)
 
         return os.path.join(self.outputdir, outputfile)
 
-    def getModuleIRIStr(self, ontologyIRI):
+    def getModuleIRIStr(self, ontologyIRI, name_qualifier=''):
         """
         Returns the IRI string that will be used for an import module.
 
         ontologyIRI: The IRI of the ontology to import.
+        name_qualifier (optional): A string to add to the module file name.
         """
         if self.base_IRI == '':
             return ''
 
-        outputfile = self._getOutputFileName(ontologyIRI)
+        outputfile = self._getOutputFileName(ontologyIRI, name_qualifier)
 
         # Generate the IRI for the output ontology OWL file by parsing the base
         # path from the base IRI and then adding the new module file name to
@@ -217,12 +258,13 @@ class ImportModuleBuilder:
 
         return rfc3987.compose(**parts)
 
-    def isBuildNeeded(self, ontologyIRI, termsfile_path):
+    def isBuildNeeded(self, ontologyIRI, termsfile_path, name_qualifier=''):
         """
         Tests whether an import module actually needs to be built.
 
         ontologyIRI: The IRI of the imported ontology.
         termsfile_path: The input file containing the terms to import.
+        name_qualifier (optional): A string to add to the module file name.
         """
         # If the terms file path is empty, we will just import the entire
         # source ontology, so there is never any module to build.
@@ -234,48 +276,98 @@ class ImportModuleBuilder:
             raise RuntimeError('Could not find the input terms file "'
                     + termsfile_path + '".')
 
-        outputpath = self.getModulePath(ontologyIRI)
+        outputpath = self.getModulePath(ontologyIRI, name_qualifier)
     
-        # If the output file already exists and the terms file was not
-        # modified/created more recently, there is nothing to do.
+        # If the output file already exists and neither the terms file nor the
+        # local copy of the source ontology (which might have been refreshed)
+        # was modified/created more recently, there is nothing to do.
         if os.path.isfile(outputpath):
-            if os.path.getmtime(outputpath) > os.path.getmtime(termsfile_path):
-                return False
+            mod_mtime = os.path.getmtime(outputpath)
+            if mod_mtime > os.path.getmtime(termsfile_path):
+                ontfile = self.getSourceOntologyPath(ontologyIRI)
+                if not(os.path.isfile(ontfile)):
+                    return False
+                elif mod_mtime > os.path.getmtime(ontfile):
+                    return False
 
         return True
         
-    def buildModule(self, ontologyIRI, termsfile_path):
+    def getSourceOntologyPath(self, ontologyIRI):
         """
-        Builds an import module from a single external ontology and an input
-        file containing a set of terms to import.  The import module will be
-        saved as an OWL file with a name generated by appending self.mod_suffix
-        to the base of the source ontology file name.
+        Returns the path of the local (cached) copy of a source ontology.  If
+        the IRI catalog maps the source ontology to a local file, the path of
+        that file is returned instead.
 
         ontologyIRI (string): The IRI of the source ontology.
-        termsfile_path: The input file containing the terms to import.
         """
-        # Verify that the terms file exists.
-        if not(os.path.isfile(termsfile_path)):
-            raise RuntimeError('Could not find the input terms file "'
-                    + termsfile_path + '".')
-
-        # Check the output directories.
-        self._checkOutputDirs()
+        catalogpath = self._getCatalogSourcePath(ontologyIRI)
+        if catalogpath is not None:
+            return catalogpath
 
         # Extract the name of the source ontology file from the IRI and
         # generate the path to it on the local filesystem.
         ontfile = os.path.basename(ontologyIRI)
-        ontfile = os.path.join(self.ontcachedir, ontfile)
 
-        # Verify that the source ontology file exists; if not, download it.
-        if not(os.path.isfile(ontfile)):
-            opener = URLOpenerWithErrorHandling()
-            try:
-                self.sourceOntologyIRI = ontologyIRI
-                opener.retrieve(ontologyIRI, ontfile, self._updateDownloadProgress)
-            except (IOError, HTTPError) as err:
-                raise RuntimeError('Unable to download the external ontology at "'
-                        + ontologyIRI + '": ' + unicode(err))
+        return os.path.join(self.ontcachedir, ontfile)
+
+    def _getCatalogSourcePath(self, ontologyIRI):
+        """
+        Returns the path of the local file to which the IRI catalog maps a
+        source ontology, or None if the catalog does not map the source
+        ontology to a local file.
+
+        ontologyIRI (string): The IRI of the source ontology.
+        """
+        doc_iristr = oom_manager.lookupCatalogIRI(ontologyIRI)
+        if doc_iristr is None:
+            return None
+
+        parts = urlparse.urlsplit(doc_iristr)
+        if parts.scheme.lower() != 'file':
+            return None
+
+        return urllib.url2pathname(parts.path)
+
+    def retrieveSourceOntology(self, ontologyIRI):
+        """
+        Makes sure that a local copy of a source ontology is available,
+        downloading the ontology if needed, and maps the source ontology's IRI
+        to the local file.  Returns the path of the local file.
+
+        ontologyIRI (string): The IRI of the source ontology.
+        """
+        # Check the output directories.
+        self._checkOutputDirs()
+
+        # Source ontologies that the IRI catalog maps to local files are used
+        # directly and never downloaded.  The catalog already maps their IRIs.
+        ontfile = self._getCatalogSourcePath(ontologyIRI)
+        if ontfile is not None:
+            if not(os.path.isfile(ontfile)):
+                raise RuntimeError(
+                    'The IRI catalog maps the external ontology at "{0}" to '
+                    'the local file "{1}", but the file could not be '
+                    'found.'.format(ontologyIRI, ontfile)
+                )
+
+            return ontfile
+
+        ontfile = self.getSourceOntologyPath(ontologyIRI)
+
+        # Download the source ontology if there is no local copy or if the
+        # local copy needs to be refreshed.  Each source ontology is only
+        # retrieved once per build, no matter how many times it is requested.
+        if self.show_progress:
+            self.sourceOntologyIRI = ontologyIRI
+            reporthook = self._updateDownloadProgress
+        else:
+            reporthook = None
+
+        try:
+            self.downloader.retrieve(ontologyIRI, ontfile, reporthook)
+        except DownloadError as err:
+            raise RuntimeError('Unable to download the external ontology at "'
+                    + ontologyIRI + '": ' + unicode(err))
 
         # Add an IRI mapping so that requests to load the imported ontology
         # will retrieve it from the local file.
@@ -286,15 +378,146 @@ class ImportModuleBuilder:
             IRI.create(ontologyIRI), IRI.create(doc_iristr)
         )
 
-        ontopilot.logger.info('Loading source ontology from file ' + ontfile + '.')
-        sourceont = Ontology(ontfile)
+        return ontfile
+
+    def retrieveSourceOntologies(self, ontologyIRIs, threadcnt):
+        """
+        Retrieves several source ontologies concurrently, according to the
+        refresh policy, and maps each source ontology's IRI to its local file.
+
+        ontologyIRIs: A sequence of source ontology IRI strings.
+        threadcnt: The maximum number of concurrent downloads.
+        """
+        self._checkOutputDirs()
+
+        # Download progress bars from concurrent downloads would overwrite
+        # each other on the console, so the download manager only logs the
+        # start of each download.
+        downloads = [
+            (ontologyIRI, self.getSourceOntologyPath(ontologyIRI))
+            for ontologyIRI in ontologyIRIs
+            if self._getCatalogSourcePath(ontologyIRI) is None
+        ]
+        try:
+            self.downloader.retrieveAll(downloads, threadcnt)
+        except DownloadError as err:
+            raise RuntimeError(
+                'Unable to download an external ontology: ' + unicode(err)
+            )
+
+        # Add the IRI mappings for the local files.  The source ontologies
+        # will not be downloaded again.
+        for ontologyIRI in ontologyIRIs:
+            self.retrieveSourceOntology(ontologyIRI)
+
+    def buildModule(self, ontologyIRI, termsfile_path, name_qualifier=''):
+        """
+        Builds an import module from a single external ontology and an input
+        file containing a set of terms to import.  The import module will be
+        saved as an OWL file with a name generated by appending self.mod_suffix
+        to the base of the source ontology file name.
+
+        ontologyIRI (string): The IRI of the source ontology.
+        termsfile_path: The input file containing the terms to import.
+        name_qualifier (optional): A string to add to the module file name.
+        Returns: The new import module as an Ontology object.
+        """
+        return self.buildModules(
+            ontologyIRI, [(termsfile_path, name_qualifier)]
+        )[0]
+
+    def buildModules(self, ontologyIRI, modspecs):
+        """
+        Builds one or more import modules from a single external ontology.  The
+        source ontology is only loaded once, and all of the modules are
+        extracted from the same loaded instance.  If a module was built before,
+        the terms in its terms file are compared with the terms from the
+        previous build, and, if possible, the existing module is reused or
+        patched instead of being extracted again from scratch.  See
+        _getBuildStrategy().
+
+        ontologyIRI (string): The IRI of the source ontology.
+        modspecs: A sequence of (termsfile_path, name_qualifier) tuples, one
+            for each import module to build.  See buildModule().
+        Returns: A list of the new import modules as Ontology objects, in the
+            same order as modspecs.
+        """
+        # Verify that the terms files exist.
+        for termsfile_path, name_qualifier in modspecs:
+            if not(os.path.isfile(termsfile_path)):
+                raise RuntimeError('Could not find the input terms file "'
+                        + termsfile_path + '".')
+
+        ontfile = self.retrieveSourceOntology(ontologyIRI)
+        source_fprint = self._getSourceFingerprint(ontfile)
+
+        # Decide how to build each module before loading the source ontology,
+        # because the source is not needed if no module has to be extracted.
+        plans = []
+        for termsfile_path, name_qualifier in modspecs:
+            termrows = self._readTermRows(termsfile_path)
+            strategy, prev_state = self._getBuildStrategy(
+                ontologyIRI, name_qualifier, source_fprint, termrows
+            )
+            plans.append(
+                (termsfile_path, name_qualifier, termrows, strategy, prev_state)
+            )
+
+        sourceont = None
+        modules = []
+        for termsfile_path, name_qualifier, termrows, strategy, prev_state in plans:
+            if strategy == UNCHANGED_BUILD:
+                modules.append(
+                    self._reuseModule(ontologyIRI, name_qualifier)
+                )
+                continue
+
+            if sourceont is None:
+                ontopilot.logger.info(
+                    'Loading source ontology from file ' + ontfile + '.'
+                )
+                sourceont = Ontology(ontfile)
+
+                # All modules share a single relationship index and a single
+                # locality module extractor for the source ontology.  The
+                # index is only built if a terms file requests related
+                # entities.
+                rel_index = RelationshipIndex(sourceont)
+                locality_extractor = LocalityModuleExtractor(sourceont)
+
+            mod_ext = ModuleExtractor(sourceont, rel_index, locality_extractor)
+
+            if strategy == INCREMENTAL_BUILD:
+                module = self._patchModule(
+                    mod_ext, ontologyIRI, name_qualifier, termrows, prev_state,
+                    source_fprint
+                )
+            else:
+                module = self._extractModule(
+                    mod_ext, ontologyIRI, termsfile_path, name_qualifier,
+                    termrows, source_fprint
+                )
+
+            modules.append(module)
+
+        return modules
+
+    def _readTermRows(self, termsfile_path):
+        """
+        Reads the specifications of the terms to import from a terms file.
+        Returns a list of (row, termspec) tuples, where row is the TableRow
+        object and termspec is a normalized, hashable description of the
+        term's import specification of the form (ID, exclude, method,
+        related_types), where exclude is a boolean, method is a module
+        extraction method constant (None for excluded terms), and
+        related_types is a sorted tuple of related axiom type constants.
+        Ignored rows are skipped.
+
+        termsfile_path: The input file containing the terms to import.
+        """
+        termrows = []
 
-        mod_ext = ModuleExtractor(sourceont)
-        excluded_ents = []
         with TableReaderFactory(termsfile_path) as reader:
-            # Read the terms to import from each table in the input file, add
-            # each term to the signature set for module extraction, and add the
-            # descendants of each term, if desired.
             for table in reader:
                 table.setRequiredColumns(self.REQUIRED_COLS)
                 table.setOptionalColumns(self.OPTIONAL_COLS)
@@ -304,32 +527,311 @@ class ImportModuleBuilder:
                     if row['Ignore'].lower() in TRUE_STRS:
                         continue
 
-                    idstr = row['ID']
-                    ontopilot.logger.info('Processing entity "' + idstr + '".')
-    
                     try:
                         rel_types = rel_axiom_types.getAxiomTypesFromStr(
                             row['Related entities']
                         )
 
-                        if row['Exclude'].lower() in TRUE_STRS:
-                            mod_ext.excludeEntity(idstr, rel_types)
+                        exclude = row['Exclude'].lower() in TRUE_STRS
+                        if exclude:
+                            method = None
                         else:
                             method = me_methods.getMethodFromStr(
                                 row['Method']
                             )
-                            mod_ext.addEntity(idstr, method, rel_types)
 
                     except RuntimeError as err:
                         raise ImportModSpecError(unicode(err), row)
 
+                    termspec = (
+                        row['ID'], exclude, method, tuple(sorted(rel_types))
+                    )
+                    termrows.append((row, termspec))
+
+        return termrows
+
+    def _addTermRows(self, mod_ext, termrows):
+        """
+        Adds the terms from a list of (row, termspec) tuples (see
+        _readTermRows()) to the signature or the excluded entities of a
+        ModuleExtractor.
+        """
+        for row, termspec in termrows:
+            idstr, exclude, method, rel_types = termspec
+            ontopilot.logger.info('Processing entity "' + idstr + '".')
+
+            try:
+                if exclude:
+                    mod_ext.excludeEntity(idstr, set(rel_types))
+                else:
+                    mod_ext.addEntity(idstr, method, set(rel_types))
+            except RuntimeError as err:
+                raise ImportModSpecError(unicode(err), row)
+
+    def getModuleStatePath(self, ontologyIRI, name_qualifier=''):
+        """
+        Returns the path of the file that records the state of the most recent
+        build of an import module (the source ontology version, the terms, and
+        the extraction results).  The state files are kept in the build
+        directory.
+
+        ontologyIRI: The IRI of the source ontology.
+        name_qualifier (optional): A string to add to the module file name.
+        """
+        outputfile = self._getOutputFileName(ontologyIRI, name_qualifier)
+
+        return os.path.join(self.builddir, outputfile + MODULE_STATE_SUFFIX)
+
+    def _getSourceFingerprint(self, ontfile):
+        """
+        Returns a dictionary that identifies the current version of a local
+        copy of a source ontology.
+        """
+        return {
+            'path': ontfile,
+            'size': os.path.getsize(ontfile),
+            'mtime': os.path.getmtime(ontfile)
+        }
+
+    def _readModuleState(self, ontologyIRI, name_qualifier):
+        """
+        Returns the recorded state of the most recent build of an import
+        module as a dictionary, or None if no valid state is available.
+        """
+        statepath = self.getModuleStatePath(ontologyIRI, name_qualifier)
+
+        if not(os.path.isfile(statepath)):
+            return None
+
+        # An unreadable or malformed state file means that a full build is
+        # required.
+        try:
+            with open(statepath) as fin:
+                state = json.load(fin)
+
+            state['terms'] = set([
+                (termspec[0], termspec[1], termspec[2], tuple(termspec[3]))
+                for termspec in state['terms']
+            ])
+        except (ValueError, KeyError, IndexError, TypeError, IOError):
+            return None
+
+        return state
+
+    def _writeModuleState(
+        self, ontologyIRI, name_qualifier, source_fprint, termspecs,
+        single_signature, excluded
+    ):
+        """
+        Records the state of an import module build.
+
+        ontologyIRI: The IRI of the source ontology.
+        name_qualifier: A string to add to the module file name.
+        source_fprint: The fingerprint of the source ontology file.
+        termspecs: An iterable of the term specifications for the module.
+        single_signature: An iterable of the IRI strings of all entities that
+            were extracted with the single-entity method.
+        excluded: An iterable of the IRI strings of all excluded entities.
+        """
+        state = {
+            'module_iri': self.getModuleIRIStr(ontologyIRI, name_qualifier),
+            'source': source_fprint,
+            'terms': sorted([
+                [termspec[0], termspec[1], termspec[2], list(termspec[3])]
+                for termspec in termspecs
+            ]),
+            'single_signature': sorted(single_signature),
+            'excluded': sorted(excluded)
+        }
+
+        statepath = self.getModuleStatePath(ontologyIRI, name_qualifier)
+        with open(statepath, 'w') as fout:
+            json.dump(state, fout, indent=1)
+
+    def _getBuildStrategy(
+        self, ontologyIRI, name_qualifier, source_fprint, termrows
+    ):
+        """
+        Decides how to build an import module by comparing the current source
+        ontology and terms with the state recorded by the previous build.
+        Returns a tuple containing the build strategy (one of FULL_BUILD,
+        INCREMENTAL_BUILD, or UNCHANGED_BUILD) and the previous build state
+        (or None).  The build strategies are as follows.
+
+        UNCHANGED_BUILD: The source ontology and the set of term
+            specifications are unchanged (e.g., the terms file was only
+            reformatted or reordered), so the existing module can be reused.
+        INCREMENTAL_BUILD: The source ontology is unchanged, and terms were
+            only added, all of which use the single-entity method without
+            related entities.  Single-entity extraction is additive, so the new
+            terms can be extracted and added to the existing module.  This is
+            not possible for locality modules, related entities, or
+            exclusions, because their results depend on the whole term list.
+        FULL_BUILD: Anything else.
+
+        The strategy is logged, along with the reason for full builds.
+        """
+        modpath = self.getModulePath(ontologyIRI, name_qualifier)
+        state = self._readModuleState(ontologyIRI, name_qualifier)
+        termspecs = set([termspec for row, termspec in termrows])
+
+        reason = None
+        if state is None or not(os.path.isfile(modpath)):
+            reason = 'no previous build was found'
+        elif state['module_iri'] != self.getModuleIRIStr(
+            ontologyIRI, name_qualifier
+        ):
+            reason = 'the module IRI changed'
+        elif state['source'] != source_fprint:
+            reason = 'the source ontology changed'
+        elif termspecs == state['terms']:
+            ontopilot.logger.info(
+                'The source ontology and terms for the import module {0} are '
+                'unchanged; reusing the existing module.'.format(modpath)
+            )
+            return (UNCHANGED_BUILD, state)
+        elif not(state['terms'].issubset(termspecs)):
+            reason = 'terms were removed or modified'
+        elif len(state['excluded']) > 0:
+            reason = 'the module excludes terms'
+        else:
+            for termspec in termspecs - state['terms']:
+                idstr, exclude, method, rel_types = termspec
+                if exclude or method != me_methods.SINGLE or len(rel_types) > 0:
+                    reason = (
+                        'some new terms are not single-entity terms '
+                        'without related entities'
+                    )
+                    break
+
+        if reason is None:
+            ontopilot.logger.info(
+                'Incrementally updating the import module {0} with {1} new '
+                'terms.'.format(modpath, len(termspecs - state['terms']))
+            )
+            return (INCREMENTAL_BUILD, state)
+        else:
+            ontopilot.logger.info(
+                'Fully extracting the import module {0} because {1}.'.format(
+                    modpath, reason
+                )
+            )
+            return (FULL_BUILD, state)
+
+    def _reuseModule(self, ontologyIRI, name_qualifier):
+        """
+        Loads an existing import module and updates its modification time so
+        that it is no longer considered out of date.  Returns the module.
+        """
+        modpath = self.getModulePath(ontologyIRI, name_qualifier)
+        os.utime(modpath, None)
+
+        return Ontology(modpath)
+
+    def _logModuleMetrics(self, module, ontologyIRI, name_qualifier, starttime):
+        """
+        Reports the size of a module and the time required to build it to help
+        with tuning module sizes (e.g., choosing between the locality methods).
+        """
+        owlmod = module.getOWLOntology()
+        ontopilot.logger.info(
+            'Extracted import module {0}: {1} axioms, {2} entities, '
+            '{3:.2f} s.'.format(
+                self.getModuleIRIStr(ontologyIRI, name_qualifier),
+                owlmod.getAxiomCount(), owlmod.getSignature().size(),
+                time.time() - starttime
+            )
+        )
+
+    def _extractModule(
+        self, mod_ext, ontologyIRI, termsfile_path, name_qualifier, termrows,
+        source_fprint
+    ):
+        """
+        Extracts a single import module from a loaded source ontology, saves
+        the module, and records the module's build state.  Returns the new
+        module.
+
+        mod_ext: A ModuleExtractor for the source ontology.
+        ontologyIRI (string): The IRI of the source ontology.
+        termsfile_path: The input file containing the terms to import.
+        name_qualifier: A string to add to the module file name.
+        termrows: The terms to import (see _readTermRows()).
+        source_fprint: The fingerprint of the source ontology file.
+        """
+        starttime = time.time()
+
+        self._addTermRows(mod_ext, termrows)
+
         if mod_ext.getSignatureSize() == 0:
             ontopilot.logger.warning(
                 'No terms to import were found in the terms file '
                 '{0}.'.format(termsfile_path)
             )
 
-        module = mod_ext.extractModule(self.getModuleIRIStr(ontologyIRI))
+        module = mod_ext.extractModule(
+            self.getModuleIRIStr(ontologyIRI, name_qualifier)
+        )
+
+        self._logModuleMetrics(module, ontologyIRI, name_qualifier, starttime)
+
+        module.saveOntology(self.getModulePath(ontologyIRI, name_qualifier))
+
+        self._writeModuleState(
+            ontologyIRI, name_qualifier, source_fprint,
+            [termspec for row, termspec in termrows],
+            [
+                ent.getIRI().toString()
+                for ent in mod_ext.getSignature(me_methods.SINGLE)
+            ],
+            [ent.getIRI().toString() for ent in mod_ext.getExcludedEntities()]
+        )
+
+        return module
+
+    def _patchModule(
+        self, mod_ext, ontologyIRI, name_qualifier, termrows, prev_state,
+        source_fprint
+    ):
+        """
+        Adds new single-entity terms to an existing import module, saves the
+        module, and records the module's new build state.  Returns the updated
+        module.
 
-        module.saveOntology(self.getModulePath(ontologyIRI))
+        mod_ext: A ModuleExtractor for the source ontology.
+        ontologyIRI (string): The IRI of the source ontology.
+        name_qualifier: A string to add to the module file name.
+        termrows: All terms to import (see _readTermRows()).
+        prev_state: The state recorded by the previous build.
+        source_fprint: The fingerprint of the source ontology file.
+        """
+        starttime = time.time()
+
+        modpath = self.getModulePath(ontologyIRI, name_qualifier)
+        module = Ontology(modpath)
+
+        # Only the new terms need to be extracted.
+        newrows = [
+            (row, termspec) for row, termspec in termrows
+            if termspec not in prev_state['terms']
+        ]
+        self._addTermRows(mod_ext, newrows)
+
+        mod_ext.extendModule(module)
+
+        self._logModuleMetrics(module, ontologyIRI, name_qualifier, starttime)
+
+        module.saveOntology(modpath)
+
+        single_signature = set(prev_state['single_signature'])
+        single_signature.update([
+            ent.getIRI().toString()
+            for ent in mod_ext.getSignature(me_methods.SINGLE)
+        ])
+        self._writeModuleState(
+            ontologyIRI, name_qualifier, source_fprint,
+            [termspec for row, termspec in termrows], single_signature,
+            prev_state['excluded']
+        )
 
+        return module
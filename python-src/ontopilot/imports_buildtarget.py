@@ -20,8 +20,10 @@
 
 # Python imports.
 from __future__ import unicode_literals
-import os
+import os, sys
 import urllib, urlparse
+import threading
+import Queue
 from ontopilot import logger
 import oom_manager
 from tablereaderfactory import TableReaderFactory
@@ -31,9 +33,12 @@ from ontopilot import TRUE_STRS
 from rfc3987 import rfc3987
 from buildtarget import BuildTargetWithConfig
 from basic_buildtargets import BuildDirTarget
+from basictimer import BasicTimer
+from memory_budget import MemoryBudget
 from collections import namedtuple
 
 # Java imports.
+from java.lang import Runtime
 from org.semanticweb.owlapi.model import IRI
 
 
@@ -48,6 +53,16 @@ REQUIRED_COLS = ('Entities file', 'IRI')
 # Optional columns in terms files.
 OPTIONAL_COLS = ('Ignore',)
 
+# The approximate ratio of the memory used by a loaded source ontology (and
+# the module extraction process) to the size of the source ontology file.
+# This is only a rough estimate, but it is good enough for deciding how many
+# import modules can safely be built at the same time.
+SOURCE_MEMORY_FACTOR = 10
+
+# The fraction of the maximum Java heap size to use for concurrent import
+# module builds if no memory limit is configured.
+DEFAULT_HEAP_FRACTION = 0.75
+
 
 class ImportsBuildTarget(BuildTargetWithConfig):
     """
@@ -57,12 +72,19 @@ class ImportsBuildTarget(BuildTargetWithConfig):
         """
         args: A "struct" of configuration options (typically, parsed
             command-line arguments).  The only required member is 'config_file'
-            (string).
+            (string).  The optional member 'refresh_sources' (string) sets the
+            policy for refreshing previously downloaded source ontologies; it
+            must be one of the values in download_manager.REFRESH_POLICIES.
         cfgfile_required (optional): Whether a config file is required.
         config (optional): An OntoConfig object.
         """
         BuildTargetWithConfig.__init__(self, args, cfgfile_required, config)
 
+        # Get the source ontology refresh policy.  Not all client code provides
+        # this argument, so never refresh the sources by default.
+        self.refresh_policy = getattr(args, 'refresh_sources', 'never')
+        self.sources_refreshed = False
+
         self.addDependency(BuildDirTarget(args, False, self.config))
 
         # The string builddir is the path to a build directory where, at a
@@ -83,7 +105,7 @@ class ImportsBuildTarget(BuildTargetWithConfig):
         self.mbuilder = ImportModuleBuilder(
                         self.config.getImportsDevBaseIRI(),
                         self.config.getImportModSuffix(), self.builddir,
-                        self.outputdir
+                        self.outputdir, self.refresh_policy
                     )
 
         # Update the IRI mappings for the import modules so that the local
@@ -133,6 +155,45 @@ class ImportsBuildTarget(BuildTargetWithConfig):
 
                         self.tablerows.append(row)
 
+        self._setModuleNameQualifiers()
+
+    def _setModuleNameQualifiers(self):
+        """
+        Import module file names are normally generated from the source
+        ontology file name.  If more than one import module is built from the
+        same source ontology (e.g., with separate terms files for different
+        branches of a large ontology), the module names must be distinguished,
+        so the name of the terms file is added to the file names of those
+        modules.  The name qualifier string is stored in the 'name_qualifier'
+        field of each table row.
+        """
+        modcnts = {}
+        for row in self.tablerows:
+            if row['abs_tfilepath'] != '':
+                modcnts[row['IRI']] = modcnts.get(row['IRI'], 0) + 1
+
+        modnames = set()
+        for row in self.tablerows:
+            row['name_qualifier'] = ''
+            if modcnts.get(row['IRI'], 0) > 1:
+                row['name_qualifier'] = os.path.splitext(
+                    os.path.basename(row['abs_tfilepath'])
+                )[0]
+
+                modname = (row['IRI'], row['name_qualifier'])
+                if modname in modnames:
+                    raise TableRowError(
+                        'More than one import module uses the source ontology '
+                        '<{0}> and a terms file named "{1}".  Import modules '
+                        'built from the same source ontology must use terms '
+                        'files with different names.'.format(
+                            row['IRI'],
+                            os.path.basename(row['abs_tfilepath'])
+                        ),
+                        row
+                    )
+                modnames.add(modname)
+
     def _getAbsTermsFilePath(self, trow):
         """
         Gets the absolute path to a terms file from an input table row.
@@ -188,8 +249,12 @@ class ImportsBuildTarget(BuildTargetWithConfig):
                 modinfo = ModuleInfo(filename='', iristr=row['IRI'])
             else:
                 modinfo = ModuleInfo(
-                    filename=self.mbuilder.getModulePath(row['IRI']),
-                    iristr=self.mbuilder.getModuleIRIStr(row['IRI'])
+                    filename=self.mbuilder.getModulePath(
+                        row['IRI'], row['name_qualifier']
+                    ),
+                    iristr=self.mbuilder.getModuleIRIStr(
+                        row['IRI'], row['name_qualifier']
+                    )
                 )
 
             modinfos.append(modinfo)
@@ -199,12 +264,47 @@ class ImportsBuildTarget(BuildTargetWithConfig):
     def getBuildNotRequiredMsg(self):
         return 'All import modules are already up to date.'
 
+    def _getSourceIRIs(self):
+        """
+        Returns a list of the unique IRIs of all source ontologies from which
+        import modules are built.
+        """
+        iristrs = []
+        for row in self.tablerows:
+            if row['abs_tfilepath'] != '' and row['IRI'] not in iristrs:
+                iristrs.append(row['IRI'])
+
+        return iristrs
+
+    def _refreshSources(self):
+        """
+        If the refresh policy requires it, refreshes the local copies of all
+        source ontologies (concurrently).  This is only done once per build.
+        """
+        if self.refresh_policy == 'never' or self.sources_refreshed:
+            return
+
+        # The build directory might not exist yet, in which case there are no
+        # local copies to refresh.
+        if os.path.isdir(self.builddir):
+            logger.info('Checking for updated source ontologies.')
+            self.mbuilder.retrieveSourceOntologies(
+                self._getSourceIRIs(), self.config.getImportsBuildThreads()
+            )
+            self.sources_refreshed = True
+
     def _isBuildRequired(self):
         """
         Returns True if one or more of the import modules needs to be compiled.
+        If the source ontologies should be refreshed, they are refreshed first,
+        so that changed source ontologies trigger a build.
         """
+        self._refreshSources()
+
         for row in self.tablerows:
-            if self.mbuilder.isBuildNeeded(row['IRI'], row['abs_tfilepath']):
+            if self.mbuilder.isBuildNeeded(
+                row['IRI'], row['abs_tfilepath'], row['name_qualifier']
+            ):
                 return True
 
         return False
@@ -212,6 +312,11 @@ class ImportsBuildTarget(BuildTargetWithConfig):
     def _run(self):
         """
         Runs the imports build process and produces import module OWL files.
+        Each newly built module is also returned as a build product, keyed by
+        the path of the module file, so that dependent targets can use the
+        module without parsing the file again.  Import modules from different
+        source ontologies are built concurrently, subject to the configured
+        thread count and memory limit.
         """
         # Create the destination directory, if needed.  We only need to check
         # this for in-source builds, since the BuildDirTarget dependency will
@@ -220,20 +325,193 @@ class ImportsBuildTarget(BuildTargetWithConfig):
             if not(os.path.isdir(self.outputdir)):
                 self._makeDirs(self.outputdir)
 
+        # Gather the import modules that need to be built.  Modules that use
+        # the same source ontology are grouped into a single build job, so
+        # that the source ontology only needs to be loaded once for all of
+        # them.
+        jobs = []
+        jobindexes = {}
         for row in self.tablerows:
             termsfile_path = row['abs_tfilepath']
 
             if termsfile_path != '':
-                if self.mbuilder.isBuildNeeded(row['IRI'], termsfile_path):
-                    logger.info(
-                        'Building the {0} ({1}) import module.'.format(
-                            row['name'], row['IRI']
-                        )
-                    )
-                    self.mbuilder.buildModule(row['IRI'], termsfile_path)
+                if self.mbuilder.isBuildNeeded(
+                    row['IRI'], termsfile_path, row['name_qualifier']
+                ):
+                    if row['IRI'] not in jobindexes:
+                        jobindexes[row['IRI']] = len(jobs)
+                        jobs.append([])
+                    jobs[jobindexes[row['IRI']]].append(row)
                 else:
                     logger.info(
                         'The {0} ({1}) import module is already up to '
                         'date.'.format(row['name'], row['IRI'])
                     )
 
+        self.products_lock = threading.Lock()
+        self.built_cnt = 0
+        self.total_cnt = sum([len(job) for job in jobs])
+
+        products = {}
+        budget = MemoryBudget(self._getMemoryBudget())
+        threadcnt = min(self.config.getImportsBuildThreads(), len(jobs))
+
+        # Download any missing source ontologies concurrently before starting
+        # the module builds.  (If the sources needed refreshing, that was
+        # already done by _isBuildRequired().)
+        if threadcnt > 1:
+            self.mbuilder.retrieveSourceOntologies(
+                [job[0]['IRI'] for job in jobs],
+                self.config.getImportsBuildThreads()
+            )
+
+        if threadcnt <= 1:
+            self.mbuilder.setShowDownloadProgress(True)
+            for job in jobs:
+                self._buildModules(job, budget, products)
+        else:
+            self._runBuildWorkers(jobs, threadcnt, budget, products)
+
+        return products
+
+    def _getMemoryBudget(self):
+        """
+        Returns the total memory budget, in MB, for concurrent import module
+        builds.
+        """
+        budget = self.config.getImportsMaxMemory()
+        if budget == 0:
+            maxheap = Runtime.getRuntime().maxMemory()
+            budget = int(maxheap * DEFAULT_HEAP_FRACTION / 2**20)
+
+        return budget
+
+    def _estimateModuleMemory(self, ontfile):
+        """
+        Returns the estimated memory, in MB, required to build import modules
+        from a source ontology file.
+        """
+        filesize = os.path.getsize(ontfile)
+
+        return max(1, int(filesize * SOURCE_MEMORY_FACTOR / 2**20))
+
+    def _buildModules(self, job, budget, products):
+        """
+        Builds all import modules for a single source ontology.  The source
+        ontology is retrieved first, and then it is loaded and the modules are
+        extracted once the memory budget allows it.  The new modules are added
+        to the products dictionary.
+
+        job: A list of imports table rows that all use the same source
+            ontology.
+        budget: A MemoryBudget for throttling concurrent builds.
+        products: The dictionary of build products.
+        """
+        iristr = job[0]['IRI']
+        for row in job:
+            logger.info(
+                'Building the {0} ({1}) import module.'.format(
+                    row['name'], row['IRI']
+                )
+            )
+        timer = BasicTimer()
+        timer.start()
+
+        # Downloading the source ontology does not require much memory, so
+        # only reserve memory for loading the source and extracting the
+        # modules.
+        ontfile = self.mbuilder.retrieveSourceOntology(iristr)
+        memest = self._estimateModuleMemory(ontfile)
+
+        budget.reserve(memest)
+        try:
+            modules = self.mbuilder.buildModules(
+                iristr, [
+                    (row['abs_tfilepath'], row['name_qualifier'])
+                    for row in job
+                ]
+            )
+        finally:
+            budget.release(memest)
+
+        timer.stop()
+        with self.products_lock:
+            for row, module in zip(job, modules):
+                modpath = self.mbuilder.getModulePath(
+                    row['IRI'], row['name_qualifier']
+                )
+                products[modpath] = module
+                self.built_cnt += 1
+                logger.info(
+                    'Finished building the {0} import module ({1} of {2}) in '
+                    '{3} s.'.format(
+                        row['name'], self.built_cnt, self.total_cnt, timer
+                    )
+                )
+
+    def _runBuildWorkers(self, jobs, threadcnt, budget, products):
+        """
+        Builds import modules concurrently on a pool of worker threads.  If any
+        module fails to build, no new builds are started, and the first error
+        is raised again in the calling thread once all workers have stopped.
+
+        jobs: A list of build jobs, each of which is a list of imports table
+            rows that share the same source ontology.
+        threadcnt: The number of worker threads to use.
+        budget: A MemoryBudget for throttling concurrent builds.
+        products: The dictionary of build products.
+        """
+        logger.info(
+            'Building {0} import modules using {1} worker threads and a memory '
+            'limit of {2} MB.'.format(
+                self.total_cnt, threadcnt, budget.getBudget()
+            )
+        )
+
+        # Download progress bars from concurrent downloads would overwrite
+        # each other on the console.
+        self.mbuilder.setShowDownloadProgress(False)
+
+        jobqueue = Queue.Queue()
+        for job in jobs:
+            jobqueue.put(job)
+
+        errors = []
+        workers = []
+        for cnt in range(threadcnt):
+            worker = threading.Thread(
+                target=self._buildWorker,
+                args=(jobqueue, budget, products, errors)
+            )
+            worker.start()
+            workers.append(worker)
+
+        for worker in workers:
+            worker.join()
+
+        if len(errors) > 0:
+            exc_type, exc_value, exc_tb = errors[0]
+            raise exc_type, exc_value, exc_tb
+
+    def _buildWorker(self, jobqueue, budget, products, errors):
+        """
+        The main function for import module build worker threads.  Takes jobs
+        from the job queue until the queue is empty or a build error occurs.
+
+        jobqueue: A Queue of build jobs.
+        budget: A MemoryBudget for throttling concurrent builds.
+        products: The dictionary of build products.
+        errors: A list for reporting exception information to the main thread.
+        """
+        while len(errors) == 0:
+            try:
+                job = jobqueue.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                self._buildModules(job, budget, products)
+            except:
+                # Catch everything, including Java exceptions, so that the
+                # error can be reported by the main thread.
+                errors.append(sys.exc_info())
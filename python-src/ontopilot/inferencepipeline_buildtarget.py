@@ -17,21 +17,35 @@
 # Python imports.
 from __future__ import unicode_literals
 import os
+import time
 from ontopilot import logger
 from ontology import Ontology
 from buildtarget import BuildTargetWithConfig
 from inferred_axiom_adder import InferredAxiomAdder
+from partitioned_inference import PartitionedInferredAxiomAdder
+from batch_inference import BatchInferencePipeline
+from reasoning_cache import getProjectReasoningCache
 
 # Java imports.
 from java.lang import System as JavaSystem
 
 
+# The file name extensions of ontology/data files that are processed when a
+# directory is given as a batch input.
+BATCH_INPUT_EXTS = ('.owl', '.rdf', '.ttl', '.ofn', '.omn', '.owx', '.obo')
+
+
 class InferencePipelineBuildTarget(BuildTargetWithConfig):
     """
     Implements an inferencing pipeline mode for OntoPilot in which an incoming
     ontology/data set is accepted either from a file or stdin, inferred axioms
     are added to the ontology/data set, and the results are written to an
-    output file or stdout.
+    output file or stdout.  Optionally, the ABox of the data set can be split
+    into disconnected partitions that are reasoned over in parallel.  In batch
+    mode, a list of ontology/data files and/or directories of such files is
+    accepted instead, the shared TBox of the data sets is classified only
+    once, and the results for each input file are written to a file of the
+    same name in an output directory (see BatchInferencePipeline).
     """
     def __init__(self, args, cfgfile_required=False, config=None):
         """
@@ -39,6 +53,8 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
             command-line arguments).  The only required member is
             'config_file', which should provide the path to a configuration
             file (although this is only used if the config argument is None).
+            The optional member 'batch_input' (a list of strings) provides
+            the paths of the input files and/or directories for batch mode.
         cfgfile_required (optional): Whether a config file is required.
         config (optional): An OntoConfig object.
         """
@@ -49,12 +65,15 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
 
         self.srcpath = args.input_data.strip()
         self.outpath = args.fileout.strip()
+        self.batchpaths = [
+            batchpath.strip() for batchpath in getattr(args, 'batch_input', [])
+        ]
 
         self._checkInputFile()
 
     def _checkInputFile(self):
         """
-        Verifies that the user-specified input file exists.
+        Verifies that the user-specified input file(s) exists.
         """
         if self.srcpath != '':
             if not(os.path.isfile(self.srcpath)):
@@ -63,6 +82,82 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
                     '{0}.'.format(self.srcpath)
                 )
 
+        if len(self.batchpaths) > 0:
+            if self.srcpath != '':
+                raise RuntimeError(
+                    'A single input file and batch input files cannot both be '
+                    'used.  Please provide either an input file or batch '
+                    'input files and/or directories, but not both.'
+                )
+
+            for batchpath in self.batchpaths:
+                if not(os.path.exists(batchpath)):
+                    raise RuntimeError(
+                        'The batch input file or directory could not be '
+                        'found: {0}.'.format(batchpath)
+                    )
+
+            if self.outpath == '':
+                raise RuntimeError(
+                    'An output directory is required for batch mode.  Please '
+                    'provide the path of the directory for the output files.'
+                )
+
+            if os.path.isfile(self.outpath):
+                raise RuntimeError(
+                    'The output path for batch mode, {0}, is a file, but it '
+                    'must be a directory.'.format(self.outpath)
+                )
+
+    def _getBatchFilePaths(self):
+        """
+        Returns a list of (input path, output path) tuples for all input files
+        in batch mode.  Directories are expanded to all ontology/data files
+        they contain (not including subdirectories).
+        """
+        inpaths = []
+        for batchpath in self.batchpaths:
+            if os.path.isdir(batchpath):
+                inpaths.extend(sorted([
+                    os.path.join(batchpath, fname)
+                    for fname in os.listdir(batchpath)
+                    if os.path.splitext(fname)[1].lower() in BATCH_INPUT_EXTS
+                    and os.path.isfile(os.path.join(batchpath, fname))
+                ]))
+            else:
+                inpaths.append(batchpath)
+
+        if len(inpaths) == 0:
+            raise RuntimeError(
+                'No ontology/data files were found for batch mode.  Files in '
+                'batch input directories must have one of the following '
+                'extensions: {0}.'.format(', '.join(BATCH_INPUT_EXTS))
+            )
+
+        filepaths = []
+        outpaths = set()
+        for inpath in inpaths:
+            outpath = os.path.join(self.outpath, os.path.basename(inpath))
+
+            if outpath in outpaths:
+                raise RuntimeError(
+                    'More than one batch input file is named "{0}", so the '
+                    'output files would overwrite each other.  Please rename '
+                    'the input files so that their names are '
+                    'unique.'.format(os.path.basename(inpath))
+                )
+            if os.path.realpath(outpath) == os.path.realpath(inpath):
+                raise RuntimeError(
+                    'The output file for the batch input file {0} would '
+                    'overwrite the input file.  Please use a different output '
+                    'directory.'.format(inpath)
+                )
+
+            outpaths.add(outpath)
+            filepaths.append((inpath, outpath))
+
+        return filepaths
+
     def _isBuildRequired(self):
         """
         Because this build target works with external input, a "build" is
@@ -76,6 +171,10 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
         """
         #self._retrieveAndCheckFilePaths()
 
+        if len(self.batchpaths) > 0:
+            self._runBatch()
+            return
+
         if self.srcpath != '':
             sourceont = Ontology(self.srcpath)
         else:
@@ -85,12 +184,31 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
         inf_types = self.config.getInferenceTypeStrs()
         annotate_inferred = self.config.getAnnotateInferred()
         preprocess_inverses = self.config.getPreprocessInverses()
-        iaa = InferredAxiomAdder(sourceont, self.config.getReasonerStr())
+        sourceont.getReasonerManager().setReasonerLimits(
+            self.config.getReasonerTimeout(),
+            self.config.getReasonerMaxMemory()
+        )
+        if self.config.getPartitionABox():
+            iaa = PartitionedInferredAxiomAdder(
+                sourceont, self.config.getReasonerStr(),
+                self.config.getInferenceThreads()
+            )
+            iaa.setMaxPartitionSize(self.config.getABoxPartitionSize())
+        else:
+            iaa = InferredAxiomAdder(
+                sourceont, self.config.getReasonerStr(),
+                self.config.getBufferingReasoner()
+            )
+            iaa.setReasoningCache(getProjectReasoningCache(self.config))
+            iaa.setInferenceThreads(self.config.getInferenceThreads())
         if self.config.getExcludedTypesFile() != '':
             iaa.loadExcludedTypes(self.config.getExcludedTypesFile())
-        iaa.addInferredAxioms(
-            inf_types, annotate_inferred, preprocess_inverses
-        )
+        try:
+            iaa.addInferredAxioms(
+                inf_types, annotate_inferred, preprocess_inverses
+            )
+        finally:
+            iaa.dispose()
 
         # Write the ontology to the output file or stdout.
         format_str = self.config.getOutputFormat()
@@ -100,3 +218,47 @@ class InferencePipelineBuildTarget(BuildTargetWithConfig):
         else:
             sourceont.printOntology(format_str)
 
+    def _runBatch(self):
+        """
+        Runs the inferencing pipeline on all input files in batch mode.
+        """
+        filepaths = self._getBatchFilePaths()
+
+        if not(os.path.isdir(self.outpath)):
+            os.makedirs(self.outpath)
+
+        pipeline = BatchInferencePipeline(
+            self.config.getReasonerStr(), self.config.getInferenceTypeStrs(),
+            self.config.getAnnotateInferred(),
+            self.config.getPreprocessInverses()
+        )
+        pipeline.setReasonerLimits(
+            self.config.getReasonerTimeout(),
+            self.config.getReasonerMaxMemory()
+        )
+        pipeline.setReasoningCache(getProjectReasoningCache(self.config))
+        if self.config.getExcludedTypesFile() != '':
+            pipeline.loadExcludedTypes(self.config.getExcludedTypesFile())
+
+        format_str = self.config.getOutputFormat()
+        starttime = time.time()
+
+        try:
+            for cnt, (inpath, outpath) in enumerate(filepaths):
+                logger.info(
+                    'Adding inferred axioms to {0} ({1} of {2})...'.format(
+                        inpath, cnt + 1, len(filepaths)
+                    )
+                )
+                pipeline.processOntology(inpath, outpath, format_str)
+                logger.info('Wrote the results to ' + outpath + '.')
+        finally:
+            pipeline.dispose()
+
+        elapsed = max(time.time() - starttime, 0.001)
+        logger.info(
+            'Processed {0} input files in {1:.3g} s ({2:.3g} '
+            'files/min).'.format(
+                len(filepaths), elapsed, len(filepaths) * 60.0 / elapsed
+            )
+        )
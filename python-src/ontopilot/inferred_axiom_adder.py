@@ -20,28 +20,38 @@
 # Python imports.
 from __future__ import unicode_literals
 import os.path
+import sys
+import hashlib
+import time
+import threading
+import Queue
 from ontopilot import logger
 from basictimer import BasicTimer
 from tablereaderfactory import TableReaderFactory
 from tablereader import TableRowError
 from ontopilot import TRUE_STRS
+from reasoner_manager import AUTO_REASONER, REASONER_LIMIT_EXCEPTIONS
+from reasoner_manager import hasNominals
 
 # Java imports.
-from java.util import HashSet
+from java.util import HashSet, Collections
 from java.lang import UnsupportedOperationException
+from java.lang.reflect import Proxy, InvocationHandler
+from java.lang.reflect import InvocationTargetException
+from org.semanticweb.owlapi.reasoner import OWLReasoner, InferenceType
 from org.semanticweb.owlapi.model import IRI
 from org.semanticweb.owlapi.model.parameters import Imports as ImportsEnum
+from org.semanticweb.owlapi.model.parameters import AxiomAnnotations
 from org.semanticweb.owlapi.util import InferredSubClassAxiomGenerator
 from org.semanticweb.owlapi.util import InferredEquivalentClassAxiomGenerator
 from org.semanticweb.owlapi.util import InferredSubDataPropertyAxiomGenerator
 from org.semanticweb.owlapi.util import InferredSubObjectPropertyAxiomGenerator
 from org.semanticweb.owlapi.util import InferredClassAssertionAxiomGenerator
 from org.semanticweb.owlapi.util import InferredDisjointClassesAxiomGenerator
-from org.semanticweb.owlapi.util import InferredOntologyGenerator
 from org.semanticweb.owlapi.util import InferredInverseObjectPropertiesAxiomGenerator
 from org.semanticweb.owlapi.util import InferredPropertyAssertionGenerator
 from org.semanticweb.owlapi.model import AxiomType
-from org.semanticweb.owlapi.model.parameters import Imports
+from org.semanticweb.owlapi.model import OWLOntologyChangeListener
 
 
 # Strings for identifying supported types of inferences for generating inferred
@@ -52,6 +62,29 @@ INFERENCE_TYPES = (
     'property values'
 )
 
+# The inference types that are supported by ELK.  If ELK was selected
+# automatically but other inference types are requested, HermiT is used
+# instead.
+ELK_INFERENCE_TYPES = ('subclasses', 'equivalent classes', 'types')
+
+# The reasoner inference types that are precomputed before running the axiom
+# generators for each supported type of inference in parallel.
+PRECOMPUTED_INFERENCES = {
+    'subclasses': (InferenceType.CLASS_HIERARCHY,),
+    'equivalent classes': (InferenceType.CLASS_HIERARCHY,),
+    'disjoint classes': (
+        InferenceType.CLASS_HIERARCHY, InferenceType.DISJOINT_CLASSES
+    ),
+    'subdata properties': (InferenceType.DATA_PROPERTY_HIERARCHY,),
+    'subobject properties': (InferenceType.OBJECT_PROPERTY_HIERARCHY,),
+    'inverse object properties': (InferenceType.OBJECT_PROPERTY_HIERARCHY,),
+    'types': (InferenceType.CLASS_HIERARCHY, InferenceType.CLASS_ASSERTIONS),
+    'property values': (
+        InferenceType.OBJECT_PROPERTY_ASSERTIONS,
+        InferenceType.DATA_PROPERTY_ASSERTIONS
+    )
+}
+
 
 class ExcludedTypeSpecError(TableRowError):
     """
@@ -68,6 +101,109 @@ class ExcludedTypeSpecError(TableRowError):
         RuntimeError.__init__(self, new_msg)
 
 
+class _FilteredClassAssertionAxiomGenerator(
+    InferredClassAssertionAxiomGenerator
+):
+    """
+    An InferredClassAssertionAxiomGenerator that does not generate class
+    assertions for excluded types, so that excluded assertions are dropped as
+    soon as they are produced instead of being collected and filtered later.
+    """
+    def __init__(self, excluded_iris):
+        """
+        excluded_iris: A Java set of the IRIs of the excluded classes.
+        """
+        InferredClassAssertionAxiomGenerator.__init__(self)
+        self.excluded_iris = excluded_iris
+
+    def addAxioms(self, entity, reasoner, dataFactory, result, *args):
+        for owlclass in reasoner.getTypes(entity, False).getFlattened():
+            if not(self.excluded_iris.contains(owlclass.getIRI())):
+                result.add(
+                    dataFactory.getOWLClassAssertionAxiom(owlclass, entity)
+                )
+
+
+class _TBoxChangeCounter(OWLOntologyChangeListener):
+    """
+    Counts the ontology changes that can affect the inferred class hierarchy,
+    so that results that only depend on the class hierarchy can be reused as
+    long as the count does not change.  Changes to imports and to logical
+    axioms other than ABox axioms are always counted.  ABox axioms can only
+    affect the class hierarchy if the ontology uses nominals (ObjectOneOf or
+    ObjectHasValue class expressions), so changes to ABox axioms are only
+    counted once any logical axiom in the imports closure contains a nominal.
+    """
+    def __init__(self, owlont):
+        """
+        owlont: The OWL API ontology whose imports closure is checked for
+            nominals.
+        """
+        self.owlont = owlont
+        self.count = 0
+        self.uses_nominals = self._findNominals()
+
+    def _findNominals(self):
+        """
+        Returns True if any logical axiom in the imports closure contains a
+        nominal.
+        """
+        for axiom in self.owlont.getAxioms(ImportsEnum.INCLUDED):
+            if axiom.isLogicalAxiom() and hasNominals(axiom):
+                return True
+
+        return False
+
+    def ontologiesChanged(self, changes):
+        changed = False
+        imports_changed = False
+
+        for change in changes:
+            if change.isImportChange():
+                changed = imports_changed = True
+            elif change.isAxiomChange():
+                axiom = change.getAxiom()
+                if not(axiom.isLogicalAxiom()):
+                    continue
+
+                if (
+                    not(self.uses_nominals) and change.isAddAxiom() and
+                    hasNominals(axiom)
+                ):
+                    self.uses_nominals = True
+
+                if self.uses_nominals or not(
+                    axiom.isOfType(AxiomType.ABoxAxiomTypes)
+                ):
+                    changed = True
+
+        # Newly imported ontologies might contain nominals.
+        if imports_changed and not(self.uses_nominals):
+            self.uses_nominals = self._findNominals()
+
+        if changed:
+            self.count += 1
+
+
+class _SynchronizedReasonerHandler(InvocationHandler):
+    """
+    An invocation handler for a dynamic proxy of an OWLReasoner that forwards
+    each method call to the reasoner while holding a lock.  OWL API reasoners
+    are not thread-safe, so this allows several threads to share a single
+    reasoner.
+    """
+    def __init__(self, reasoner):
+        self.reasoner = reasoner
+        self.lock = threading.Lock()
+
+    def invoke(self, proxy, method, args):
+        with self.lock:
+            try:
+                return method.invoke(self.reasoner, args)
+            except InvocationTargetException as err:
+                raise err.getCause()
+
+
 class InferredAxiomAdder:
     """
     Provides a high-level interface for generating inferred axioms and adding
@@ -83,37 +219,152 @@ class InferredAxiomAdder:
         'http://www.geneontology.org/formats/oboInOwl#is_inferred'
     )
 
+    # The maximum number of materialized inverse property assertions that are
+    # added to the ontology in a single change.
+    INVERSE_BATCH_SIZE = 10000
+
     # Required fields (i.e., keys) for excluded types files.
     ETF_REQUIRED_COLS = ('ID', 'Exclude superclasses')
 
     # Excluded types file fields for which no warnings are issued if the field
     # is missing.
-    ETF_OPTIONAL_COLS = ('Ignore',)
+    ETF_OPTIONAL_COLS = ('Ignore', 'Exclude subclasses')
 
     # Default values for table columns in excluded types files.
     ETF_DEFAULT_COL_VALS = {}
 
-    def __init__(self, ontology, reasoner_str):
+    def __init__(self, ontology, reasoner_str, buffering=False):
         """
         sourceont: The ontology on which to run the reasoner and for which to
             add inferred axioms.
         reasoner_str: A string indicating the type of reasoner to use.
+        buffering (optional): If True, use a buffering reasoner that is only
+            synchronized with the ontology after each batch of ontology
+            changes.  See ReasonerManager.
         """
         self.ont = ontology
+        self.buffering = buffering
         self.setReasoner(reasoner_str)
 
-        # A set of OWL API ontology class objects that correspond with types
-        # that should be excluded from inferred type/class assertions.
-        self.excluded_types = set()
+        # A Java set of the IRIs of the types that should be excluded from
+        # inferred type/class assertions, the reasoner state for which the set
+        # was computed, and a digest of the set.
+        self.excluded_iris = HashSet()
+        self.excluded_state = None
+        self.excluded_digest = ''
+
+        # The excluded types specifications loaded from an excluded types
+        # file, as a list of (OWL API class, exclude class, exclude
+        # superclasses, exclude subclasses) tuples.  Superclasses and
+        # subclasses are only resolved when inferred axioms are generated, so
+        # that cached reasoning results can be used.
+        self.excluded_specs = []
+
+        # Tracks changes to the TBox while excluded types are loaded.  See
+        # dispose().
+        self.tbox_changes = None
+
+        # An optional ReasoningCache for reusing the results of previous
+        # reasoner runs.
+        self.cache = None
+
+        # The number of threads to use for running axiom generators.
+        self.threadcnt = 1
+
+        # If not None, a dictionary that maps class IRI strings to the IRI
+        # strings of their direct superclasses.  If available, this is used
+        # instead of querying the reasoner for the class hierarchy.
+        self.superclasses = None
 
     def setReasoner(self, reasoner_str):
         """
         Sets the reasoner type to use for generating inferred axioms.
 
-        reasoner_str: A string indicating the type of reasoner to use.
+        reasoner_str: A string indicating the type of reasoner to use, or
+            "auto" to select a reasoner automatically.
+        """
+        rman = self.ont.getReasonerManager()
+
+        self.auto_reasoner = reasoner_str.lower().strip() == AUTO_REASONER
+        self.reasoner_str = rman.resolveReasonerName(reasoner_str)
+
+        self.reasoner = rman.getReasoner(self.reasoner_str, self.buffering)
+        self.superclasses = None
+
+    def setReasoningCache(self, cache):
+        """
+        Sets a cache for reasoning results.  If the logical axioms of the
+        ontology are unchanged since the results were cached (e.g., because
+        only annotations were edited), the cached inferred axioms and class
+        hierarchy are used instead of running the reasoner.
+
+        cache: A ReasoningCache, or None to disable caching.
+        """
+        self.cache = cache
+
+    def setInferenceThreads(self, threadcnt):
+        """
+        Sets the maximum number of threads to use for generating inferred
+        axioms.  If more than one thread is used, the reasoner first
+        precomputes all required inferences, and then the axiom generators
+        for the different inference types run concurrently.
+
+        threadcnt: The maximum number of threads.
+        """
+        self.threadcnt = max(1, threadcnt)
+
+    def _getSuperClasses(self, owlclass, direct):
+        """
+        Returns a set of the named superclasses of a class.  If a cached class
+        hierarchy is available, it is used instead of the reasoner.
+
+        owlclass: An OWL API class object.
+        direct: If True, only return the direct superclasses.
+        """
+        if self.superclasses is None:
+            return set(
+                self.reasoner.getSuperClasses(owlclass, direct).getFlattened()
+            )
+
+        # Classes that are not in the cached hierarchy do not occur in any
+        # logical axioms, so their only superclass is owl:Thing.
+        thingstr = self.ont.df.getOWLThing().getIRI().toString()
+        default = [thingstr]
+
+        pending = [owlclass.getIRI().toString()]
+        if pending[0] == thingstr:
+            default = []
+        found = set()
+        while len(pending) > 0:
+            iristr = pending.pop()
+            for superstr in self.superclasses.get(iristr, default):
+                if superstr not in found:
+                    found.add(superstr)
+                    if not(direct):
+                        pending.append(superstr)
+            default = []
+
+        return set([
+            self.ont.df.getOWLClass(IRI.create(foundstr)) for foundstr in found
+        ])
+
+    def _getClassHierarchy(self):
         """
-        self.reasoner_str = reasoner_str
-        self.reasoner = self.ont.getReasonerManager().getReasoner(reasoner_str)
+        Queries the reasoner for the direct superclasses of every class in the
+        ontology and its imports closure and returns the results as a
+        dictionary that maps class IRI strings to lists of the IRI strings of
+        their direct superclasses.
+        """
+        superclasses = {}
+
+        owlont = self.ont.getOWLOntology()
+        for classobj in owlont.getClassesInSignature(ImportsEnum.INCLUDED):
+            supersset = self.reasoner.getSuperClasses(classobj, True).getFlattened()
+            superclasses[classobj.getIRI().toString()] = sorted([
+                superclass.getIRI().toString() for superclass in supersset
+            ])
+
+        return superclasses
 
     def _getGeneratorsList(self, inference_types):
         """
@@ -212,7 +463,14 @@ class InferredAxiomAdder:
                 try:
                     testent = self.ont.df.getOWLNamedIndividual(IRI.create('test'))
                     self.reasoner.getTypes(testent, True)
-                    generators.append(InferredClassAssertionAxiomGenerator())
+                    if self.excluded_iris.isEmpty():
+                        generators.append(InferredClassAssertionAxiomGenerator())
+                    else:
+                        generators.append(
+                            _FilteredClassAssertionAxiomGenerator(
+                                self.excluded_iris
+                            )
+                        )
                 except UnsupportedOperationException as err:
                     logger.warning(
                         'The reasoner "{0}" does not support class assertion '
@@ -241,6 +499,143 @@ class InferredAxiomAdder:
 
         return generators
 
+    def _precomputeInferences(self, inference_types):
+        """
+        Has the reasoner precompute all inferences needed for generating a set
+        of inference types that the reasoner supports, so that the ontology
+        is classified only once before the axiom generators run.
+
+        inference_types: A list of inference type strings.
+        """
+        supported = self.reasoner.getPrecomputableInferenceTypes()
+
+        precompute = []
+        for inference_type in inference_types:
+            for reasoner_inftype in PRECOMPUTED_INFERENCES.get(inference_type, ()):
+                if (
+                    supported.contains(reasoner_inftype) and
+                    reasoner_inftype not in precompute
+                ):
+                    precompute.append(reasoner_inftype)
+
+        if len(precompute) > 0:
+            self.reasoner.precomputeInferences(*precompute)
+
+    def _runGenerator(self, generator, reasoner):
+        """
+        Runs an axiom generator and returns a tuple containing a Java set of
+        the generated axioms and the elapsed time, in seconds.
+
+        generator: An OWL API InferredAxiomGenerator.
+        reasoner: The reasoner for the generator.
+        """
+        starttime = time.time()
+        axioms = generator.createAxioms(self.ont.df, reasoner)
+
+        return (axioms, time.time() - starttime)
+
+    def _generatorWorker(self, jobqueue, reasoner, results, errors):
+        """
+        The main function for axiom generator worker threads.
+        """
+        while True:
+            try:
+                index, generator = jobqueue.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                results[index] = self._runGenerator(generator, reasoner)
+            except:
+                # Catch everything, including Java exceptions, so that the
+                # error can be reported by the main thread.
+                errors.append(sys.exc_info())
+
+    def _generateInferredAxioms(self, generators, inference_types):
+        """
+        Runs a list of axiom generators and returns a Java set of all of the
+        generated axioms.  If more than one thread is allowed, the ontology is
+        classified once and the generators then run concurrently, sharing a
+        synchronized reasoner.  In either case, the results of the generators
+        are merged in the order of the generators list, and the time taken by
+        each generator is reported.
+
+        generators: A list of OWL API InferredAxiomGenerators.
+        inference_types: The inference type strings for the generators.
+        """
+        threadcnt = min(self.threadcnt, len(generators))
+
+        if threadcnt > 1:
+            self._precomputeInferences(inference_types)
+
+            reasoner = Proxy.newProxyInstance(
+                self.reasoner.getClass().getClassLoader(), [OWLReasoner],
+                _SynchronizedReasonerHandler(self.reasoner)
+            )
+
+            jobqueue = Queue.Queue()
+            for index, generator in enumerate(generators):
+                jobqueue.put((index, generator))
+
+            results = [None] * len(generators)
+            errors = []
+            workers = []
+            for cnt in range(threadcnt):
+                worker = threading.Thread(
+                    target=self._generatorWorker,
+                    args=(jobqueue, reasoner, results, errors)
+                )
+                worker.start()
+                workers.append(worker)
+
+            for worker in workers:
+                worker.join()
+
+            if len(errors) > 0:
+                exc_type, exc_value, exc_tb = errors[0]
+                raise exc_type, exc_value, exc_tb
+        else:
+            results = [
+                self._runGenerator(generator, self.reasoner)
+                for generator in generators
+            ]
+
+        axioms = HashSet()
+        for generator, (genaxioms, elapsed) in zip(generators, results):
+            logger.info(
+                'Generated {0} inferred axioms for "{1}" in {2:.3g} '
+                's.'.format(genaxioms.size(), generator.getLabel(), elapsed)
+            )
+            axioms.addAll(genaxioms)
+
+        return axioms
+
+    def _getTaxonomyFromAxioms(self, subclass_axioms):
+        """
+        Builds the inferred class taxonomy from the "subclass of" axioms
+        generated by an InferredSubClassAxiomGenerator, which contain an axiom
+        for each direct superclass of every class.  Returns a dictionary that
+        maps class IRI strings to sorted lists of the IRI strings of their
+        direct superclasses, in the same format as _getClassHierarchy(), but
+        without any further reasoner calls.
+
+        subclass_axioms: A collection of inferred "subclass of" axioms.
+        """
+        taxonomy = {}
+
+        for axiom in subclass_axioms:
+            subclass = axiom.getSubClass()
+            superclass = axiom.getSuperClass()
+            if not(subclass.isAnonymous()) and not(superclass.isAnonymous()):
+                taxonomy.setdefault(
+                    subclass.asOWLClass().getIRI().toString(), []
+                ).append(superclass.asOWLClass().getIRI().toString())
+
+        for supers in taxonomy.itervalues():
+            supers.sort()
+
+        return taxonomy
+
     def _getRedundantSubclassOfAxioms(self, owlont):
         """
         Returns a set of all "subclass of" axioms in an ontology that are
@@ -251,130 +646,285 @@ class InferredAxiomAdder:
         situation can easily arise after inferred "subclass of" axioms are
         added to an ontology.
 
+        The direct superclass edges of the inferred taxonomy are the
+        transitive reduction of the class hierarchy, so an asserted edge
+        between named classes is redundant if it is not one of them.  The
+        taxonomy is built only once (see _getTaxonomyFromAxioms()), so this
+        does not require any per-class reasoner calls.
+
         owlont: An OWL API ontology object.
         """
+        taxonomy = self.superclasses
+        if taxonomy is None:
+            taxonomy = self._getClassHierarchy()
+
+        # Convert the taxonomy to sets of direct superclasses for fast lookups.
+        direct_supers = {}
+        for iristr, supers in taxonomy.iteritems():
+            direct_supers[iristr] = frozenset(supers)
+
         redundants = set()
 
-        for classobj in owlont.getClassesInSignature():
-            # Get the set of direct superclasses for this class.
-            supersset = self.reasoner.getSuperClasses(classobj, True).getFlattened()
+        # Examine each "subclass of" axiom with named classes.  If the
+        # superclass asserted in an axiom is not a direct superclass, then the
+        # axiom can be considered redundant.  Classes that are not in the
+        # taxonomy are left alone.
+        for axiom in owlont.getAxioms(AxiomType.SUBCLASS_OF):
+            subclass = axiom.getSubClass()
+            superclass = axiom.getSuperClass()
+            if subclass.isAnonymous() or superclass.isAnonymous():
+                continue
 
-            # Examine each "subclass of" axiom for this class.  If the
-            # superclass asserted in an axiom is not a direct superclass, then
-            # the axiom can be considered redundant.
-            axioms = owlont.getSubClassAxiomsForSubClass(classobj)
-            for axiom in axioms:
-                superclass = axiom.getSuperClass()
-                if not(superclass.isAnonymous()):
-                    if not(supersset.contains(superclass.asOWLClass())):
-                        redundants.add(axiom)
+            supers = direct_supers.get(subclass.asOWLClass().getIRI().toString())
+            if supers is None:
+                continue
+
+            if superclass.asOWLClass().getIRI().toString() not in supers:
+                redundants.add(axiom)
 
         return redundants
 
+    def _getInverseProperties(self):
+        """
+        Returns a dictionary that maps each object property expression that
+        has an inverse (including symmetric properties, which are their own
+        inverses) to a list of its inverse property expressions.
+        """
+        owlont = self.ont.getOWLOntology()
+
+        inverses = {}
+        for ont in owlont.getImportsClosure():
+            for axiom in ont.getAxioms(AxiomType.INVERSE_OBJECT_PROPERTIES):
+                pexp1 = axiom.getFirstProperty()
+                pexp2 = axiom.getSecondProperty()
+                inverses.setdefault(pexp1, set()).add(pexp2)
+                inverses.setdefault(pexp2, set()).add(pexp1)
+
+            for axiom in ont.getAxioms(AxiomType.SYMMETRIC_OBJECT_PROPERTY):
+                pexp = axiom.getProperty()
+                inverses.setdefault(pexp, set()).add(pexp)
+
+        return dict([
+            (prop_exp, list(invs)) for prop_exp, invs in inverses.iteritems()
+        ])
+
     def _addInversePropAssertions(self):
         """
         Finds inverse property pairs in the ontology (including symmetric
         properties) and all property assertions and negative property
         assertions using those properties, then materializes the inverse
-        property assertions.  This is all done without using a reasoner.
+        property assertions.  This is all done without using a reasoner.  The
+        assertions are retrieved from the OWL API's index of referencing
+        axioms, one property at a time, instead of copying all assertions.
+        Inverses are only generated for the assertions that existed before
+        this method was called, so the new assertions are collected until all
+        properties have been scanned.  Inverse assertions that already exist
+        are skipped, and the new assertions are then added in batches of at
+        most INVERSE_BATCH_SIZE axioms.  Returns the number of new assertions.
         """
         owlont = self.ont.getOWLOntology()
+        df = self.ont.df
 
-        # Use a pair of dictionaries to create a bi-directional lookup table
-        # for inverse property pairs.
-        inverses_1 = {}
-        inverses_2 = {}
+        # The factory methods for the inverses of each type of assertion.
+        creators = {
+            AxiomType.OBJECT_PROPERTY_ASSERTION:
+                df.getOWLObjectPropertyAssertionAxiom,
+            AxiomType.NEGATIVE_OBJECT_PROPERTY_ASSERTION:
+                df.getOWLNegativeObjectPropertyAssertionAxiom
+        }
+
+        # The ontology is not changed while the properties are scanned, so
+        # the indexed axioms can be iterated over directly.
+        newaxioms = HashSet()
+        for pexp, inv_pexps in self._getInverseProperties().iteritems():
+            prop = pexp.getNamedProperty()
+
+            for ont in owlont.getImportsClosure():
+                for axiom in ont.getReferencingAxioms(prop):
+                    create = creators.get(axiom.getAxiomType())
+                    if create is None or not(axiom.getProperty().equals(pexp)):
+                        continue
 
-        # Use a set to store symmetric properties.
-        symmetrics = set()
+                    for inv_pexp in inv_pexps:
+                        inv_axiom = create(
+                            inv_pexp, axiom.getObject(), axiom.getSubject()
+                        )
+                        if not(owlont.containsAxiom(
+                            inv_axiom, ImportsEnum.INCLUDED,
+                            AxiomAnnotations.IGNORE_AXIOM_ANNOTATIONS
+                        )):
+                            newaxioms.add(inv_axiom)
 
-        # Retrieve all inverse object property axioms and symmetric property
-        # axioms from this ontology and its imports closure.
-        inv_axioms = set()
-        symm_axioms = set()
-        for ont in owlont.getImportsClosure():
-            inv_axioms.update(
-                ont.getAxioms(AxiomType.INVERSE_OBJECT_PROPERTIES)
-            )
-            symm_axioms.update(
-                ont.getAxioms(AxiomType.SYMMETRIC_OBJECT_PROPERTY)
-            )
+        batch = HashSet()
+        for axiom in newaxioms:
+            batch.add(axiom)
+            if batch.size() >= self.INVERSE_BATCH_SIZE:
+                self.ont.ontman.addAxioms(owlont, batch)
+                batch = HashSet()
 
-        for axiom in inv_axioms:
-            pexp1 = axiom.getFirstProperty()
-            pexp2 = axiom.getSecondProperty()
+        self.ont.ontman.addAxioms(owlont, batch)
 
-            inverses_1[pexp1] = pexp2
-            inverses_2[pexp2] = pexp1
+        return newaxioms.size()
 
-        for axiom in symm_axioms:
-            symmetrics.add(axiom.getProperty())
+    def _getSubClassMap(self):
+        """
+        Inverts the cached class hierarchy and returns a dictionary that maps
+        class IRI strings to lists of the IRI strings of their direct
+        subclasses.  Returns None if no cached class hierarchy is available.
+        """
+        if self.superclasses is None:
+            return None
 
-        # Retrieve all object property assertions and negative object property
-        # assertions from this ontology and its imports closure.
-        pa_axioms = set()
-        npa_axioms = set()
-        for ont in owlont.getImportsClosure():
-            pa_axioms.update(
-                ont.getAxioms(AxiomType.OBJECT_PROPERTY_ASSERTION)
-            )
-            npa_axioms.update(
-                ont.getAxioms(AxiomType.NEGATIVE_OBJECT_PROPERTY_ASSERTION)
+        subclass_map = {}
+        for iristr, superstrs in self.superclasses.iteritems():
+            for superstr in superstrs:
+                subclass_map.setdefault(superstr, []).append(iristr)
+
+        return subclass_map
+
+    def _getSubClasses(self, owlclass, subclass_map=None):
+        """
+        Returns a set of all named subclasses of a class, not including
+        owl:Nothing.  If a cached class hierarchy is available, it is used
+        instead of the reasoner.
+
+        owlclass: An OWL API class object.
+        subclass_map (optional): The result of _getSubClassMap(), so that the
+            cached hierarchy does not need to be inverted again for each
+            call.
+        """
+        nothing = self.ont.df.getOWLNothing()
+
+        if self.superclasses is None:
+            subclasses = set(
+                self.reasoner.getSubClasses(owlclass, False).getFlattened()
             )
+            subclasses.discard(nothing)
+            return subclasses
 
-        # Materialize all inverse object property assertions.
-        new_axioms = set()
-        for axiom in pa_axioms:
-            pexp = axiom.getProperty()
-            inv_pexp = None
-
-            if pexp in inverses_1:
-                inv_pexp = inverses_1[pexp]
-            elif pexp in inverses_2:
-                inv_pexp = inverses_2[pexp]
-            elif pexp in symmetrics:
-                inv_pexp = pexp
-
-            if inv_pexp is not None:
-                new_axioms.add(
-                    self.ont.df.getOWLObjectPropertyAssertionAxiom(
-                        inv_pexp, axiom.getObject(), axiom.getSubject()
-                    )
-                )
+        if subclass_map is None:
+            subclass_map = self._getSubClassMap()
 
-        self.ont.ontman.addAxioms(owlont, new_axioms)
-
-        # Do the same thing for all negative object property assertions.
-        new_axioms.clear()
-        for axiom in npa_axioms:
-            pexp = axiom.getProperty()
-            inv_pexp = None
-
-            if pexp in inverses_1:
-                inv_pexp = inverses_1[pexp]
-            elif pexp in inverses_2:
-                inv_pexp = inverses_2[pexp]
-            elif pexp in symmetrics:
-                inv_pexp = pexp
-
-            if inv_pexp is not None:
-                new_axioms.add(
-                    self.ont.df.getOWLNegativeObjectPropertyAssertionAxiom(
-                        inv_pexp, axiom.getObject(), axiom.getSubject()
-                    )
-                )
+        pending = [owlclass.getIRI().toString()]
+        found = set()
+        while len(pending) > 0:
+            for substr in subclass_map.get(pending.pop(), ()):
+                if substr not in found:
+                    found.add(substr)
+                    pending.append(substr)
+
+        found.discard(nothing.getIRI().toString())
 
-        self.ont.ontman.addAxioms(owlont, new_axioms)
+        return set([
+            self.ont.df.getOWLClass(IRI.create(foundstr)) for foundstr in found
+        ])
 
     def _getExcludedTypesFromFile(self, etfpath):
         """
         Parses a tabular data file containing information about the classes to
-        exclude from inferred type/class assertions and returns a set of all
-        classes (represented as OWL API class objects) referenced in the file.
+        exclude from inferred type/class assertions and returns a Java set of
+        the IRIs of all classes referenced in the file.
+
+        etfpath: The path of a tabular data file.
+        """
+        return self._expandExcludedTypes(self._readExcludedTypeSpecs(etfpath))
+
+    def _expandExcludedTypes(self, excluded_specs):
+        """
+        Returns a Java set of the IRIs of all classes referenced by a list of
+        excluded types specifications, including superclasses and subclasses,
+        if requested.
+
+        excluded_specs: A list of (OWL API class, exclude class, exclude
+            superclasses, exclude subclasses) tuples.
+        """
+        excluded_iris = HashSet()
+
+        # Only invert the cached class hierarchy once for all specifications.
+        subclass_map = None
+        if any(spec[3] for spec in excluded_specs):
+            subclass_map = self._getSubClassMap()
+
+        for spec in excluded_specs:
+            owlclass, exclude_class, exclude_supers, exclude_subs = spec
+            if exclude_class:
+                excluded_iris.add(owlclass.getIRI())
+
+            if exclude_supers:
+                for superclass in self._getSuperClasses(owlclass, False):
+                    excluded_iris.add(superclass.getIRI())
+
+            if exclude_subs:
+                for subclass in self._getSubClasses(owlclass, subclass_map):
+                    excluded_iris.add(subclass.getIRI())
+
+        return excluded_iris
+
+    def _getExcludedSpecsKey(self):
+        """
+        Returns a string that identifies the loaded excluded types
+        specifications.
+        """
+        specstrs = sorted([
+            '{0} {1} {2} {3}'.format(owlclass.getIRI(), ex_class, supers, subs)
+            for owlclass, ex_class, supers, subs in self.excluded_specs
+        ])
+
+        return hashlib.sha1(
+            '\n'.join(specstrs).encode('utf-8')
+        ).hexdigest()[:12]
+
+    def _updateExcludedTypes(self, axhash):
+        """
+        Makes sure that self.excluded_iris is up to date for the current
+        reasoner state.  The excluded types only depend on the class
+        hierarchy, so they are only computed again if the TBox has changed
+        since they were last computed (or if changes are no longer tracked;
+        see dispose()).  If a reasoning cache is used, the results are also
+        reused across runs.
+
+        axhash: The logical axioms hash of the ontology, or None if no
+            reasoning cache is used.
+        """
+        state = None
+        if self.tbox_changes is not None:
+            state = (self.reasoner_str, self.tbox_changes.count)
+            if state == self.excluded_state:
+                return
+
+        specs_key = self._getExcludedSpecsKey()
+        iristrs = None
+        if self.cache is not None:
+            iristrs = self.cache.getExcludedTypes(
+                axhash, self.reasoner_str, specs_key
+            )
+
+        if iristrs is not None:
+            excluded_iris = HashSet([IRI.create(iristr) for iristr in iristrs])
+        else:
+            excluded_iris = self._expandExcludedTypes(self.excluded_specs)
+            iristrs = sorted([iri.toString() for iri in excluded_iris])
+            if self.cache is not None:
+                self.cache.storeExcludedTypes(
+                    axhash, self.reasoner_str, specs_key, iristrs
+                )
+
+        self.excluded_iris = excluded_iris
+        self.excluded_state = state
+        self.excluded_digest = hashlib.sha1(
+            '\n'.join(iristrs).encode('utf-8')
+        ).hexdigest()[:12]
+
+    def _readExcludedTypeSpecs(self, etfpath):
+        """
+        Parses a tabular data file containing information about the classes to
+        exclude from inferred type/class assertions and returns a list of
+        (OWL API class, exclude class, exclude superclasses) tuples.  This
+        does not require running the reasoner.
 
         etfpath: The path of a tabular data file.
         """
-        exctypes = set()
+        excluded_specs = []
 
         with TableReaderFactory(etfpath) as reader:
             # Read the terms to import from each table in the input file, add
@@ -397,20 +947,14 @@ class InferredAxiomAdder:
                             'closure.'.format(row['ID']), row
                         )
     
-                    owlclass = ontclass.getOWLAPIObj()
+                    excluded_specs.append((
+                        ontclass.getOWLAPIObj(),
+                        row['Exclude class'].lower() in TRUE_STRS,
+                        row['Exclude superclasses'].lower() in TRUE_STRS,
+                        row['Exclude subclasses'].lower() in TRUE_STRS
+                    ))
 
-                    if row['Exclude class'].lower() in TRUE_STRS:
-                        exctypes.add(owlclass)
-
-                    if row['Exclude superclasses'].lower() in TRUE_STRS:
-                        supersset = self.reasoner.getSuperClasses(
-                            owlclass, False
-                        ).getFlattened()
-
-                        for superclass in supersset:
-                            exctypes.add(superclass)
-
-        return exctypes
+        return excluded_specs
 
     def loadExcludedTypes(self, etfpath):
         """
@@ -427,30 +971,95 @@ class InferredAxiomAdder:
                 'Could not find the excluded types file "' + etfpath + '".'
             )
 
-        self.excluded_types.clear()
-        self.excluded_types.update(self._getExcludedTypesFromFile(etfpath))
+        # Only read the file now; superclasses and subclasses of the excluded
+        # types are resolved when the inferred axioms are generated.
+        excluded_specs = self._readExcludedTypeSpecs(etfpath)
 
-    def _getExcludedTypeAssertions(self, owlont):
+        # Replace any previously loaded specifications, along with the
+        # change tracking for them.
+        self.dispose()
+        self.excluded_specs = excluded_specs
+
+        if len(self.excluded_specs) > 0:
+            self.tbox_changes = _TBoxChangeCounter(self.ont.getOWLOntology())
+            self.ont.ontman.addOntologyChangeListener(self.tbox_changes)
+
+    def dispose(self):
+        """
+        Stops tracking changes to the ontology for the loaded excluded types
+        specifications by removing the change listener from the ontology
+        manager.  This should be called once this InferredAxiomAdder is no
+        longer needed, because the ontology manager otherwise keeps notifying
+        (and referencing) it.  The InferredAxiomAdder can still be used
+        afterwards, but the excluded types are then computed again for each
+        run.
         """
-        Returns the set of type assertion axioms in owlont that reference types
-        in self.excluded_types.
+        if self.tbox_changes is not None:
+            self.ont.ontman.removeOntologyChangeListener(self.tbox_changes)
+            self.tbox_changes = None
 
-        owlont: An OWL API ontology object.
+        self.excluded_iris = HashSet()
+        self.excluded_state = None
+        self.excluded_digest = ''
+
+    def _getFinalInferredAxioms(self, axioms, oldaxioms, annotate):
         """
-        excluded_axioms = set()
+        Filters and transforms a set of inferred axioms in a single pass and
+        returns a Java set of the axioms that should be merged into the main
+        ontology.  Axioms that are explicitly stated in the source ontology
+        (or its imports closure), trivial axioms (e.g., subclass of
+        owl:Thing, etc.), and class/type assertions that reference types in
+        self.excluded_iris are dropped, and the remaining axioms are
+        annotated to mark them as inferred, if requested.
+
+        axioms: A Java collection of inferred axioms.
+        oldaxioms: A Java set of the axioms in the ontology prior to reasoning.
+        annotate: If True, annotate the axioms to mark them as inferred.
+        """
+        df = self.ont.df
 
-        axioms = owlont.getAxioms(AxiomType.CLASS_ASSERTION, Imports.INCLUDED)
+        trivial_entities = HashSet([
+            df.getOWLThing(), df.getOWLNothing(),
+            df.getOWLTopDataProperty(), df.getOWLTopObjectProperty(),
+            df.getOWLBottomDataProperty(), df.getOWLBottomObjectProperty()
+        ])
+
+        # All annotated axioms can share a single annotation set.
+        annots = None
+        if annotate:
+            annotprop = df.getOWLAnnotationProperty(self.INFERRED_ANNOT_IRI)
+            annots = HashSet([
+                df.getOWLAnnotation(annotprop, df.getOWLLiteral('true'))
+            ])
+
+        final_axioms = HashSet()
         for axiom in axioms:
-            cexp = axiom.getClassExpression()
-            if not(cexp.isAnonymous()):
-                if cexp.asOWLClass() in self.excluded_types:
-                    excluded_axioms.add(axiom)
+            if oldaxioms.contains(axiom):
+                continue
+
+            if not(Collections.disjoint(axiom.getSignature(), trivial_entities)):
+                continue
 
-        return excluded_axioms
+            if axiom.getAxiomType() == AxiomType.CLASS_ASSERTION:
+                cexp = axiom.getClassExpression()
+                if (
+                    not(cexp.isAnonymous()) and
+                    self.excluded_iris.contains(cexp.asOWLClass().getIRI())
+                ):
+                    continue
+
+            if annots is not None:
+                axiom = axiom.getAnnotatedAxiom(annots)
+
+            final_axioms.add(axiom)
+
+        return final_axioms
 
     def addInferredAxioms(self, inference_types, annotate=False, add_inverses=False):
         """
-        Runs a reasoner on this ontology and adds the inferred axioms.
+        Runs a reasoner on this ontology and adds the inferred axioms.  If the
+        reasoner exceeds the limits set with
+        ReasonerManager.setReasonerLimits(), a ReasonerLimitError is raised.
 
         inference_types: A list of strings specifying the kinds of inferred
             axioms to generate.  Valid values are detailed in the sample
@@ -462,25 +1071,64 @@ class InferredAxiomAdder:
             must be used (e.g., for runtime considerations) on an ontology with
             inverse property axioms.
         """
+        try:
+            self._addInferredAxioms(inference_types, annotate, add_inverses)
+        except REASONER_LIMIT_EXCEPTIONS as err:
+            raise self.ont.getReasonerManager().getLimitError(
+                err, self.reasoner
+            )
+
+    def _addInferredAxioms(self, inference_types, annotate, add_inverses):
+        """
+        Implements addInferredAxioms().
+        """
         timer = BasicTimer()
 
         owlont = self.ont.getOWLOntology()
         ontman = self.ont.ontman
-        df = self.ont.df
         oldaxioms = owlont.getAxioms(ImportsEnum.INCLUDED)
+        rman = self.ont.getReasonerManager()
+        start_sync_time = rman.getSyncTime()
+
+        # ELK is only selected automatically if it is complete for the
+        # ontology, but it does not support all inference types.
+        if self.auto_reasoner and self.reasoner_str == 'elk':
+            unsupported = [
+                inference_type for inference_type in inference_types
+                if inference_type not in ELK_INFERENCE_TYPES
+            ]
+            if len(unsupported) > 0:
+                logger.info(
+                    'Using the HermiT reasoner instead of ELK because ELK '
+                    'does not support the inference types "{0}".'.format(
+                        '", "'.join(unsupported)
+                    )
+                )
+                self.setReasoner('hermit')
+                self.auto_reasoner = True
 
         if add_inverses:
             logger.info(
                 'Generating inverse property assertions...'
             )
             timer.start()
-            self._addInversePropAssertions()
+            newcnt = self._addInversePropAssertions()
             logger.info(
-                'Inverse property assertions generated in {0} s.'.format(
-                    timer.stop()
-                )
+                '{0} new inverse property assertions generated in {1} '
+                's.'.format(newcnt, timer.stop())
             )
 
+        # A buffering reasoner must process all pending changes, including
+        # changes made before this call and any new inverse property
+        # assertions, before it is queried.
+        rman.flushReasoners()
+
+        # If we have a reasoning cache, identify the current logical state of
+        # the ontology so that results from previous runs can be reused.
+        axhash = None
+        if self.cache is not None:
+            axhash = self.cache.getLogicalAxiomsHash(self.ont)
+
         # Make sure that the ontology is consistent; otherwise, all inference
         # attempts will fail.
         logger.info(
@@ -488,7 +1136,17 @@ class InferredAxiomAdder:
         )
         timer.start()
 
-        entcheck_res = self.ont.checkEntailmentErrors(self.reasoner_str)
+        # Use the same reasoner for the check as for generating the inferred
+        # axioms, but only change the buffering mode of the ontology's shared
+        # ReasonerManager for the duration of the check.
+        prev_buffering = rman.isBufferingMode()
+        rman.setBufferingMode(self.buffering)
+        try:
+            entcheck_res = self.ont.checkEntailmentErrors(
+                self.reasoner_str, self.cache, axhash
+            )
+        finally:
+            rman.setBufferingMode(prev_buffering)
         logger.info('Consistency check completed in {0} s.'.format(timer.stop()))
 
         if not(entcheck_res['is_consistent']):
@@ -503,22 +1161,81 @@ class InferredAxiomAdder:
 
         # The general approach is to first get the set of all axioms in the
         # ontology prior to reasoning so that this set can be used for
-        # de-duplication later.  Then, inferred axioms are added to a new
-        # ontology.  This makes it easy to compare explicit and inferred
-        # axioms and to annotate inferred axioms.  Trivial axioms are removed
-        # from the inferred axiom set, and the inferred axioms are merged into
-        # the main ontology.
+        # de-duplication later.  Then, the inferred axioms are generated as a
+        # separate set.  Explicit, trivial, and excluded axioms are filtered
+        # out of the inferred axiom set and the remaining axioms are annotated
+        # in a single pass, and the results are merged into the main ontology
+        # with a single change.
 
         logger.info(
             'Generating inferred axioms...'
         )
         timer.start()
 
-        generators = self._getGeneratorsList(inference_types)
-        iog = InferredOntologyGenerator(self.reasoner, generators)
+        # Any class hierarchy from a previous run might be out of date.
+        self.superclasses = None
+
+        if self.cache is not None:
+            self.superclasses = self.cache.getClassHierarchy(
+                axhash, self.reasoner_str
+            )
+        hierarchy_cached = self.superclasses is not None
+
+        # Resolve the excluded types before generating the inferred axioms,
+        # so that excluded class/type assertions are dropped as they are
+        # generated.
+        if 'types' in inference_types and len(self.excluded_specs) > 0:
+            self._updateExcludedTypes(axhash)
+
+        cached_axioms = None
+        if self.cache is not None:
+            cached_axioms = self.cache.getInferredAxioms(
+                axhash, self.reasoner_str, inference_types,
+                self.excluded_digest
+            )
 
-        inferredont = ontman.createOntology()
-        iog.fillOntology(self.ont.df, inferredont)
+        if cached_axioms is not None:
+            inferred_axioms = cached_axioms
+            logger.info(
+                'The logical axioms are unchanged since the inferred axioms '
+                'were last generated; using the cached inferred axioms.'
+            )
+        else:
+            generators = self._getGeneratorsList(inference_types)
+            inferred_axioms = self._generateInferredAxioms(
+                generators, inference_types
+            )
+
+            if self.cache is not None:
+                self.cache.storeInferredAxioms(
+                    axhash, self.reasoner_str, inference_types,
+                    inferred_axioms, self.excluded_digest
+                )
+
+        # Get the class hierarchy, if it is needed for cleaning up the
+        # inferred axioms and it was not cached.  If the inferred subclass
+        # axioms were generated, they already contain the complete taxonomy.
+        if self.superclasses is None and 'subclasses' in inference_types:
+            taxonomy = self._getTaxonomyFromAxioms([
+                axiom for axiom in inferred_axioms
+                if axiom.getAxiomType() == AxiomType.SUBCLASS_OF
+            ])
+            if len(taxonomy) > 0:
+                self.superclasses = taxonomy
+
+        needs_hierarchy = 'subclasses' in inference_types or (
+            'types' in inference_types and len(self.excluded_specs) > 0
+        )
+        if (
+            self.cache is not None and needs_hierarchy and
+            not(hierarchy_cached)
+        ):
+            if self.superclasses is None:
+                self.superclasses = self._getClassHierarchy()
+
+            self.cache.storeClassHierarchy(
+                axhash, self.reasoner_str, self.superclasses
+            )
 
         logger.info('Inferred axioms generated in {0} s.'.format(timer.stop()))
 
@@ -528,54 +1245,32 @@ class InferredAxiomAdder:
         )
         timer.start()
 
-        # Delete axioms in the inferred set that are explicitly stated in the
-        # source ontology (or its imports closure).
-        delaxioms = HashSet()
-        for axiom in inferredont.getAxioms():
-            if oldaxioms.contains(axiom):
-                delaxioms.add(axiom)
-        ontman.removeAxioms(inferredont, delaxioms)
-
-        # Delete trivial axioms (e.g., subclass of owl:Thing, etc.).
-        trivial_entities = [
-            df.getOWLThing(), df.getOWLNothing(),
-            df.getOWLTopDataProperty(), df.getOWLTopObjectProperty(),
-            df.getOWLBottomDataProperty(), df.getOWLBottomObjectProperty()
-        ]
-        delaxioms.clear()
-        for axiom in inferredont.getAxioms():
-            for trivial_entity in trivial_entities:
-                if axiom.containsEntityInSignature(trivial_entity):
-                    delaxioms.add(axiom)
-                    break
-        ontman.removeAxioms(inferredont, delaxioms)
-
-        # Find and remove excluded class/type assertions.  This is only
-        # necessary if we added inferred class assertions.
-        if 'types' in inference_types:
-            excluded = self._getExcludedTypeAssertions(inferredont)
-            ontman.removeAxioms(inferredont, excluded)
-
-        if annotate:
-            # Annotate all of the inferred axioms.
-            annotprop = df.getOWLAnnotationProperty(self.INFERRED_ANNOT_IRI)
-            annotval = df.getOWLLiteral('true')
-            for axiom in inferredont.getAxioms():
-                annot = df.getOWLAnnotation(annotprop, annotval)
-                newaxiom = axiom.getAnnotatedAxiom(HashSet([annot]))
-                ontman.removeAxiom(inferredont, axiom)
-                ontman.addAxiom(inferredont, newaxiom)
-
-        # Merge the inferred axioms into the main ontology.
-        ontman.addAxioms(owlont, inferredont.getAxioms())
+        # Filter and annotate the inferred axioms, then merge them into the
+        # main ontology.
+        ontman.addAxioms(
+            owlont,
+            self._getFinalInferredAxioms(inferred_axioms, oldaxioms, annotate)
+        )
 
         # Find and remove redundant "subclass of" axioms.  This is only
-        # necessary if we inferred the class hierarchy.
+        # necessary if we inferred the class hierarchy.  The merged axioms
+        # were all entailed by the ontology, so a buffering reasoner does not
+        # need to process them before it is queried for the class hierarchy.
         if 'subclasses' in inference_types:
             redundants = self._getRedundantSubclassOfAxioms(owlont)
-            ontman.removeAxioms(owlont, redundants)
+            ontman.removeAxioms(owlont, HashSet(redundants))
 
         logger.info(
             'Axiom clean up and merge completed in {0} s.'.format(timer.stop())
         )
 
+        # Synchronize buffering reasoners with all of the merged and removed
+        # axioms in a single batch.
+        rman.flushReasoners()
+        if self.buffering:
+            logger.info(
+                'Reasoner re-synchronization took {0:.3g} s in total.'.format(
+                    rman.getSyncTime() - start_sync_time
+                )
+            )
+
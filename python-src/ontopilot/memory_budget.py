@@ -0,0 +1,103 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a simple mechanism for throttling concurrent, memory-intensive
+# tasks (e.g., loading several large source ontologies at once) so that their
+# combined estimated memory use stays within a fixed budget.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+import threading
+
+# Java imports.
+
+
+class MemoryBudget:
+    """
+    Tracks the estimated memory reserved by concurrently running tasks.
+    Threads call reserve() with an estimate of the memory a task will need
+    before starting the task, which blocks until enough of the budget is
+    available, and call release() with the same amount when the task is
+    finished.  A reservation is always granted if no memory is currently
+    reserved, even if it exceeds the total budget, so that a single large
+    task can never block forever.
+    """
+    def __init__(self, budget):
+        """
+        budget: The total amount of memory available to tasks.  The units are
+            up to client code, but must be consistent across all calls.
+        """
+        self.budget = budget
+        self.reserved = 0
+        self.cond = threading.Condition()
+
+    def getBudget(self):
+        """
+        Returns the total amount of memory available to tasks.
+        """
+        return self.budget
+
+    def getReserved(self):
+        """
+        Returns the amount of memory currently reserved.
+        """
+        with self.cond:
+            return self.reserved
+
+    def canReserve(self, amount):
+        """
+        Returns True if a reservation of the given amount would be granted
+        immediately; returns False otherwise.
+        """
+        with self.cond:
+            return self._canReserve(amount)
+
+    def _canReserve(self, amount):
+        """
+        The internal implementation of canReserve().  The caller must hold
+        self.cond.
+        """
+        return self.reserved == 0 or self.reserved + amount <= self.budget
+
+    def reserve(self, amount):
+        """
+        Reserves memory from the budget, waiting until enough memory is
+        available, if necessary.
+
+        amount: The estimated amount of memory required.
+        """
+        with self.cond:
+            while not(self._canReserve(amount)):
+                self.cond.wait()
+
+            self.reserved += amount
+
+    def release(self, amount):
+        """
+        Returns previously reserved memory to the budget and wakes up any
+        threads that are waiting to reserve memory.
+
+        amount: The amount of memory to release.  This should be the same
+            amount that was passed to reserve().
+        """
+        with self.cond:
+            self.reserved -= amount
+            if self.reserved < 0:
+                self.reserved = 0
+
+            self.cond.notifyAll()
+
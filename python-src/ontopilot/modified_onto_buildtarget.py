@@ -23,6 +23,7 @@ from ontology import Ontology
 from buildtarget import BuildTargetWithConfig
 from onto_buildtarget import OntoBuildTarget
 from inferred_axiom_adder import InferredAxiomAdder
+from reasoning_cache import getProjectReasoningCache
 
 # Java imports.
 
@@ -33,7 +34,9 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
     compiled ontology.  In this case, "modified" means either with imports
     merged into the main ontology, with inferred axioms added, or both.
     """
-    def __init__(self, args, cfgfile_required=True, config=None):
+    def __init__(
+        self, args, cfgfile_required=True, config=None, ontobuildtarget=None
+    ):
         """
         args: A "struct" of configuration options (typically, parsed
             command-line arguments).  The required members are 'merge_imports'
@@ -41,13 +44,20 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
             'config_file' (string).
         cfgfile_required (optional): Whether a config file is required.
         config (optional): An OntoConfig object.
+        ontobuildtarget (optional): An OntoBuildTarget object to use as the
+            source of the compiled ontology.  This allows several modified
+            ontology targets to share a single compiled ontology target.  If
+            not provided, a new OntoBuildTarget will be created.
         """
         BuildTargetWithConfig.__init__(self, args, cfgfile_required, config)
 
         self.mergeimports = args.merge_imports
         self.prereason = args.reason
 
-        self.obt = OntoBuildTarget(args, False, self.config)
+        if ontobuildtarget is not None:
+            self.obt = ontobuildtarget
+        else:
+            self.obt = OntoBuildTarget(args, False, self.config)
 
         # If we have nothing to do, then there are no dependencies.
         if self.mergeimports or self.prereason:
@@ -73,6 +83,16 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
                 'exist: {0}.'.format(destdir)
             )
 
+    def getTargetKey(self):
+        """
+        Extends the default target key with the ontology modification
+        settings, because targets that merge or reason differently are not
+        interchangeable.
+        """
+        return BuildTargetWithConfig.getTargetKey(self) + (
+            self.mergeimports, self.prereason
+        )
+
     def getOntoBuildTarget(self):
         """
         Returns the instance of OntoBuildTarget on which this build target
@@ -136,14 +156,23 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
     def _run(self):
         """
         Runs the build process and produces a new, modified version of the main
-        OWL ontology file.
+        OWL ontology file.  The modified ontology is also returned as a build
+        product, keyed by the path of the output file.
         """
         timer = BasicTimer()
         timer.start()
 
         self._retrieveAndCheckFilePaths()
 
-        mainont = Ontology(self.obt.getOutputFilePath())
+        # If the compiled ontology was built as part of this build run, use a
+        # copy of the in-memory ontology rather than parsing the file again.
+        # We need to work on a copy because the compiled ontology might also
+        # be used by other build targets.
+        rawpath = self.obt.getOutputFilePath()
+        if rawpath in self.products:
+            mainont = self.products[rawpath].getCopy()
+        else:
+            mainont = Ontology(rawpath)
 
         if self.mergeimports:
             # Merge the axioms from each imported ontology directly into this
@@ -161,12 +190,24 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
             inf_types = self.config.getInferenceTypeStrs()
             annotate_inferred = self.config.getAnnotateInferred()
             preprocess_inverses = self.config.getPreprocessInverses()
-            iaa = InferredAxiomAdder(mainont, self.config.getReasonerStr())
+            mainont.getReasonerManager().setReasonerLimits(
+                self.config.getReasonerTimeout(),
+                self.config.getReasonerMaxMemory()
+            )
+            iaa = InferredAxiomAdder(
+                mainont, self.config.getReasonerStr(),
+                self.config.getBufferingReasoner()
+            )
+            iaa.setReasoningCache(getProjectReasoningCache(self.config))
+            iaa.setInferenceThreads(self.config.getInferenceThreads())
             if self.config.getExcludedTypesFile() != '':
                 iaa.loadExcludedTypes(self.config.getExcludedTypesFile())
-            iaa.addInferredAxioms(
-                inf_types, annotate_inferred, preprocess_inverses
-            )
+            try:
+                iaa.addInferredAxioms(
+                    inf_types, annotate_inferred, preprocess_inverses
+                )
+            finally:
+                iaa.dispose()
 
         fileoutpath = self.getOutputFilePath()
 
@@ -191,3 +232,5 @@ class ModifiedOntoBuildTarget(BuildTargetWithConfig):
             )
         )
 
+        return {fileoutpath: mainont}
+
@@ -39,13 +39,28 @@ class _ExtractMethods:
     LOCALITY = 0
     # Extract single entities without any other axioms (except annotations).
     SINGLE = 1
+    # The BOT syntactic locality extraction method.
+    LOCALITY_BOT = 2
+    # The TOP syntactic locality extraction method.
+    LOCALITY_TOP = 3
 
     # Combine all supported methods in a single tuple.
-    all_methods = (LOCALITY, SINGLE)
+    all_methods = (LOCALITY, SINGLE, LOCALITY_BOT, LOCALITY_TOP)
+
+    # Map the syntactic locality methods to OWL API module types.
+    locality_methods = (LOCALITY, LOCALITY_BOT, LOCALITY_TOP)
+    module_types = {
+        LOCALITY: ModuleType.STAR,
+        LOCALITY_BOT: ModuleType.BOT,
+        LOCALITY_TOP: ModuleType.TOP
+    }
 
     # Define string values that map to the extraction methods.
     strings = {
         'locality': LOCALITY,
+        'locality-star': LOCALITY,
+        'locality-bot': LOCALITY_BOT,
+        'locality-top': LOCALITY_TOP,
         'single': SINGLE
     }
 
@@ -144,6 +159,385 @@ class _RelatedAxiomTypes:
 rel_axiom_types = _RelatedAxiomTypes()
 
 
+class RelationshipIndex:
+    """
+    An adjacency index of the relationships among the entities in an ontology
+    and its imports closure.  The index is built in a single pass over the
+    relevant axioms in the imports closure, after which all direct
+    relationship lookups are simple dictionary lookups, so traversals of the
+    entity graph (e.g., retrieving all descendants of a high-level class) do
+    not need to repeatedly search the ontology.  Lookups return exactly the
+    same entity and axiom sets as ModuleExtractor's non-indexed searches with
+    include_imports = True.
+
+    The index is built the first time it is used and is not updated if the
+    source ontology is modified afterwards, so it should only be used with
+    ontologies that do not change during extraction (e.g., source ontologies
+    for import modules).  A single index can be shared by all
+    ModuleExtractor instances that use the same source ontology.
+    """
+    def __init__(self, ontology_source):
+        """
+        ontology_source: An instance of ontopilot.Ontology.
+        """
+        self.ontology = ontology_source
+        self.owlont = self.ontology.getOWLOntology()
+
+        # Maps each entity to a dictionary that maps related axiom type
+        # constants to a tuple containing 1) the set of directly related
+        # entities, and 2) the set of axioms that define the relationships.
+        self.adjacency = None
+
+    def isBuilt(self):
+        """
+        Returns True if the index has been built.
+        """
+        return self.adjacency is not None
+
+    def buildIndex(self):
+        """
+        Builds (or rebuilds) the index from the current contents of the source
+        ontology and its imports closure.
+        """
+        self.adjacency = {}
+
+        # Each handler processes all axioms of a given type, so every relevant
+        # axiom in the imports closure is examined only once.
+        handlers = (
+            (AxiomType.SUBCLASS_OF, self._indexSubClassAxiom),
+            (AxiomType.EQUIVALENT_CLASSES, self._indexEquivClassesAxiom),
+            (AxiomType.DISJOINT_CLASSES, self._indexDisjointClassesAxiom),
+            (AxiomType.SUB_OBJECT_PROPERTY, self._indexSubPropertyAxiom),
+            (AxiomType.SUB_DATA_PROPERTY, self._indexSubPropertyAxiom),
+            (
+                AxiomType.SUB_ANNOTATION_PROPERTY_OF,
+                self._indexSubPropertyAxiom
+            ),
+            (AxiomType.OBJECT_PROPERTY_DOMAIN, self._indexDomainAxiom),
+            (AxiomType.DATA_PROPERTY_DOMAIN, self._indexDomainAxiom),
+            (AxiomType.OBJECT_PROPERTY_RANGE, self._indexObjPropRangeAxiom),
+            (AxiomType.DATA_PROPERTY_RANGE, self._indexDataPropRangeAxiom),
+            (
+                AxiomType.INVERSE_OBJECT_PROPERTIES,
+                self._indexInversePropsAxiom
+            ),
+            (
+                AxiomType.EQUIVALENT_OBJECT_PROPERTIES,
+                self._indexEquivPropsAxiom
+            ),
+            (AxiomType.EQUIVALENT_DATA_PROPERTIES, self._indexEquivPropsAxiom),
+            (
+                AxiomType.DISJOINT_OBJECT_PROPERTIES,
+                self._indexDisjointPropsAxiom
+            ),
+            (AxiomType.DISJOINT_DATA_PROPERTIES, self._indexDisjointPropsAxiom),
+            (AxiomType.CLASS_ASSERTION, self._indexClassAssertionAxiom),
+            (
+                AxiomType.OBJECT_PROPERTY_ASSERTION,
+                self._indexObjPropAssertionAxiom
+            ),
+            (
+                AxiomType.NEGATIVE_OBJECT_PROPERTY_ASSERTION,
+                self._indexObjPropAssertionAxiom
+            ),
+            (
+                AxiomType.DATA_PROPERTY_ASSERTION,
+                self._indexDataPropAssertionAxiom
+            ),
+            (
+                AxiomType.NEGATIVE_DATA_PROPERTY_ASSERTION,
+                self._indexDataPropAssertionAxiom
+            )
+        )
+
+        for ont in self.owlont.getImportsClosure():
+            for axiom_type, handler in handlers:
+                for axiom in ont.getAxioms(axiom_type):
+                    handler(axiom)
+
+    def _addRelationship(self, entity, rel_type, related_entity, axiom):
+        """
+        Adds a single relationship to the index.
+
+        entity: The OWL API OWLEntity object from which the relationship is
+            retrieved.
+        rel_type: A related axiom type constant.
+        related_entity: The related OWL API OWLEntity object, or None if the
+            relationship only contributes an axiom.
+        axiom: The axiom that defines the relationship.
+        """
+        if entity not in self.adjacency:
+            self.adjacency[entity] = {}
+        relationships = self.adjacency[entity]
+
+        if rel_type not in relationships:
+            relationships[rel_type] = (set(), set())
+        entset, axiomset = relationships[rel_type]
+
+        if related_entity is not None:
+            entset.add(related_entity)
+        axiomset.add(axiom)
+
+    def _indexSubClassAxiom(self, axiom):
+        sub_ce = axiom.getSubClass()
+        super_ce = axiom.getSuperClass()
+        if not(sub_ce.isAnonymous()) and not(super_ce.isAnonymous()):
+            sub_class = sub_ce.asOWLClass()
+            super_class = super_ce.asOWLClass()
+            self._addRelationship(
+                sub_class, rel_axiom_types.ANCESTORS, super_class, axiom
+            )
+            self._addRelationship(
+                super_class, rel_axiom_types.DESCENDANTS, sub_class, axiom
+            )
+
+    def _indexEquivClassesAxiom(self, rawaxiom):
+        # Only examine pairwise axioms so we don't add axioms with unnamed
+        # class expressions.
+        for axiom in rawaxiom.asPairwiseAxioms():
+            namedclasses = list(axiom.getNamedClasses())
+            for namedclass in namedclasses:
+                for otherclass in namedclasses:
+                    if not(otherclass.equals(namedclass)):
+                        self._addRelationship(
+                            namedclass, rel_axiom_types.EQUIVALENTS,
+                            otherclass, axiom
+                        )
+
+    def _indexDisjointClassesAxiom(self, rawaxiom):
+        # Only examine pairwise axioms so we don't add axioms with unnamed
+        # class expressions.
+        for axiom in rawaxiom.asPairwiseAxioms():
+            namedclasses = [
+                cexp.asOWLClass() for cexp in axiom.getClassExpressions()
+                if not(cexp.isAnonymous())
+            ]
+            for namedclass in namedclasses:
+                for otherclass in namedclasses:
+                    if not(otherclass.equals(namedclass)):
+                        self._addRelationship(
+                            namedclass, rel_axiom_types.DISJOINTS,
+                            otherclass, axiom
+                        )
+
+    def _getNamedProperty(self, pexp):
+        """
+        Returns the named property (an OWL API OWLEntity) for a property
+        expression, or None if the property expression is anonymous.
+        """
+        if isinstance(pexp, OWLObjectPropertyExpression):
+            if pexp.isAnonymous():
+                return None
+            return pexp.asOWLObjectProperty()
+        elif isinstance(pexp, OWLDataPropertyExpression):
+            return pexp.asOWLDataProperty()
+        else:
+            # Annotation properties are always named.
+            return pexp
+
+    def _indexSubPropertyAxiom(self, axiom):
+        sub_prop = self._getNamedProperty(axiom.getSubProperty())
+        super_prop = self._getNamedProperty(axiom.getSuperProperty())
+        if sub_prop is not None and super_prop is not None:
+            self._addRelationship(
+                sub_prop, rel_axiom_types.ANCESTORS, super_prop, axiom
+            )
+            self._addRelationship(
+                super_prop, rel_axiom_types.DESCENDANTS, sub_prop, axiom
+            )
+
+    def _indexDomainAxiom(self, axiom):
+        prop = self._getNamedProperty(axiom.getProperty())
+        cexp = axiom.getDomain()
+        if prop is not None and not(cexp.isAnonymous()):
+            self._addRelationship(
+                prop, rel_axiom_types.DOMAINS,
+                cexp.asOWLClass(), axiom
+            )
+
+    def _indexObjPropRangeAxiom(self, axiom):
+        pexp = axiom.getProperty()
+        cexp = axiom.getRange()
+        if not(pexp.isAnonymous()) and not(cexp.isAnonymous()):
+            self._addRelationship(
+                pexp.asOWLObjectProperty(), rel_axiom_types.RANGES,
+                cexp.asOWLClass(), axiom
+            )
+
+    def _indexDataPropRangeAxiom(self, axiom):
+        # Data ranges are not entities, so only the axiom is retained.
+        self._addRelationship(
+            axiom.getProperty().asOWLDataProperty(), rel_axiom_types.RANGES,
+            None, axiom
+        )
+
+    def _indexNaryPropertyAxiom(self, axiom, rel_type):
+        """
+        Indexes the pairwise relationships among the named properties in an
+        n-ary property axiom.
+        """
+        for pexp in axiom.getProperties():
+            prop = self._getNamedProperty(pexp)
+            if prop is None:
+                continue
+
+            for other_pexp in axiom.getPropertiesMinus(pexp):
+                other_prop = self._getNamedProperty(other_pexp)
+                if other_prop is not None:
+                    self._addRelationship(prop, rel_type, other_prop, axiom)
+
+    def _indexInversePropsAxiom(self, axiom):
+        self._indexNaryPropertyAxiom(axiom, rel_axiom_types.INVERSES)
+
+    def _indexEquivPropsAxiom(self, rawaxiom):
+        # Only examine pairwise axioms so we don't add axioms with unnamed
+        # property expressions.
+        for axiom in rawaxiom.asPairwiseAxioms():
+            self._indexNaryPropertyAxiom(axiom, rel_axiom_types.EQUIVALENTS)
+
+    def _indexDisjointPropsAxiom(self, rawaxiom):
+        # Only examine pairwise axioms so we don't add axioms with unnamed
+        # property expressions.
+        for axiom in rawaxiom.asPairwiseAxioms():
+            self._indexNaryPropertyAxiom(axiom, rel_axiom_types.DISJOINTS)
+
+    def _indexClassAssertionAxiom(self, axiom):
+        indv = axiom.getIndividual()
+        cexp = axiom.getClassExpression()
+        if indv.isNamed() and not(cexp.isAnonymous()):
+            self._addRelationship(
+                indv.asOWLNamedIndividual(), rel_axiom_types.TYPES,
+                cexp.asOWLClass(), axiom
+            )
+
+    def _indexObjPropAssertionAxiom(self, axiom):
+        subj = axiom.getSubject()
+        pexp = axiom.getProperty()
+        obj = axiom.getObject()
+        if subj.isNamed() and not(pexp.isAnonymous()) and obj.isNamed():
+            subj = subj.asOWLNamedIndividual()
+            self._addRelationship(
+                subj, rel_axiom_types.PROPERTY_ASSERTIONS,
+                pexp.asOWLObjectProperty(), axiom
+            )
+            self._addRelationship(
+                subj, rel_axiom_types.PROPERTY_ASSERTIONS,
+                obj.asOWLNamedIndividual(), axiom
+            )
+
+    def _indexDataPropAssertionAxiom(self, axiom):
+        subj = axiom.getSubject()
+        pexp = axiom.getProperty()
+        if subj.isNamed() and not(pexp.isAnonymous()):
+            self._addRelationship(
+                subj.asOWLNamedIndividual(),
+                rel_axiom_types.PROPERTY_ASSERTIONS,
+                pexp.asOWLDataProperty(), axiom
+            )
+
+    def getDirectlyRelatedComponents(self, entity, rel_types):
+        """
+        Gets all entities and axioms that are directly related to the target
+        entity by the specified axiom types.  Returns a tuple containing two
+        sets: 1) A set of all related entities; and 2) a set of axioms that
+        define the relationships.  The index is built first, if needed.
+
+        entity: An OWL API OWLEntity object.
+        rel_types: A set of related axiom type constants.
+        """
+        if not(self.isBuilt()):
+            self.buildIndex()
+
+        entset = set()
+        axiomset = set()
+
+        relationships = self.adjacency.get(entity)
+        if relationships is not None:
+            for rel_type in rel_types:
+                if rel_type in relationships:
+                    rel_entset, rel_axiomset = relationships[rel_type]
+                    entset.update(rel_entset)
+                    axiomset.update(rel_axiomset)
+
+        return (entset, axiomset)
+
+
+class LocalityModuleExtractor:
+    """
+    Extracts syntactic locality modules from a source ontology.  A single OWL
+    API SyntacticLocalityModuleExtractor is created for the source ontology
+    and reused for all extractions, so the extractor's internal axiom data only
+    need to be derived once, no matter how many modules are extracted.  The
+    results of previous extractions are memoized by signature, so extracting
+    a signature that was already extracted (e.g., from an unchanged terms
+    list) reuses the previous module axioms.  As with RelationshipIndex, the
+    source ontology should not be modified while an instance is in use, and a
+    single instance can be shared by all ModuleExtractor instances that use
+    the same source ontology.
+    """
+    def __init__(self, ontology_source):
+        """
+        ontology_source: An instance of ontopilot.Ontology.
+        """
+        self.ontology = ontology_source
+        self.owlont = self.ontology.getOWLOntology()
+
+        # Maps OWL API module types to OWL API extractors.  Each extractor is
+        # created the first time it is needed.
+        self.slmes = {}
+
+        # Maps (module type, frozen signature set) tuples to the extracted
+        # module axioms.
+        self.memo = {}
+
+    def getMemoSize(self):
+        """
+        Returns the number of distinct signatures with memoized modules.
+        """
+        return len(self.memo)
+
+    def clearMemo(self):
+        """
+        Discards all memoized modules.
+        """
+        self.memo.clear()
+
+    def extract(self, signature, module_type=ModuleType.STAR):
+        """
+        Extracts the syntactic locality module for a signature and returns
+        the module axioms as a set.  Client code should not modify the
+        returned set, because it might be reused for later extractions.
+
+        signature: A set of OWL API OWLEntity objects.
+        module_type: An OWL API ModuleType (STAR, BOT, or TOP).
+        """
+        key = (module_type, frozenset(signature))
+
+        if key not in self.memo:
+            if module_type not in self.slmes:
+                self.slmes[module_type] = SyntacticLocalityModuleExtractor(
+                    self.ontology.ontman, self.owlont, module_type
+                )
+
+            self.memo[key] = self.slmes[module_type].extract(set(signature))
+
+        return self.memo[key]
+
+    def extractAll(self, signatures, module_type=ModuleType.STAR):
+        """
+        Extracts the syntactic locality modules for several signatures with
+        the same OWL API extractor.  Each distinct signature is only extracted
+        once.  Returns a list of module axiom sets in the same order as the
+        signatures.
+
+        signatures: A sequence of sets of OWL API OWLEntity objects.
+        module_type: An OWL API ModuleType (STAR, BOT, or TOP).
+        """
+        return [
+            self.extract(signature, module_type) for signature in signatures
+        ]
+
+
 class ModuleExtractor:
     """
     Extracts import "modules" from existing OWL ontologies.  Also includes two
@@ -151,13 +545,27 @@ class ModuleExtractor:
     getDirectlyRelatedComponents().  These methods make it simple to traverse
     the relationships among entities in an ontology.
     """
-    def __init__(self, ontology_source):
+    def __init__(
+        self, ontology_source, rel_index=None, locality_extractor=None
+    ):
         """
-        Initialize this ModuleExtractor instance.  The argument
-        "ontology_source" should be an instance of ontopilot.Ontology.
+        Initialize this ModuleExtractor instance.
+
+        ontology_source: An instance of ontopilot.Ontology.
+        rel_index (optional): A RelationshipIndex for ontology_source.  If
+            provided, entity relationship searches that include the imports
+            closure use the index instead of searching the ontology.  See
+            also useRelationshipIndex().
+        locality_extractor (optional): A LocalityModuleExtractor for
+            ontology_source.  If not provided, a new one is created.
         """
         self.ontology = ontology_source
         self.owlont = self.ontology.getOWLOntology()
+        self.rel_index = rel_index
+
+        if locality_extractor is None:
+            locality_extractor = LocalityModuleExtractor(self.ontology)
+        self.locality_extractor = locality_extractor
 
         # Initialize data structures for holding the extraction signature,
         # axioms that need to be retained, and entities to exclude.
@@ -166,6 +574,22 @@ class ModuleExtractor:
         self.excluded_entities = set()
         self.clearSignatures()
 
+    def useRelationshipIndex(self, rel_index=None):
+        """
+        Configures this ModuleExtractor to use a RelationshipIndex for entity
+        relationship searches.  The source ontology should not be modified
+        while the index is in use.  Returns the index.
+
+        rel_index (optional): A RelationshipIndex for the source ontology.  If
+            not provided, a new index is created.
+        """
+        if rel_index is None:
+            rel_index = RelationshipIndex(self.ontology)
+
+        self.rel_index = rel_index
+
+        return rel_index
+
     def clearSignatures(self):
         """
         Resets all signature sets, the saved axiom set, and the excluded
@@ -187,6 +611,22 @@ class ModuleExtractor:
 
         return sigsize
 
+    def getSignature(self, method):
+        """
+        Returns a copy of the set of entities (as OWL API OWLEntity objects)
+        in the starting module signature for an extraction method.
+
+        method: A module extraction method constant.
+        """
+        return set(self.signatures[method])
+
+    def getExcludedEntities(self):
+        """
+        Returns a copy of the set of entities (as OWL API OWLEntity objects)
+        that will be excluded from the final module.
+        """
+        return set(self.excluded_entities)
+
     def addEntity(self, entity_id, method, rel_types=set()):
         """
         Adds an entity to the module signature.  If rel_types includes one or
@@ -257,16 +697,16 @@ class ModuleExtractor:
         modont = Ontology(self.ontology.ontman.createOntology())
         modont.setOntologyID(mod_iri)
 
-        # Do the syntactic locality extraction.  Only do the extraction if the
+        # Do the syntactic locality extractions.  Only do an extraction if the
         # signature set is non-empty.  The OWL API module extractor will
         # produce a non-empty module even for an empty signature set.
-        if len(self.signatures[methods.LOCALITY]) > 0:
-            slme = SyntacticLocalityModuleExtractor(
-                self.ontology.ontman, self.owlont, ModuleType.STAR
-            )
-            mod_axioms = slme.extract(self.signatures[methods.LOCALITY])
-            for axiom in mod_axioms:
-                modont.addEntityAxiom(axiom)
+        for method in methods.locality_methods:
+            if len(self.signatures[method]) > 0:
+                mod_axioms = self.locality_extractor.extract(
+                    self.signatures[method], methods.module_types[method]
+                )
+                for axiom in mod_axioms:
+                    modont.addEntityAxiom(axiom)
 
         # Do all single-entity extractions.
         self._extractSingleEntities(self.signatures[methods.SINGLE], modont)
@@ -292,63 +732,115 @@ class ModuleExtractor:
 
         return modont
 
+    def extendModule(self, module):
+        """
+        Adds the entities in the single-entity signature and all saved axioms
+        to an existing module, and then removes any entities that should be
+        excluded.  Unlike locality modules, single-entity extraction results
+        do not depend on the rest of the signature, so this produces the same
+        result as extracting a new module from the combined signatures.  The
+        locality signatures must be empty.
+
+        module: An existing module as an ontopilot.Ontology object.
+        """
+        for method in methods.locality_methods:
+            if len(self.signatures[method]) > 0:
+                raise RuntimeError(
+                    'Locality-based extractions cannot be used to extend an '
+                    'existing module.  Please extract a new module instead.'
+                )
+
+        self._extractSingleEntities(self.signatures[methods.SINGLE], module)
+
+        module.addEntityAxioms(self.saved_axioms)
+
+        for ent in self.excluded_entities:
+            module.removeEntity(ent, remove_annotations=True)
+
     def _extractSingleEntities(self, signature, target):
         """
         Extracts entities from the source ontology using the single-entity
         extraction method, which pulls individual entities without any
         associated axioms (except for annotations).  Annotation properties that
         are used to annotate entities in the signature will also be extracted
-        from the source ontology.
+        from the source ontology.  All axioms are collected first and then
+        added to the target ontology in a single batch.
 
         signature: A set of OWL API OWLEntity objects.
         target: The target module ontopilot.Ontology object.
         """
         rdfslabel = self.ontology.df.getRDFSLabel()
+        ontset = self.owlont.getImportsClosure()
+
+        # Get the annotation properties that are declared in the source
+        # ontology and those that are already declared in the target ontology.
+        # Any annotation property that annotates an entity in the signature
+        # and is declared in the source but not the target also needs to be
+        # extracted.
+        source_annotprops = self._getDeclaredAnnotationProperties(ontset)
+        target_annotprops = self._getDeclaredAnnotationProperties(
+            target.getOWLOntology().getImportsClosure()
+        )
+
+        new_axioms = set()
+        entstack = list(signature)
+        processed = set(signature)
+        proptypes = (EntityType.OBJECT_PROPERTY, EntityType.DATA_PROPERTY)
 
-        while len(signature) > 0:
-            owlent = signature.pop()
+        while len(entstack) > 0:
+            owlent = entstack.pop()
 
-            # Get the declaration axiom for this entity and add it to the
-            # target ontology.
-            ontset = self.owlont.getImportsClosure()
+            # Get the declaration and annotation axioms for this entity.
             for ont in ontset:
-                dec_axioms = ont.getDeclarationAxioms(owlent)
-                for axiom in dec_axioms:
-                    target.addEntityAxiom(axiom)
+                new_axioms.update(ont.getDeclarationAxioms(owlent))
 
             # If the current entity is a data or object property, make sure to
             # preserve its characteristics.
-            proptypes = (EntityType.OBJECT_PROPERTY, EntityType.DATA_PROPERTY)
             if owlent.getEntityType() in proptypes:
-                axioms = self._getPropertyCharacteristicsAxioms(owlent, True)
-                for axiom in axioms:
-                    target.addEntityAxiom(axiom)
+                new_axioms.update(
+                    self._getPropertyCharacteristicsAxioms(owlent, True)
+                )
 
-            # Get all annotation axioms for this entity and add them to the
-            # target ontology.
             for ont in ontset:
                 annot_axioms = ont.getAnnotationAssertionAxioms(owlent.getIRI())
+                new_axioms.update(annot_axioms)
 
+                # Check whether the annotation properties used by this entity
+                # need to be extracted, too.  Ignore rdfs:label since it is
+                # always included.  Built-in annotation properties, such as
+                # rdfs:label, will not be in source_annotprops because they
+                # have no declaration axioms.
                 for annot_axiom in annot_axioms:
-                    target.addEntityAxiom(annot_axiom)
+                    annotprop = annot_axiom.getProperty()
+                    if (
+                        annotprop.equals(rdfslabel)
+                        or annotprop in processed
+                        or annotprop in target_annotprops
+                        or annotprop not in source_annotprops
+                    ):
+                        continue
 
-                    # Check if the relevant annotation property is already
-                    # included in the target ontology.  If not, add it to the
-                    # set of terms to extract.
+                    processed.add(annotprop)
+                    entstack.append(annotprop)
 
-                    # Ignore rdfs:label since it is always included.
-                    if annot_axiom.getProperty().equals(rdfslabel):
-                        continue
+        target.addEntityAxioms(new_axioms)
 
-                    prop_iri = annot_axiom.getProperty().getIRI()
+    def _getDeclaredAnnotationProperties(self, ontset):
+        """
+        Returns a set of all annotation properties (as OWL API
+        OWLAnnotationProperty objects) that are declared in a set of
+        ontologies.
 
-                    if target.getExistingAnnotationProperty(prop_iri) is None:
-                        annot_ent = self.ontology.getExistingAnnotationProperty(prop_iri)
-                        # Built-in annotation properties, such as rdfs:label,
-                        # will not "exist" because they have no declaration
-                        # axioms, so we need to check for this.
-                        if annot_ent is not None:
-                            signature.add(annot_ent.getOWLAPIObj())
+        ontset: A collection of OWL API OWLOntology objects.
+        """
+        annotprops = set()
+        for ont in ontset:
+            for axiom in ont.getAxioms(AxiomType.DECLARATION):
+                entity = axiom.getEntity()
+                if entity.isOWLAnnotationProperty():
+                    annotprops.add(entity.asOWLAnnotationProperty())
+
+        return annotprops
 
     def _getAxioms(
         self, axiom_type, entity_type, entity, include_imports,
@@ -487,6 +979,12 @@ class ModuleExtractor:
         rel_types: A set of related axiom type constants.
         include_imports: Whether to search the ontology's imports closure.
         """
+        # The relationship index always covers the imports closure.
+        if self.rel_index is not None and include_imports:
+            return self.rel_index.getDirectlyRelatedComponents(
+                entity, rel_types
+            )
+
         if entity.getEntityType() == EntityType.CLASS:
             return self._getRelComponentsForClass(
                 entity, rel_types, include_imports
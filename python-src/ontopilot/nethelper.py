@@ -23,10 +23,24 @@ import urlparse, httplib
 from ssl import SSLError
 import time
 import socket
+import threading
+import Queue
+import json
+import os.path
 
 # Java imports.
 
 
+# The default name of the file for persistent redirect check results.
+REDIRECT_CACHE_FILE = 'redirect_cache.json'
+
+# The default time, in seconds, for which a cached redirect check is valid.
+DEFAULT_REDIRECT_TTL = 24 * 3600
+
+# The maximum number of idle keep-alive connections to retain for each host.
+MAX_IDLE_CONNECTIONS = 4
+
+
 class ConnectionFailError(RuntimeError):
     """
     Represents exceptions caused by failed HTTP or HTTPS connection attempts.
@@ -41,11 +55,189 @@ class NotFoundError(RuntimeError):
     pass
 
 
+class _ConnectionPool:
+    """
+    Retains idle HTTP and HTTPS connections so that they can be reused (i.e.,
+    HTTP keep-alive), which means that successive requests to the same host
+    do not each need to open a new TCP (and, for HTTPS, SSL) connection.
+    """
+    def __init__(self, max_idle=MAX_IDLE_CONNECTIONS):
+        """
+        max_idle: The maximum number of idle connections to retain per host.
+        """
+        self.max_idle = max_idle
+
+        # Maps (scheme, netloc) tuples to lists of idle connections.
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def getConnection(self, scheme, netloc):
+        """
+        Returns a tuple containing 1) a connection to a host, which is an idle
+        connection from the pool, if one is available, or a new connection;
+        and 2) a boolean that indicates whether the connection was reused.
+
+        scheme: Either 'http' or 'https'.
+        netloc: The host string, which may include a port number.
+        """
+        with self.lock:
+            conns = self.idle.get((scheme, netloc))
+            if conns:
+                return (conns.pop(), True)
+
+        # Note that this will correctly handle non-standard TCP port numbers
+        # specified as part of the URL string (e.g., "http://example.com:8080"),
+        # because they will be included as part of the "netloc" attribute by
+        # urlsplit() and then extracted by the httplib methods.
+        if scheme == 'http':
+            conn = httplib.HTTPConnection(netloc)
+        else:
+            conn = httplib.HTTPSConnection(netloc)
+
+        return (conn, False)
+
+    def releaseConnection(self, scheme, netloc, conn):
+        """
+        Returns a connection to the pool after its response has been read
+        completely.  If the pool for the host is full, the connection is
+        closed.
+        """
+        with self.lock:
+            conns = self.idle.setdefault((scheme, netloc), [])
+            if len(conns) < self.max_idle:
+                conns.append(conn)
+                return
+
+        conn.close()
+
+    def closeAll(self):
+        """
+        Closes all idle connections.
+        """
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+
+            self.idle.clear()
+
+
+class RedirectCache:
+    """
+    Caches the results of redirect checks (see checkForRedirect()).  Each
+    entry maps a source IRI to its final location (or to an empty string if
+    the IRI does not redirect) and expires after a fixed time.  Optionally, the
+    cache can be saved to a JSON file so that the results can be reused by
+    later builds.  Failed checks are never cached.
+    """
+    def __init__(self, cachefile=None, ttl=DEFAULT_REDIRECT_TTL):
+        """
+        cachefile (optional): The path of a file from which to load cached
+            results and to which results will be saved.  If the file's
+            directory does not exist, the results are only kept in memory.
+        ttl (optional): The time, in seconds, for which cached results are
+            valid.  If ttl is 0, nothing is cached.
+        """
+        self.cachefile = cachefile
+        self.ttl = ttl
+
+        # Maps source IRI strings to (final IRI string, timestamp) tuples.
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        if cachefile is not None:
+            self._load()
+
+    def _load(self):
+        """
+        Loads all unexpired results from the cache file.  A missing or invalid
+        cache file is treated as an empty cache.
+        """
+        if not(os.path.isfile(self.cachefile)):
+            return
+
+        try:
+            with open(self.cachefile) as fin:
+                data = json.load(fin)
+
+            now = time.time()
+            for source_iri, (final_iri, timestamp) in data.items():
+                if now - timestamp < self.ttl:
+                    self.entries[source_iri] = (final_iri, timestamp)
+        except (IOError, ValueError, TypeError):
+            self.entries.clear()
+
+    def lookup(self, source_iri):
+        """
+        Returns the cached final location of a source IRI (an empty string
+        means that the IRI does not redirect), or None if there is no valid
+        cached result for the IRI.
+        """
+        with self.lock:
+            entry = self.entries.get(source_iri)
+
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+
+        return entry[0]
+
+    def store(self, source_iri, final_iri):
+        """
+        Caches the result of a redirect check.  The result is not saved to the
+        cache file until save() is called.
+        """
+        with self.lock:
+            self.entries[source_iri] = (final_iri, time.time())
+
+    def save(self):
+        """
+        Saves all cached results to the cache file, if there is one.
+        """
+        if self.cachefile is None:
+            return
+
+        if not(os.path.isdir(os.path.dirname(os.path.abspath(self.cachefile)))):
+            return
+
+        with self.lock:
+            data = dict(
+                (source_iri, list(entry))
+                for source_iri, entry in self.entries.items()
+            )
+            with open(self.cachefile, 'w') as fout:
+                json.dump(data, fout, indent=1)
+
+
+# The pool of keep-alive connections used by httpHEAD().
+_pool = _ConnectionPool()
+
+# The redirect cache used by checkForRedirect().  By default, results are only
+# cached in memory.
+_redirect_cache = RedirectCache()
+
+
+def setRedirectCache(cachefile=None, ttl=DEFAULT_REDIRECT_TTL):
+    """
+    Replaces the redirect cache used by checkForRedirect() with a new cache.
+    Returns the new RedirectCache object.
+
+    cachefile (optional): The path of a file for persisting the results of
+        redirect checks.  If no file is provided, results are only cached in
+        memory.
+    ttl (optional): The time, in seconds, for which cached results are valid.
+    """
+    global _redirect_cache
+
+    _redirect_cache = RedirectCache(cachefile, ttl)
+
+    return _redirect_cache
+
 def httpHEAD(sourceIRI):
     """
     Makes an HTTP HEAD request to sourceIRI and returns the response.  Works
     for either HTTP or HTTPS IRIs.  The response is returned as a standard
-    Python HTTPResponse object.
+    Python HTTPResponse object.  Connections are kept open and reused for
+    later requests to the same host whenever the server allows it.
 
     sourceIRI: A fully expanded IRI as an OWL API IRI object or a string.
     """
@@ -54,6 +246,12 @@ def httpHEAD(sourceIRI):
 
     source_iri = unicode(sourceIRI)
     parts = urlparse.urlsplit(source_iri)
+    scheme = parts.scheme.lower()
+
+    if scheme not in ('http', 'https'):
+        raise ConnectionFailError(
+            'The IRI <{0}> is not an HTTP or HTTPS IRI.'.format(source_iri)
+        )
 
     # Reconstruct the portion of the IRI that comes after the scheme and
     # host string.
@@ -68,36 +266,22 @@ def httpHEAD(sourceIRI):
     # we need to allow for this by wrapping all of the network logic in a
     # loop and waiting a short time on failure before retrying.
     while (retrycnt < MAX_RETRIES) and not(success):
-        try:
-            # Initialize the connection.  Note that this will correctly
-            # handle non-standard TCP port numbers specified as part of the
-            # URL string (e.g., "http://example.com:8080"), because they
-            # will be included as part of the "netloc" attribute by
-            # urlsplit() and then extracted by the httplib methods.
-            if parts.scheme.lower() == 'http':
-                conn = httplib.HTTPConnection(parts.netloc)
-            elif parts.scheme.lower() == 'https':
-                conn = httplib.HTTPSConnection(parts.netloc)
-            else:
-                raise ConnectionFailError(
-                    'The IRI <{0}> is not an HTTP or HTTPS IRI.'.format(
-                        source_iri
-                    )
-                )
+        conn, reused = _pool.getConnection(scheme, parts.netloc)
 
+        try:
             conn.request('HEAD', location_part)
             response = conn.getresponse()
-            conn.close()
-            success = True
 
-            status = int(response.status)
-            if status == 404:
-                raise NotFoundError(
-                    'The resource at <{0}> could not be found.  Please '
-                    'make sure that the IRI is correct.'.format(source_iri)
-                )
+            # HEAD responses have no body, but the response must be read
+            # before the connection can be used for another request.
+            response.read()
+            success = True
 
         except SSLError as err:
+            conn.close()
+            if reused:
+                continue
+
             time.sleep(0.1)
             retrycnt += 1
             if retrycnt == MAX_RETRIES:
@@ -107,33 +291,79 @@ def httpHEAD(sourceIRI):
                     'that the IRI is correct and that an Internet '
                     'connection is available, if needed.'.format(source_iri)
                 )
+        except httplib.HTTPException:
+            conn.close()
+            # A reused connection might have been closed by the server while
+            # it was idle, so retry with a new connection.
+            if reused:
+                continue
+            raise
         except (
             socket.error, socket.herror, socket.gaierror, socket.timeout
         ) as err:
+            conn.close()
+            if reused:
+                continue
+
             raise ConnectionFailError(
                 'Unable to access the resource at <{0}> due to a TCP '
                 'connection error: {1}.'.format(source_iri, unicode(err))
             )
 
+    if response.will_close:
+        conn.close()
+    else:
+        _pool.releaseConnection(scheme, parts.netloc, conn)
+
+    status = int(response.status)
+    if status == 404:
+        raise NotFoundError(
+            'The resource at <{0}> could not be found.  Please '
+            'make sure that the IRI is correct.'.format(source_iri)
+        )
+
     return response
 
+def _isHTTPIRI(iristr):
+    """
+    Returns True if an IRI string uses the HTTP or HTTPS scheme.
+    """
+    return urlparse.urlsplit(iristr).scheme.lower() in ('http', 'https')
+
 def checkForRedirect(sourceIRI):
     """
     Given a source IRI, checks if the IRI is a redirect to an alternative
     location.  Handles multi-step redirects (e.g., the original IRI redirects
     to another IRI, which redirects to another IRI, ...).  If the source IRI is
     a redirect, returns a string containing the IRI of the final document
-    location.  Otherwise, returns an empty string.
+    location.  Otherwise, returns an empty string.  Results are cached (see
+    setRedirectCache()).
 
     sourceIRI: A fully expanded IRI as an OWL API IRI object or a string.
     """
+    source_iri = unicode(sourceIRI)
+    if not(_isHTTPIRI(source_iri)):
+        return ''
+
+    cache = _redirect_cache
+    final_iri = cache.lookup(source_iri)
+    if final_iri is None:
+        final_iri = _resolveRedirect(source_iri)
+        cache.store(source_iri, final_iri)
+        cache.save()
+
+    return final_iri
+
+def _resolveRedirect(source_iri):
+    """
+    Implements the network part of checkForRedirect(), without caching.
+    """
     redirected = False
     status = 300
-    curr_iri = unicode(sourceIRI)
+    curr_iri = source_iri
 
     while (status < 400) and (status >= 300):
-        parts = urlparse.urlsplit(curr_iri)
-        if parts.scheme.lower() in ('http', 'https'):
+        if _isHTTPIRI(curr_iri):
             response = httpHEAD(curr_iri)
         else:
             status = 200
@@ -151,3 +381,48 @@ def checkForRedirect(sourceIRI):
     else:
         return ''
 
+def prefetchRedirects(sourceIRIs, threadcnt):
+    """
+    Checks several IRIs for redirects concurrently and caches the results, so
+    that later calls to checkForRedirect() for these IRIs return immediately.
+    Failed checks are ignored here; the errors will be raised by
+    checkForRedirect() when the failing IRIs are checked again.
+
+    sourceIRIs: A sequence of fully expanded IRIs as OWL API IRI objects or
+        strings.
+    threadcnt: The maximum number of concurrent checks.
+    """
+    cache = _redirect_cache
+
+    pending = Queue.Queue()
+    for source_iri in set([unicode(sourceIRI) for sourceIRI in sourceIRIs]):
+        if _isHTTPIRI(source_iri) and cache.lookup(source_iri) is None:
+            pending.put(source_iri)
+
+    if pending.qsize() == 0:
+        return
+
+    def checkWorker():
+        while True:
+            try:
+                source_iri = pending.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                cache.store(source_iri, _resolveRedirect(source_iri))
+            except:
+                # Errors are reported by checkForRedirect().  A bare except
+                # is needed to also catch Java exceptions.
+                pass
+
+    threads = [
+        threading.Thread(target=checkWorker)
+        for cnt in range(min(max(threadcnt, 1), pending.qsize()))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cache.save()
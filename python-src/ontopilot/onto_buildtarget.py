@@ -29,6 +29,7 @@ from owlontologybuilder import OWLOntologyBuilder, EntityDescriptionError
 from ontopilot import TRUE_STRS
 from buildtarget import BuildTargetWithConfig
 from imports_buildtarget import ImportsBuildTarget
+import nethelper
 
 # Java imports.
 
@@ -220,7 +221,9 @@ class OntoBuildTarget(BuildTargetWithConfig):
 
     def _run(self):
         """
-        Runs the build process and produces a compiled OWL ontology file.
+        Runs the build process and produces a compiled OWL ontology file.  The
+        compiled ontology is also returned as a build product, keyed by the
+        path of the output file.
         """
         # We don't need to run _retrieveAndCheckFilePaths() here because the
         # base class ensures that _isBuildRequired() will always be called
@@ -230,8 +233,8 @@ class OntoBuildTarget(BuildTargetWithConfig):
         timer = BasicTimer()
         timer.start()
 
-        # Get the imports modules IRIs from the imports build target.
-        importsIRIs = [info.iristr for info in self.ibt.getImportsInfo()]
+        # Get the imports modules information from the imports build target.
+        modinfos = self.ibt.getImportsInfo()
 
         fileoutpath = self.getOutputFilePath()
 
@@ -244,9 +247,34 @@ class OntoBuildTarget(BuildTargetWithConfig):
                 self._makeDirs(destdir)
 
         ontbuilder = OWLOntologyBuilder(self.base_ont_path)
+        ontman = ontbuilder.getOntology().getOntologyManager()
+
+        # If any import modules were built as part of this build run, copy
+        # them directly into the new ontology's manager so that the module
+        # files do not need to be parsed again when the imports are loaded.
+        for modinfo in modinfos:
+            if modinfo.filename in self.products:
+                module = self.products[modinfo.filename]
+                modid = module.getOWLOntology().getOntologyID()
+                if not(ontman.contains(modid)):
+                    module.getCopy(ontman, copy_id=True)
+
+        # Check all import IRIs for redirects concurrently, reusing the
+        # results from previous builds, if possible.
+        nethelper.setRedirectCache(
+            os.path.join(
+                self.config.getBuildDir(), nethelper.REDIRECT_CACHE_FILE
+            ),
+            self.config.getRedirectCacheTTL()
+        )
+        ontbuilder.getOntology().prefetchImportRedirects(
+            [modinfo.iristr for modinfo in modinfos],
+            self.config.getImportsBuildThreads()
+        )
+
         # Add an import declaration for each import module.
-        for importIRI in importsIRIs:
-            ontbuilder.getOntology().addImport(importIRI, True)
+        for modinfo in modinfos:
+            ontbuilder.getOntology().addImport(modinfo.iristr, True)
 
         # Process each source file.  In this step, entities and label
         # annotations are defined, but processing of all other axioms (e.g.,
@@ -309,3 +337,5 @@ class OntoBuildTarget(BuildTargetWithConfig):
             'Main ontology build completed in {0} s.\n'.format(timer.stop())
         )
 
+        return {fileoutpath: ontbuilder.getOntology()}
+
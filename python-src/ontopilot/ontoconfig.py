@@ -24,13 +24,15 @@ from rfc3987 import rfc3987
 from ontopilot import logger, TRUE_STRS
 from ontology import OUTPUT_FORMATS
 from inferred_axiom_adder import INFERENCE_TYPES
+from partitioned_inference import DEFAULT_PARTITION_SIZE
 from documentation_writers import DOC_FORMAT_TYPES
 
 # Java imports.
+from java.lang import Runtime
 
 
 # Strings for identifying supported OWL reasoners.
-REASONER_STRS = ('HermiT', 'ELK', 'Pellet', 'JFact')
+REASONER_STRS = ('HermiT', 'ELK', 'Pellet', 'JFact', 'auto')
 
 # The inference types to use by default.
 DEFAULT_INFERENCE_TYPES = (
@@ -480,10 +482,85 @@ class OntoConfig(RawConfigParser):
 
         return suffix
 
+    def _getNonNegativeInt(self, section, option, default):
+        """
+        Retrieves a configuration setting that must be a non-negative integer.
+        If the setting is not configured, the default value is returned.
+        Raises a ConfigError if the setting is not a valid integer.
+        """
+        rawval = self.getCustom(section, option, '')
+        if rawval == '':
+            return default
+
+        try:
+            intval = int(rawval)
+        except ValueError:
+            intval = -1
+
+        if intval < 0:
+            raise ConfigError(
+                'Invalid value for the "{0}" setting in the build '
+                'configuration file: "{1}".  The value must be a non-negative '
+                'integer.'.format(option, rawval)
+            )
+
+        return intval
+
+    def getImportsBuildThreads(self):
+        """
+        Returns the maximum number of import modules to build concurrently.  If
+        this option is not configured (or is 0), the number of processors
+        available to the Java virtual machine is used.
+        """
+        threadcnt = self._getNonNegativeInt('Imports', 'build_threads', 0)
+        if threadcnt == 0:
+            threadcnt = Runtime.getRuntime().availableProcessors()
+
+        return threadcnt
+
+    def getImportsMaxMemory(self):
+        """
+        Returns the maximum amount of memory, in MB, that concurrent import
+        module builds should use.  Returns 0 if this option is not configured,
+        in which case the limit should be determined from the maximum Java heap
+        size.
+        """
+        return self._getNonNegativeInt('Imports', 'max_build_memory', 0)
+
+    def getRedirectCacheTTL(self):
+        """
+        Returns the time, in seconds, for which the results of checking import
+        IRIs for redirects should be cached.  The setting is configured in
+        hours, and the default is 24 hours.  A value of 0 disables caching.
+        """
+        return self._getNonNegativeInt('Imports', 'redirect_cache_ttl', 24) * 3600
+
+    def getIRICatalogFile(self):
+        """
+        Returns the path to the XML catalog file that maps ontology IRIs to
+        local document locations.  Returns an empty string if no catalog file
+        is configured.
+        """
+        pathstr = self.getCustom('Imports', 'catalog_file', '')
+        if pathstr != '':
+            pathstr = self._getAbsPath(pathstr)
+
+            if not(os.path.isfile(pathstr)):
+                raise ConfigError(
+                    'The IRI catalog file ("{0}") could not be found.  Please '
+                    'modify the value of the catalog_file setting in the '
+                    'project configuration file to correct this '
+                    'error.'.format(pathstr)
+                )
+
+        return pathstr
+
     def getReasonerStr(self):
         """
         Returns the string identifying the reasoner to use.  If this option is
-        not configured, use "HermiT" as the default.
+        not configured, use "HermiT" as the default.  The value "auto" means
+        that the reasoner is selected based on the OWL 2 profile of the
+        ontology (see ReasonerManager.selectReasoner()).
         """
         reasoner = self.getCustom('Reasoning', 'reasoner', 'HermiT')
 
@@ -554,6 +631,89 @@ class OntoConfig(RawConfigParser):
 
         return preprocess_inverses.lower() in TRUE_STRS
 
+    def getInferenceThreads(self):
+        """
+        Returns the maximum number of threads to use for generating inferred
+        axioms.  The default is 1.  If this option is 0, the number of
+        processors available to the Java virtual machine is used.
+        """
+        threadcnt = self._getNonNegativeInt('Reasoning', 'inference_threads', 1)
+        if threadcnt == 0:
+            threadcnt = Runtime.getRuntime().availableProcessors()
+
+        return threadcnt
+
+    def getPartitionABox(self):
+        """
+        Returns True if the inference pipeline should reason over connected
+        components of the ABox separately; returns False otherwise.  The
+        default is False.
+        """
+        partition = self.getCustom('Reasoning', 'partition_abox', 'False')
+
+        return partition.lower() in TRUE_STRS
+
+    def getABoxPartitionSize(self):
+        """
+        Returns the maximum number of ABox axioms to combine in a single ABox
+        partition.  If this option is not configured (or is 0), a default
+        value is used.
+        """
+        max_size = self._getNonNegativeInt(
+            'Reasoning', 'abox_partition_size', 0
+        )
+        if max_size == 0:
+            max_size = DEFAULT_PARTITION_SIZE
+
+        return max_size
+
+    def getBufferingReasoner(self):
+        """
+        Returns True if a buffering reasoner should be used to generate
+        inferred axioms; returns False otherwise.  The default is False.
+        """
+        buffering = self.getCustom('Reasoning', 'buffering_reasoner', 'False')
+
+        return buffering.lower() in TRUE_STRS
+
+    def getCacheReasoning(self):
+        """
+        Returns True if the results of running a reasoner should be cached in
+        the build directory and reused when the logical axioms of an ontology
+        have not changed; returns False otherwise.  The default is True.
+        """
+        cache_reasoning = self.getCustom(
+            'Reasoning', 'cache_reasoning', 'True'
+        )
+
+        return cache_reasoning.lower() in TRUE_STRS
+
+    def getReasonerTimeout(self):
+        """
+        Returns the time limit, in seconds, for each reasoning task.  Returns
+        0 if this option is not configured, which means there is no limit.
+        """
+        return self._getNonNegativeInt('Reasoning', 'reasoner_timeout', 0)
+
+    def getReasonerMaxMemory(self):
+        """
+        Returns the maximum Java heap usage, in MB, to allow while a reasoner
+        is running.  Returns 0 if this option is not configured, which means
+        there is no limit other than the maximum Java heap size.
+        """
+        return self._getNonNegativeInt('Reasoning', 'reasoner_max_memory', 0)
+
+    def getTieredEntailmentCheck(self):
+        """
+        Returns True if entailment errors should be checked by first running
+        ELK on the OWL 2 EL axioms of an ontology and then only running the
+        configured reasoner on the part of the ontology that ELK could not
+        decide; returns False otherwise.  The default is False.
+        """
+        tiered = self.getCustom('Reasoning', 'tiered_entailment_check', 'False')
+
+        return tiered.lower() in TRUE_STRS
+
     def getExcludedTypesFile(self):
         """
         Returns the path to a file containing excluded types information.  If
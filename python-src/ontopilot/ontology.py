@@ -26,14 +26,15 @@ from idresolver import IDResolver
 from ontology_entities import _OntologyClass, _OntologyDataProperty
 from ontology_entities import _OntologyObjectProperty, _OntologyAnnotationProperty
 from ontology_entities import _OntologyIndividual, _OntologyEntity
-from reasoner_manager import ReasonerManager
+from reasoner_manager import ReasonerManager, REASONER_LIMIT_EXCEPTIONS
+from entailment_checker import TieredEntailmentChecker
 from observable import Observable
 import nethelper
 
 # Java imports.
 from java.io import File, FileOutputStream, InputStream
 from java.lang import System as JavaSystem
-from java.util import HashSet
+from java.util import HashSet, ArrayList
 from org.semanticweb.owlapi.apibinding import OWLManager
 from org.semanticweb.owlapi.model import IRI, OWLOntologyID
 from org.semanticweb.owlapi.model import AddAxiom, AddImport, RemoveImport
@@ -140,6 +141,54 @@ class Ontology(Observable):
         """
         return self.reasonerman
 
+    def getCopy(self, ontman=None, copy_id=False):
+        """
+        Returns a new Ontology object that contains a copy of this ontology's
+        axioms, ontology annotations, and imports declarations.  The axiom
+        objects themselves are immutable and are shared with this ontology, so
+        copying is much cheaper than re-parsing the ontology document.  This
+        makes it possible for client code to make changes to the copy without
+        affecting this ontology.
+
+        ontman (optional): The OWL API OWLOntologyManager in which to create
+            the copy.  If not provided, this ontology's manager is used, which
+            means that any imports that are already loaded are shared by the
+            copy.
+        copy_id: If True, the copy will have the same ontology ID as this
+            ontology; otherwise, the copy will be anonymous.  Two ontologies
+            with the same ID cannot be managed by the same OWLOntologyManager,
+            so this should only be used with a different manager.
+        """
+        if ontman is None:
+            ontman = self.ontman
+
+        if copy_id:
+            newont = ontman.createOntology(self.ontology.getOntologyID())
+        else:
+            newont = ontman.createOntology()
+
+        ontman.addAxioms(newont, self.ontology.getAxioms())
+
+        for ont_annot in self.ontology.getAnnotations():
+            ontman.applyChange(AddOntologyAnnotation(newont, ont_annot))
+
+        for importsdec in self.ontology.getImportsDeclarations():
+            ontman.applyChange(AddImport(newont, importsdec))
+
+        # Give the copy its own instance of the source document format so that
+        # prefix definitions are preserved when the copy is serialized.
+        iformat = self.ontman.getOntologyFormat(self.ontology)
+        if iformat is not None:
+            newformat = iformat.getClass().newInstance()
+            if (
+                iformat.isPrefixOWLOntologyFormat() and
+                newformat.isPrefixOWLOntologyFormat()
+            ):
+                newformat.copyPrefixesFrom(iformat.asPrefixOWLOntologyFormat())
+            ontman.setOntologyFormat(newont, newformat)
+
+        return Ontology(newont)
+
     def resolveLabel(self, labeltxt):
         """
         Resolves an entity label (either with or without a prefix) to an
@@ -451,6 +500,32 @@ class Ontology(Observable):
         subject.  The argument "owl_axiom" should be an instance of an OWL API
         axiom object.
         """
+        self._checkNewLabel(owl_axiom)
+
+        self.ontman.applyChange(AddAxiom(self.ontology, owl_axiom))
+
+    def addEntityAxioms(self, owl_axioms):
+        """
+        Adds a collection of new entity axioms to this ontology as a single
+        batch of ontology changes, which is much faster than adding the axioms
+        one at a time for large numbers of axioms.  See addEntityAxiom().
+
+        owl_axioms: An iterable of OWL API axiom objects.
+        """
+        changes = ArrayList()
+        for owl_axiom in owl_axioms:
+            self._checkNewLabel(owl_axiom)
+            changes.add(AddAxiom(self.ontology, owl_axiom))
+
+        if changes.size() > 0:
+            self.ontman.applyChanges(changes)
+
+    def _checkNewLabel(self, owl_axiom):
+        """
+        If an axiom that is about to be added to this ontology is an
+        rdfs:label annotation, verifies that the label's subject is an IRI and
+        notifies observers about the new label.
+        """
         if owl_axiom.isOfType(AxiomType.ANNOTATION_ASSERTION):
             if owl_axiom.getProperty().isLabel():
                 labeltxt = owl_axiom.getValue().getLiteral()
@@ -465,8 +540,6 @@ class Ontology(Observable):
                 # Notify observers about the new label.
                 self.notifyObservers('label_added', (labeltxt, subjIRI))
 
-        self.ontman.applyChange(AddAxiom(self.ontology, owl_axiom))
-
     def removeEntity(self, entity, remove_annotations=True):
         """
         Removes an entity from the ontology (including its imports closure).
@@ -552,6 +625,35 @@ class Ontology(Observable):
 
         return importslist
 
+    def _getImportDocumentIRI(self, sourceIRI):
+        """
+        Returns the document IRI for an ontology IRI.  If there is no mapping
+        of the ontology IRI to a document IRI, the ontology IRI is returned.
+
+        sourceIRI: A fully expanded OWL API IRI object.
+        """
+        docIRI = oom_manager.lookupDocumentIRI(self.ontman, sourceIRI)
+        if docIRI is None:
+            docIRI = sourceIRI
+
+        return docIRI
+
+    def prefetchImportRedirects(self, source_iris, threadcnt):
+        """
+        Concurrently checks whether the document IRIs of several imports are
+        redirects, so that later calls to addImport() for these imports do
+        not need to wait for the network.
+
+        source_iris: A sequence of source ontology IRIs.  See addImport().
+        threadcnt: The maximum number of concurrent checks.
+        """
+        dociris = [
+            self._getImportDocumentIRI(self.idr.expandIRI(source_iri))
+            for source_iri in source_iris
+        ]
+
+        nethelper.prefetchRedirects(dociris, threadcnt)
+
     def addImport(self, source_iri, load_import=True):
         """
         Adds an OWL import statement to this ontology.
@@ -567,9 +669,7 @@ class Ontology(Observable):
         owlont = self.getOWLOntology()
 
         # First, check if the ontology IRI maps to a different document IRI.
-        docIRI = oom_manager.lookupDocumentIRI(self.ontman, sourceIRI)
-        if docIRI is None:
-            docIRI = sourceIRI
+        docIRI = self._getImportDocumentIRI(sourceIRI)
         
         # Check if the imported ontology is already included as an import.  If
         # so, there's nothing to do.
@@ -796,7 +896,9 @@ class Ontology(Observable):
             # about the merged ontology.
             self.notifyObservers('ontology_added', (importont,))
 
-    def checkEntailmentErrors(self, reasoner='HermiT'):
+    def checkEntailmentErrors(
+        self, reasoner='HermiT', cache=None, axhash=None, tiered=False
+    ):
         """
         Checks for and reports two common entailment errors: inconsistency and
         incoherence.  Returns a report object that is a dictionary with two
@@ -804,7 +906,64 @@ class Ontology(Observable):
         'unsatisfiable_classes', is a list of all named unsatisfiable classes,
         excluding owl:Nothing.  Note that if an ontology is inconsistent, it is
         generally not possible to infer the unsatisfiable classes, so
-        'unsatisfiable_classes' will always be empty.
+        'unsatisfiable_classes' will always be empty.  If the reasoner exceeds
+        the limits set with ReasonerManager.setReasonerLimits(), a
+        ReasonerLimitError is raised.
+
+        reasoner: The name of the reasoner to use, or "auto" to select a
+            reasoner automatically (see ReasonerManager.selectReasoner()).
+        cache (optional): A ReasoningCache.  If the cache contains results for
+            the logical axioms of this ontology, the reasoner is not run.
+            Otherwise, the new results are stored in the cache.
+        axhash (optional): The hash of the logical axioms of this ontology, as
+            returned by cache.getLogicalAxiomsHash(), if it is already known.
+        tiered (optional): If True, first run ELK on the OWL 2 EL axioms, and
+            then only run the reasoner on the part of the ontology that ELK
+            could not decide.  The results are the same, but usually much
+            faster to obtain for large, mostly-EL ontologies.  See
+            TieredEntailmentChecker.
+        """
+        # Cache the results under the name of the reasoner that is actually
+        # used, even if it was selected automatically.
+        reasoner = self.getReasonerManager().resolveReasonerName(reasoner)
+
+        if cache is not None:
+            if axhash is None:
+                axhash = cache.getLogicalAxiomsHash(self)
+            cached = cache.getEntailmentResults(axhash, reasoner)
+            if cached is not None:
+                logger.info(
+                    'The logical axioms are unchanged since the last '
+                    'entailment check; using the cached results.'
+                )
+                cached['unsatisfiable_classes'] = [
+                    self.df.getOWLClass(IRI.create(iristr))
+                    for iristr in cached['unsatisfiable_classes']
+                ]
+                return cached
+
+        try:
+            if tiered and reasoner != 'elk':
+                report = TieredEntailmentChecker(
+                    self, reasoner
+                ).checkEntailmentErrors()
+            else:
+                report = self._checkEntailmentErrors(reasoner)
+        except REASONER_LIMIT_EXCEPTIONS as err:
+            # Errors of the temporary reasoners of a tiered check are already
+            # converted, so this error was thrown by the managed reasoner.
+            rman = self.getReasonerManager()
+            raise rman.getLimitError(err, rman.getReasoner(reasoner))
+
+        if cache is not None:
+            cache.storeEntailmentResults(axhash, reasoner, report)
+
+        return report
+
+    def _checkEntailmentErrors(self, reasoner):
+        """
+        Runs a reasoner to check for entailment errors.  See
+        checkEntailmentErrors().
         """
         report = {
             'unsatisfiable_classes': []
@@ -17,30 +17,257 @@
 # Manages creation and maintenance of OWL API OWLOntologyManager (OOM) objects.
 # Provides methods for creating new OOM objects and updating the IRI mappings
 # of existing OOM objects.  This allows client code to have distinct OOMs, if
-# needed, while still ensuring that IRI mappings apply system wide.
+# needed, while still ensuring that IRI mappings apply system wide.  IRI
+# mappings can also be loaded from XML catalog files, which makes it possible
+# to resolve imports to local files without any network access.
 #
 
 # Python imports.
 from __future__ import unicode_literals
+import threading
+import os.path
+import urllib, urlparse
+import xml.etree.ElementTree as ET
 
 # Java imports.
-from org.semanticweb.owlapi.util import SimpleIRIMapper
 from org.semanticweb.owlapi.apibinding import OWLManager
+from org.semanticweb.owlapi.model import OWLOntologyIRIMapper, IRI
+
+
+# The XML namespace of OASIS XML catalog files.
+CATALOG_NS = 'urn:oasis:names:tc:entity:xmlns:xml:catalog'
+
+# The XML attribute that sets the base IRI for resolving relative IRIs.
+XML_BASE_ATTR = '{http://www.w3.org/XML/1998/namespace}base'
+
+
+class CatalogError(Exception):
+    """
+    Exception for errors encountered while reading an IRI catalog file.
+    """
+    pass
+
+
+class CatalogIRIMapper(OWLOntologyIRIMapper):
+    """
+    An OWL API IRI mapper that maps ontology IRIs to document IRIs using exact
+    IRI mappings and prefix rewrite rules, in the style of an XML catalog.
+    Exact mappings are stored in a hash table, and prefix rewrite rules are
+    stored in a character trie, so the cost of a lookup only depends on the
+    length of the IRI, not on the number of mappings.  If more than one prefix
+    matches an IRI, the longest prefix is used.  A single instance can be
+    shared by any number of OWLOntologyManagers.
+    """
+    def __init__(self):
+        self.exact = {}
+        self.prefix_trie = {}
+        self.prefix_cnt = 0
+        self.lock = threading.Lock()
+
+    def addExactMapping(self, ontology_iri, document_iri):
+        """
+        Maps an ontology IRI to a document IRI.  Replaces any existing exact
+        mapping for the ontology IRI.
+
+        ontology_iri: An ontology IRI string.
+        document_iri: A document IRI string.
+        """
+        with self.lock:
+            self.exact[ontology_iri] = document_iri
+
+    def addPrefixMapping(self, iri_prefix, rewrite_prefix):
+        """
+        Adds a rule that rewrites all ontology IRIs that start with a given
+        prefix by replacing the prefix with a new prefix.  Replaces any
+        existing rule for the same prefix.
+
+        iri_prefix: The ontology IRI prefix string.
+        rewrite_prefix: The document IRI prefix string.
+        """
+        if iri_prefix == '':
+            raise CatalogError(
+                'Could not add the IRI prefix mapping to <{0}>, because the '
+                'IRI prefix is empty.'.format(rewrite_prefix)
+            )
+
+        with self.lock:
+            node = self.prefix_trie
+            for char in iri_prefix:
+                node = node.setdefault(char, {})
+
+            if None not in node:
+                self.prefix_cnt += 1
+            node[None] = (len(iri_prefix), rewrite_prefix)
+
+    def getMappingCounts(self):
+        """
+        Returns a tuple containing the numbers of exact mappings and prefix
+        mappings, in that order.
+        """
+        return (len(self.exact), self.prefix_cnt)
+
+    def lookup(self, iristr):
+        """
+        Returns the document IRI string for an ontology IRI string, or None if
+        the catalog does not map the IRI.  Exact mappings take precedence over
+        prefix mappings.
+
+        iristr: An ontology IRI string.
+        """
+        docstr = self.exact.get(iristr)
+        if docstr is not None:
+            return docstr
+
+        # Walk the trie as far as the IRI allows, remembering the last (i.e.,
+        # longest) matching prefix.
+        match = None
+        node = self.prefix_trie
+        for char in iristr:
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                match = node[None]
+
+        if match is None:
+            return None
+
+        return match[1] + iristr[match[0]:]
+
+    def getDocumentIRI(self, ontologyIRI):
+        """
+        Implements OWLOntologyIRIMapper.getDocumentIRI().
+
+        ontologyIRI: An OWL API IRI object.
+        """
+        docstr = self.lookup(ontologyIRI.toString())
+        if docstr is None:
+            return None
+
+        return IRI.create(docstr)
+
+    def loadCatalogFile(self, filepath):
+        """
+        Loads the mappings defined in an OASIS XML catalog file, such as the
+        "catalog-v001.xml" files written by Protege.  The "uri",
+        "rewriteURI", "group", and "nextCatalog" elements are supported.
+        Relative document locations are interpreted relative to the location
+        of the catalog file (or the value of any xml:base attributes), so
+        catalogs can map ontology IRIs to local files.
+
+        filepath: The path of an XML catalog file.
+        """
+        self._loadCatalogFile(os.path.abspath(filepath), set())
+
+    def _loadCatalogFile(self, filepath, loaded):
+        """
+        Loads an XML catalog file.  Catalog files that were already loaded
+        (directly or via "nextCatalog" elements) are skipped.
+
+        filepath: The absolute path of an XML catalog file.
+        loaded: A set of the paths of all catalog files loaded so far.
+        """
+        if filepath in loaded:
+            return
+        loaded.add(filepath)
+
+        try:
+            root = ET.parse(filepath).getroot()
+        except (IOError, ET.ParseError) as err:
+            raise CatalogError(
+                'Unable to read the IRI catalog file "{0}": {1}.  Please '
+                'make sure that the file exists and is a valid XML catalog '
+                'file.'.format(filepath, err)
+            )
+
+        base = urlparse.urljoin(
+            'file://localhost', urllib.pathname2url(filepath)
+        )
+        self._loadCatalogElement(root, base, filepath, loaded)
+
+    def _loadCatalogElement(self, element, base, filepath, loaded):
+        """
+        Loads the mappings defined by the children of a catalog or group
+        element.
+
+        element: An ElementTree Element.
+        base: The base IRI string for resolving relative IRIs.
+        filepath: The path of the catalog file.
+        loaded: A set of the paths of all catalog files loaded so far.
+        """
+        base = urlparse.urljoin(base, element.get(XML_BASE_ATTR, ''))
+
+        for child in element:
+            # Catalog files written by some tools do not use the catalog
+            # namespace, so accept element names with or without it.
+            tag = child.tag
+            if tag.startswith('{' + CATALOG_NS + '}'):
+                tag = tag[len(CATALOG_NS) + 2:]
+
+            childbase = urlparse.urljoin(base, child.get(XML_BASE_ATTR, ''))
+
+            if tag == 'uri':
+                self.addExactMapping(
+                    self._getCatalogAttr(child, 'name', filepath),
+                    urlparse.urljoin(
+                        childbase, self._getCatalogAttr(child, 'uri', filepath)
+                    )
+                )
+            elif tag == 'rewriteURI':
+                self.addPrefixMapping(
+                    self._getCatalogAttr(child, 'uriStartString', filepath),
+                    urlparse.urljoin(
+                        childbase,
+                        self._getCatalogAttr(child, 'rewritePrefix', filepath)
+                    )
+                )
+            elif tag == 'group':
+                self._loadCatalogElement(child, base, filepath, loaded)
+            elif tag == 'nextCatalog':
+                nexturl = urlparse.urljoin(
+                    childbase,
+                    self._getCatalogAttr(child, 'catalog', filepath)
+                )
+                nextpath = urllib.url2pathname(urlparse.urlsplit(nexturl).path)
+                self._loadCatalogFile(os.path.abspath(nextpath), loaded)
+
+    def _getCatalogAttr(self, element, attrname, filepath):
+        """
+        Returns the value of a required attribute of a catalog element.
+        """
+        value = element.get(attrname, '').strip()
+        if value == '':
+            raise CatalogError(
+                'Missing "{0}" attribute for a "{1}" element in the IRI '
+                'catalog file "{2}".'.format(attrname, element.tag, filepath)
+            )
+
+        return value
 
 
 # Stores all custom mappings of ontology IRIs to document IRIs.
 _IRImappings = {}
 
-# Keeps track of all OOMs created by the OOM manager.  This implementation is
-# somewhat inefficient, because OOMs will never be deallocated/garbage
-# collected due to this list always keeping a reference to them.  In practice,
-# this is unlikely to matter because few OOMs will be instantiated during a
-# typical OntoPilot run.  Even when running the unit tests, which create a
-# *lot* of OOMs, it hardly made a difference in overall memory consumption:
-# e.g., for one pair of runs, I observed a peak of 722 MB without storing
-# references and 733 MB with reference storing.  However, if needed, this could
-# be optimized to improve memory management.
-_ooms_list = []
+# The IRI mapper for the custom mappings, which is shared by all OOMs created
+# by the OOM manager.  Earlier versions added a separate IRI mapper for each
+# mapping to every OOM, which required keeping a list of all OOMs ever created.
+# That list prevented the OOMs, and every ontology they had loaded, from ever
+# being garbage collected.  With a shared mapper, the OOM manager does not need
+# to keep references to any OOMs, and new mappings are immediately visible to
+# all existing OOMs.
+_mapper = CatalogIRIMapper()
+
+# The IRI catalog that is shared by all OOMs created by the OOM manager.
+# Because all OOMs use the same mapper object, catalog mappings added at any
+# time are immediately visible to all OOMs.
+_catalog = CatalogIRIMapper()
+
+# The paths of all catalog files that have been loaded.
+_catalog_files = set()
+
+# Guards the IRI mappings so that IRI mappings can be safely added by several
+# threads (e.g., when import modules are built concurrently).
+_lock = threading.RLock()
 
 
 def lookupDocumentIRI(oom, ontologyIRI):
@@ -62,10 +289,9 @@ def lookupDocumentIRI(oom, ontologyIRI):
 
 def addNewIRIMapping(ontologyIRI, documentIRI):
     """
-    Adds a new mapping of an ontology IRI to a document IRI.  All previously
-    created OOMs will be updated with the new mapping, and the new mapping will
-    automatically be applied to any new OOMs that are created after the mapping
-    is added.
+    Adds a new mapping of an ontology IRI to a document IRI.  The new mapping
+    applies to all OOMs created by the OOM manager, including OOMs that were
+    created before the mapping was added.
 
     ontologyIRI: An OWL API IRI object.
     documentIRI: An OWL API IRI object.
@@ -73,37 +299,68 @@ def addNewIRIMapping(ontologyIRI, documentIRI):
     if ontologyIRI.equals(documentIRI):
         return
 
-    if ontologyIRI not in _IRImappings:
-        _IRImappings[ontologyIRI] = documentIRI
+    with _lock:
+        if ontologyIRI not in _IRImappings:
+            _IRImappings[ontologyIRI] = documentIRI
+            _mapper.addExactMapping(
+                ontologyIRI.toString(), documentIRI.toString()
+            )
 
-        for oom in _ooms_list:
-            if lookupDocumentIRI(oom, ontologyIRI) is None:
-                oom.getIRIMappers().add(
-                    SimpleIRIMapper(ontologyIRI, documentIRI)
+        elif not(_IRImappings[ontologyIRI].equals(documentIRI)):
+            raise RuntimeError(
+                'Could not create the mapping of <{0}> to <{1}>, because a '
+                'conflicting mapping of <{0}> to <{2}> already exists.'.format(
+                        ontologyIRI.toString(), documentIRI.toString(),
+                        _IRImappings[ontologyIRI].toString()
                 )
-
-    elif not(_IRImappings[ontologyIRI].equals(documentIRI)):
-        raise RuntimeError(
-            'Could not create the mapping of <{0}> to <{1}>, because a '
-            'conflicting mapping of <{0}> to <{2}> already exists.'.format(
-                    ontologyIRI.toString(), documentIRI.toString(),
-                    _IRImappings[ontologyIRI].toString()
             )
-        )
+
+def loadIRICatalog(filepath):
+    """
+    Loads the exact and prefix IRI mappings from an XML catalog file into the
+    IRI catalog shared by all OOMs.  Catalog mappings take precedence over any
+    other IRI mappings.  Each catalog file is only loaded once.
+
+    filepath: The path of an XML catalog file.
+    """
+    filepath = os.path.abspath(filepath)
+
+    with _lock:
+        if filepath not in _catalog_files:
+            _catalog.loadCatalogFile(filepath)
+            _catalog_files.add(filepath)
+
+def addPrefixMapping(iri_prefix, rewrite_prefix):
+    """
+    Adds a prefix rewrite rule to the IRI catalog shared by all OOMs.  All
+    ontology IRIs that start with iri_prefix will be mapped to document IRIs
+    that start with rewrite_prefix instead.
+
+    iri_prefix: An ontology IRI prefix string.
+    rewrite_prefix: A document IRI prefix string.
+    """
+    _catalog.addPrefixMapping(iri_prefix, rewrite_prefix)
+
+def lookupCatalogIRI(iristr):
+    """
+    Returns the document IRI string to which the IRI catalog maps an ontology
+    IRI string, or None if the catalog has no mapping for the IRI.
+
+    iristr: An ontology IRI string.
+    """
+    return _catalog.lookup(iristr)
 
 def getNewOWLOntologyManager():
     """
     Creates and returns a new OWLOntologyManager.
     """
     oom = OWLManager.createOWLOntologyManager()
-    _ooms_list.append(oom)
 
-    # Add any missing IRI mappings.
-    for ontologyIRI in _IRImappings:
-        if lookupDocumentIRI(oom, ontologyIRI) is None:
-            oom.getIRIMappers().add(
-                SimpleIRIMapper(ontologyIRI, _IRImappings[ontologyIRI])
-            )
+    # The IRI catalog is added first so that its mappings take precedence.
+    # The OOM only references the shared mappers, so the OOM manager does not
+    # keep the new OOM alive.
+    oom.getIRIMappers().add(_catalog)
+    oom.getIRIMappers().add(_mapper)
 
     return oom
 
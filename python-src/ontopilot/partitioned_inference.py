@@ -0,0 +1,445 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a partitioned version of InferredAxiomAdder for data sets with
+# large ABoxes.  The ABox is split into groups of individuals that are not
+# connected by any assertions, and each group is reasoned over separately,
+# together with the shared TBox.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+import sys
+import time
+import threading
+import Queue
+from ontopilot import logger
+from ontology import Ontology
+from inferred_axiom_adder import InferredAxiomAdder
+
+# Java imports.
+from java.util import HashSet
+from org.semanticweb.owlapi.model import AxiomType
+from org.semanticweb.owlapi.model.parameters import Imports
+
+
+# The inference types that only produce ABox axioms.  These are generated
+# separately for each ABox partition.
+ABOX_INFERENCE_TYPES = ('types', 'property values')
+
+# The default maximum number of ABox axioms in a partition.
+DEFAULT_PARTITION_SIZE = 10000
+
+
+class ABoxPartitioner:
+    """
+    Splits the ABox of an ontology and its imports closure into connected
+    components.  Two individuals are connected if they occur together in an
+    ABox axiom (e.g., an object property assertion).  Individuals that are
+    referenced by TBox axioms (e.g., in nominals) are all placed in the same
+    component, because TBox axioms can connect them to any other individual.
+    If there are no entailments that cross component boundaries, reasoning
+    over each component together with the TBox gives the same results as
+    reasoning over the whole ontology.
+    """
+    def __init__(self, ontology):
+        """
+        ontology: An Ontology object.
+        """
+        self.ontology = ontology
+
+        self.abox_axioms = []
+        self.tbox_axioms = HashSet()
+
+        # The individuals that are referenced by TBox axioms.
+        self.tbox_individuals = []
+
+        # Maps individuals to integer IDs and stores the union-find forest of
+        # the IDs.
+        self.indv_ids = {}
+        self.parents = []
+
+        self._findComponents()
+
+    def _getID(self, individual):
+        """
+        Returns the integer ID of an individual.
+        """
+        if individual not in self.indv_ids:
+            self.indv_ids[individual] = len(self.parents)
+            self.parents.append(len(self.parents))
+
+        return self.indv_ids[individual]
+
+    def _find(self, indv_id):
+        """
+        Returns the ID of the representative individual of the component of
+        an individual.
+        """
+        root = indv_id
+        while self.parents[root] != root:
+            root = self.parents[root]
+
+        # Compress the path.
+        while self.parents[indv_id] != root:
+            self.parents[indv_id], indv_id = root, self.parents[indv_id]
+
+        return root
+
+    def _union(self, individuals):
+        """
+        Merges the components of a list of individuals.
+        """
+        root = None
+        for individual in individuals:
+            indv_root = self._find(self._getID(individual))
+
+            if root is None:
+                root = indv_root
+            elif indv_root != root:
+                self.parents[indv_root] = root
+
+    def _getIndividuals(self, axiom):
+        """
+        Returns a list of all named and anonymous individuals in an axiom.
+        """
+        individuals = list(axiom.getIndividualsInSignature())
+        individuals.extend(axiom.getAnonymousIndividuals())
+
+        return individuals
+
+    def _findComponents(self):
+        """
+        Sorts the axioms of the imports closure into ABox axioms and shared
+        TBox axioms and builds the union-find forest of individuals.
+        """
+        owlont = self.ontology.getOWLOntology()
+
+        tbox_individuals = []
+        other_axioms = []
+        for axiom in owlont.getAxioms(Imports.INCLUDED):
+            if axiom.isOfType(AxiomType.ABoxAxiomTypes):
+                self.abox_axioms.append(axiom)
+                self._union(self._getIndividuals(axiom))
+            else:
+                other_axioms.append(axiom)
+                if axiom.isLogicalAxiom():
+                    tbox_individuals.extend(self._getIndividuals(axiom))
+
+        # All individuals that are referenced by TBox axioms belong to a
+        # single component.
+        self._union(tbox_individuals)
+        self.tbox_individuals = tbox_individuals
+
+        # Only include the non-logical axioms about individuals (i.e., their
+        # declarations and annotations) with the TBox if the individuals are
+        # referenced by TBox axioms; otherwise, they would be copied to every
+        # partition.
+        tbox_iris = set([
+            individual.getIRI() for individual in tbox_individuals
+            if individual.isNamed()
+        ])
+        abox_iris = set([
+            individual.getIRI() for individual in self.indv_ids
+            if individual.isNamed()
+        ])
+        for axiom in other_axioms:
+            if axiom.getAxiomType() == AxiomType.DECLARATION:
+                entity = axiom.getEntity()
+                if entity.isOWLNamedIndividual():
+                    if entity.getIRI() not in tbox_iris:
+                        continue
+            elif axiom.getAxiomType() == AxiomType.ANNOTATION_ASSERTION:
+                subject = axiom.getSubject()
+                if subject in abox_iris and subject not in tbox_iris:
+                    continue
+
+            self.tbox_axioms.add(axiom)
+
+    def getTBoxAxioms(self):
+        """
+        Returns a Java set of all axioms that are shared by all partitions.
+        """
+        return self.tbox_axioms
+
+    def getComponents(self):
+        """
+        Returns a list of the connected components of the ABox.  Each
+        component is a list of ABox axioms.
+        """
+        components = {}
+        for axiom in self.abox_axioms:
+            root = self._find(self._getID(self._getIndividuals(axiom)[0]))
+            components.setdefault(root, []).append(axiom)
+
+        return components.values()
+
+    def getTBoxComponent(self):
+        """
+        Returns a Java set of the ABox axioms in the connected component of
+        the individuals that are referenced by TBox axioms (e.g., in
+        nominals).  Through these individuals, the ABox axioms of this
+        component can entail TBox axioms, such as subclass axioms for classes
+        that are defined by nominals.  No other ABox axioms can entail TBox
+        axioms.  If no individuals are referenced by TBox axioms, the set is
+        empty.
+        """
+        component = HashSet()
+        if len(self.tbox_individuals) == 0:
+            return component
+
+        tbox_root = self._find(self._getID(self.tbox_individuals[0]))
+        for axiom in self.abox_axioms:
+            root = self._find(self._getID(self._getIndividuals(axiom)[0]))
+            if root == tbox_root:
+                component.add(axiom)
+
+        return component
+
+    def getPartitions(self, max_size=DEFAULT_PARTITION_SIZE):
+        """
+        Groups the connected components of the ABox into partitions and
+        returns a list of Java sets of ABox axioms, one for each partition.
+        Small components are combined so that each partition contains up to
+        max_size axioms, but larger components are never split.
+
+        max_size (optional): The maximum number of ABox axioms to combine in
+            a single partition.
+        """
+        partitions = []
+        current = HashSet()
+
+        components = sorted(self.getComponents(), key=len, reverse=True)
+        for component in components:
+            if current.size() > 0 and current.size() + len(component) > max_size:
+                partitions.append(current)
+                current = HashSet()
+
+            current.addAll(component)
+
+        if current.size() > 0:
+            partitions.append(current)
+
+        return partitions
+
+
+class PartitionedInferredAxiomAdder:
+    """
+    Adds inferred axioms to an ontology by reasoning over ABox partitions
+    (see ABoxPartitioner) in parallel.  Each partition is combined with the
+    shared TBox in a new ontology, and ABox inferences (types and property
+    values) are generated for each of these ontologies by a separate
+    InferredAxiomAdder and reasoner.  All other inference types are
+    generated once for the TBox together with the ABox component of the
+    individuals that are referenced by TBox axioms (see
+    ABoxPartitioner.getTBoxComponent()), because with nominals, these ABox
+    axioms can entail TBox axioms.  All inferred axioms are then merged
+    into the source ontology.  If there are no entailments that cross
+    partition boundaries, the results are the same as for running
+    InferredAxiomAdder on the full ontology.
+    """
+    def __init__(self, ontology, reasoner_str, threadcnt=1):
+        """
+        ontology: The ontology on which to run the reasoner and for which to
+            add inferred axioms.
+        reasoner_str: A string indicating the type of reasoner to use.
+        threadcnt (optional): The maximum number of partitions to reason over
+            concurrently.
+        """
+        self.ont = ontology
+        self.reasoner_str = reasoner_str
+        self.threadcnt = max(1, threadcnt)
+
+        self.max_partition_size = DEFAULT_PARTITION_SIZE
+        self.etfpath = ''
+
+    def setMaxPartitionSize(self, max_size):
+        """
+        Sets the maximum number of ABox axioms to combine in a single
+        partition.
+        """
+        self.max_partition_size = max(1, max_size)
+
+    def loadExcludedTypes(self, etfpath):
+        """
+        Sets a tabular data file containing information about the classes to
+        exclude from inferred type/class assertions.  See
+        InferredAxiomAdder.loadExcludedTypes().
+
+        etfpath: The path of a tabular data file.
+        """
+        self.etfpath = etfpath
+
+    def dispose(self):
+        """
+        Provided for compatibility with InferredAxiomAdder.dispose().  The
+        InferredAxiomAdders for the partitions are already disposed of after
+        each run, so there is nothing to release.
+        """
+        pass
+
+    def _runAdder(
+        self, tbox_axioms, abox_axioms, inference_types, annotate,
+        add_inverses
+    ):
+        """
+        Runs an InferredAxiomAdder on a new ontology that contains the TBox
+        axioms and a set of ABox axioms.  Returns a tuple containing Java sets
+        of the axioms that were added to and removed from the ontology.
+        """
+        partont = Ontology()
+        owlont = partont.getOWLOntology()
+        partont.ontman.addAxioms(owlont, tbox_axioms)
+        partont.ontman.addAxioms(owlont, abox_axioms)
+        oldaxioms = owlont.getAxioms()
+
+        # Use the same reasoner limits as for the source ontology.
+        rman = self.ont.getReasonerManager()
+        partont.getReasonerManager().setReasonerLimits(
+            rman.timeout, rman.max_memory
+        )
+
+        try:
+            iaa = InferredAxiomAdder(partont, self.reasoner_str)
+            try:
+                if self.etfpath != '':
+                    iaa.loadExcludedTypes(self.etfpath)
+                iaa.addInferredAxioms(inference_types, annotate, add_inverses)
+            finally:
+                iaa.dispose()
+        finally:
+            partont.getReasonerManager().disposeReasoners()
+
+        newaxioms = owlont.getAxioms()
+
+        added = HashSet(newaxioms)
+        added.removeAll(oldaxioms)
+        removed = HashSet(oldaxioms)
+        removed.removeAll(newaxioms)
+
+        return (added, removed)
+
+    def _partitionWorker(self, jobqueue, results, errors):
+        """
+        The main function for partition worker threads.
+        """
+        while True:
+            try:
+                index, args = jobqueue.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                results[index] = self._runAdder(*args)
+            except:
+                # Catch everything, including Java exceptions, so that the
+                # error can be reported by the main thread.
+                errors.append(sys.exc_info())
+
+    def addInferredAxioms(self, inference_types, annotate=False, add_inverses=False):
+        """
+        Runs a reasoner on each ABox partition of this ontology and adds the
+        inferred axioms.  If no ABox inferences are requested or the ABox
+        cannot be partitioned, a single InferredAxiomAdder is used for the
+        whole ontology.  The arguments are the same as for
+        InferredAxiomAdder.addInferredAxioms().
+        """
+        abox_types = [
+            inftype for inftype in inference_types
+            if inftype in ABOX_INFERENCE_TYPES
+        ]
+        tbox_types = [
+            inftype for inftype in inference_types
+            if inftype not in ABOX_INFERENCE_TYPES
+        ]
+
+        partitions = []
+        if len(abox_types) > 0:
+            partitioner = ABoxPartitioner(self.ont)
+            partitions = partitioner.getPartitions(self.max_partition_size)
+
+        if len(partitions) < 2:
+            logger.info(
+                'The ABox could not be partitioned; reasoning over the whole '
+                'ontology.'
+            )
+            iaa = InferredAxiomAdder(self.ont, self.reasoner_str)
+            if self.etfpath != '':
+                iaa.loadExcludedTypes(self.etfpath)
+            try:
+                iaa.addInferredAxioms(inference_types, annotate, add_inverses)
+            finally:
+                iaa.dispose()
+            return
+
+        logger.info(
+            'Split the ABox into {0} partitions with {1} worker '
+            'thread(s).'.format(len(partitions), self.threadcnt)
+        )
+        starttime = time.time()
+
+        tbox_axioms = partitioner.getTBoxAxioms()
+        jobs = [
+            (tbox_axioms, partition, abox_types, annotate, add_inverses)
+            for partition in partitions
+        ]
+
+        # The TBox inferences only need to be generated once, but they can
+        # depend on the ABox axioms about individuals in nominals.
+        if len(tbox_types) > 0:
+            jobs.append((
+                tbox_axioms, partitioner.getTBoxComponent(), tbox_types,
+                annotate, False
+            ))
+
+        jobqueue = Queue.Queue()
+        for index, job in enumerate(jobs):
+            jobqueue.put((index, job))
+
+        results = [None] * len(jobs)
+        errors = []
+        workers = []
+        for cnt in range(min(self.threadcnt, len(jobs))):
+            worker = threading.Thread(
+                target=self._partitionWorker, args=(jobqueue, results, errors)
+            )
+            worker.start()
+            workers.append(worker)
+
+        for worker in workers:
+            worker.join()
+
+        if len(errors) > 0:
+            exc_type, exc_value, exc_tb = errors[0]
+            raise exc_type, exc_value, exc_tb
+
+        # Merge the results into the source ontology.
+        added = HashSet()
+        removed = HashSet()
+        for p_added, p_removed in results:
+            added.addAll(p_added)
+            removed.addAll(p_removed)
+
+        owlont = self.ont.getOWLOntology()
+        self.ont.ontman.addAxioms(owlont, added)
+        self.ont.ontman.removeAxioms(owlont, removed)
+
+        logger.info(
+            'Reasoned over {0} ABox partitions and merged {1} new axioms in '
+            '{2:.3g} s.'.format(
+                len(partitions), added.size(), time.time() - starttime
+            )
+        )
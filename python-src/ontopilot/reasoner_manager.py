@@ -16,13 +16,213 @@
 
 # Python imports.
 from __future__ import unicode_literals
+import time
 from ontopilot import logger
 
 # Java imports.
+from java.lang import Runtime, Long
+from java.util import HashSet
 from org.semanticweb.elk.owlapi import ElkReasonerFactory
 from org.semanticweb.HermiT import ReasonerFactory as HermiTReasonerFactory
 from com.clarkparsia.pellet.owlapiv3 import PelletReasonerFactory
 from uk.ac.manchester.cs.jfact import JFactFactory
+from org.semanticweb.owlapi.model import AxiomType, ClassExpressionType
+from org.semanticweb.owlapi.model.parameters import Imports
+from org.semanticweb.owlapi.profiles import OWL2ELProfile
+from org.semanticweb.owlapi.profiles import OWL2QLProfile
+from org.semanticweb.owlapi.profiles import OWL2RLProfile
+from org.semanticweb.owlapi.reasoner import ReasonerProgressMonitor
+from org.semanticweb.owlapi.reasoner import SimpleConfiguration
+from org.semanticweb.owlapi.reasoner import TimeOutException
+from org.semanticweb.owlapi.reasoner import ReasonerInterruptedException
+
+
+# The reasoner name that requests automatic reasoner selection.
+AUTO_REASONER = 'auto'
+
+# Maps normalized reasoner names to display names.
+REASONER_NAMES = {
+    'elk': 'ELK', 'hermit': 'HermiT', 'pellet': 'Pellet', 'jfact': 'JFact'
+}
+
+
+# Reasoner exceptions that indicate that a resource limit was exceeded.
+REASONER_LIMIT_EXCEPTIONS = (TimeOutException, ReasonerInterruptedException)
+
+
+class ReasonerLimitError(RuntimeError):
+    """
+    Raised when a reasoner exceeds its time or memory limit.
+    """
+    pass
+
+
+class ReasonerProgressLogger(ReasonerProgressMonitor):
+    """
+    An OWL API reasoner progress monitor that logs the progress of reasoning
+    tasks in 10% steps.  If a memory limit is set, the monitor also checks the
+    Java heap usage whenever a reasoner reports progress and interrupts the
+    reasoner if the limit is exceeded.
+    """
+    def __init__(self, reasoner_name, max_memory=0):
+        """
+        reasoner_name: The display name of the reasoner.
+        max_memory (optional): The maximum Java heap usage, in MB, to allow
+            while the reasoner is running, or 0 for no limit.
+        """
+        self.reasoner_name = reasoner_name
+        self.max_memory = max_memory
+        self.reasoner = None
+
+        self.taskname = ''
+        self.last_step = -1
+
+        # Set to True if the reasoner was interrupted because it exceeded the
+        # memory limit.
+        self.memory_exceeded = False
+
+    def setReasoner(self, reasoner):
+        """
+        Sets the reasoner to interrupt if the memory limit is exceeded.
+        """
+        self.reasoner = reasoner
+
+    def _checkMemory(self):
+        if self.max_memory == 0 or self.memory_exceeded:
+            return
+
+        runtime = Runtime.getRuntime()
+        used_mb = (runtime.totalMemory() - runtime.freeMemory()) / 1048576
+        if used_mb > self.max_memory and self.reasoner is not None:
+            self.memory_exceeded = True
+            self.reasoner.interrupt()
+
+    def reasonerTaskStarted(self, taskname):
+        self.taskname = taskname
+        self.last_step = -1
+        logger.info('{0}: {1}'.format(self.reasoner_name, taskname))
+
+    def reasonerTaskStopped(self):
+        self.taskname = ''
+
+    def reasonerTaskProgressChanged(self, value, maximum):
+        self._checkMemory()
+
+        if maximum <= 0:
+            return
+
+        step = min(value * 10 / maximum, 10)
+        if step > self.last_step:
+            self.last_step = step
+            logger.info(
+                '{0}: {1} {2}%'.format(
+                    self.reasoner_name, self.taskname, step * 10
+                )
+            )
+
+    def reasonerTaskBusy(self):
+        self._checkMemory()
+
+
+def getReasonerFactory(reasoner_name):
+    """
+    Returns a new OWL API reasoner factory for a reasoner name.  Supported
+    values are "ELK", "HermiT", "Pellet", or "JFact" (the strings are not case
+    sensitive).
+
+    reasoner_name: A string specifying the type of reasoner.
+    """
+    reasoner_name = reasoner_name.lower().strip()
+
+    if reasoner_name == 'elk':
+        return ElkReasonerFactory()
+    elif reasoner_name == 'hermit':
+        return HermiTReasonerFactory()
+    elif reasoner_name == 'pellet':
+        return PelletReasonerFactory()
+    elif reasoner_name == 'jfact':
+        return JFactFactory()
+    else:
+        raise RuntimeError(
+            'Unrecognized DL reasoner name: ' + reasoner_name + '.'
+        )
+
+
+# Axiom types that are in the OWL 2 EL profile, but that ELK does not support.
+ELK_UNSUPPORTED_AXIOM_TYPES = (
+    AxiomType.SAME_INDIVIDUAL, AxiomType.DIFFERENT_INDIVIDUALS,
+    AxiomType.HAS_KEY, AxiomType.DATA_PROPERTY_DOMAIN,
+    AxiomType.DATA_PROPERTY_RANGE, AxiomType.SUB_DATA_PROPERTY,
+    AxiomType.FUNCTIONAL_DATA_PROPERTY, AxiomType.EQUIVALENT_DATA_PROPERTIES,
+    AxiomType.DISJOINT_DATA_PROPERTIES
+)
+
+
+def _getNominals(axiom):
+    """
+    Returns a list of the individuals in all nominals (ObjectOneOf class
+    expressions, including those implied by ObjectHasValue restrictions) that
+    occur in an axiom.  Each nominal is returned as a list of its individuals.
+    """
+    nominals = []
+    for classexp in axiom.getNestedClassExpressions():
+        exptype = classexp.getClassExpressionType()
+        if exptype == ClassExpressionType.OBJECT_ONE_OF:
+            nominals.append(list(classexp.getIndividuals()))
+        elif exptype == ClassExpressionType.OBJECT_HAS_VALUE:
+            nominals.append([classexp.getFiller()])
+
+    return nominals
+
+
+def hasNominals(axiom):
+    """
+    Returns True if an axiom contains a nominal (an ObjectOneOf class
+    expression or an ObjectHasValue restriction).
+    """
+    return len(_getNominals(axiom)) > 0
+
+
+def getELKUnsupportedAxioms(owlont):
+    """
+    Returns a Java set of all logical axioms in an OWL API ontology's imports
+    closure that ELK does not support, even though they might be in the OWL 2
+    EL profile.  These are the axioms with a type in
+    ELK_UNSUPPORTED_AXIOM_TYPES and the axioms with a nominal that ELK cannot
+    handle: a nominal with more than one individual, a nominal in an ABox
+    axiom, or a nominal with an individual that is used in any ABox axiom.
+    For all of these axioms, ELK is incomplete.
+
+    owlont: An OWL API ontology.
+    """
+    unsupported = HashSet()
+    nominal_axioms = []
+    abox_individuals = set()
+
+    for axiom in owlont.getAxioms(Imports.INCLUDED):
+        if not(axiom.isLogicalAxiom()):
+            continue
+
+        if axiom.getAxiomType() in ELK_UNSUPPORTED_AXIOM_TYPES:
+            unsupported.add(axiom)
+            continue
+
+        if axiom.isOfType(AxiomType.ABoxAxiomTypes):
+            abox_individuals.update(axiom.getIndividualsInSignature())
+            abox_individuals.update(axiom.getAnonymousIndividuals())
+
+        nominals = _getNominals(axiom)
+        if len(nominals) > 0:
+            nominal_axioms.append((axiom, nominals))
+
+    for axiom, nominals in nominal_axioms:
+        if axiom.isOfType(AxiomType.ABoxAxiomTypes) or any(
+            len(individuals) != 1 or individuals[0] in abox_individuals
+            for individuals in nominals
+        ):
+            unsupported.add(axiom)
+
+    return unsupported
 
 
 class ReasonerManager:
@@ -30,15 +230,44 @@ class ReasonerManager:
     Manages DL reasoners for Ontology objects.  Given a string designating a
     reasoner type and a source ontology, ReasonerManager will return a
     corresponding reasoner object and ensure that only one instance of each
-    reasoner type is created.  ReasonerManagers will also ensure that the
+    reasoner type is created.  By default, ReasonerManagers ensure that the
     reasoner instances they manage remain synchronized with their source
-    ontologies by only instantiating non-buffering reasoners.
+    ontologies by only instantiating non-buffering reasoners.  In buffering
+    mode, ReasonerManagers instead instantiate buffering reasoners, which only
+    process ontology changes when flushReasoners() is called.  This allows
+    client code to batch ontology changes so that reasoners that support
+    incremental reasoning (in particular, ELK) can process all changes in a
+    batch at once instead of re-synchronizing after every change.
+
+    ReasonerManagers can also choose a reasoner automatically, based on the
+    OWL 2 profile of the source ontology's imports closure (see
+    selectReasoner()).
     """
     def __init__(self, ontology):
         self.ontology = ontology
 
-        # A dictionary to keep track of instantiated reasoners.
+        # Dictionaries to keep track of instantiated non-buffering and
+        # buffering reasoners.
         self.reasoners = {}
+        self.buffering_reasoners = {}
+
+        self.buffering = False
+
+        # The total time, in seconds, spent synchronizing buffering reasoners
+        # with the ontology.
+        self.sync_time = 0.0
+
+        # The name of the automatically selected reasoner, if any.
+        self.auto_reasoner = None
+
+        # The time limit, in seconds, for each reasoning task and the Java heap
+        # usage limit, in MB, while reasoning.  0 means no limit.
+        self.timeout = 0
+        self.max_memory = 0
+
+        # The progress monitors of all reasoners created with
+        # getReasonerConfiguration() that have not been disposed of.
+        self.monitors = []
 
     def getOntology(self):
         """
@@ -46,44 +275,288 @@ class ReasonerManager:
         """
         return self.ontology
 
-    def getReasoner(self, reasoner_name):
+    def setBufferingMode(self, buffering):
+        """
+        Sets whether getReasoner() should return buffering reasoners.
+        Non-buffering and buffering reasoners are managed separately, so
+        changing the mode does not affect reasoners that were already
+        returned.
+
+        buffering (bool): If True, use buffering reasoners.
+        """
+        self.buffering = buffering
+
+    def isBufferingMode(self):
+        """
+        Returns True if getReasoner() returns buffering reasoners.
+        """
+        return self.buffering
+
+    def setReasonerLimits(self, timeout=0, max_memory=0):
+        """
+        Sets resource limits for reasoners that are created after this is
+        called.  If a reasoner exceeds a limit, it stops, and the error can be
+        converted to a ReasonerLimitError with getLimitError().
+
+        timeout (optional): The time limit, in seconds, for each reasoning
+            task (e.g., a consistency check or classification), or 0 for no
+            limit.
+        max_memory (optional): The maximum Java heap usage, in MB, to allow
+            while reasoning, or 0 for no limit.
+        """
+        self.timeout = timeout
+        self.max_memory = max_memory
+
+    def getReasonerConfiguration(self, reasoner_name):
+        """
+        Returns a new OWL API reasoner configuration with a progress monitor
+        and the resource limits of this ReasonerManager.  The configuration
+        should only be used for a single reasoner, which must be passed to the
+        configuration's progress monitor with setReasoner() to enforce the
+        memory limit.  Reasoners that are not managed by this ReasonerManager
+        should be disposed of with disposeReasoner(), so that their progress
+        monitors are released.
+
+        reasoner_name: A string specifying a type of reasoner.
+        """
+        monitor = ReasonerProgressLogger(
+            REASONER_NAMES.get(reasoner_name.lower().strip(), reasoner_name),
+            self.max_memory
+        )
+        self.monitors.append(monitor)
+
+        if self.timeout > 0:
+            timeout_ms = self.timeout * 1000
+        else:
+            timeout_ms = Long.MAX_VALUE
+
+        return SimpleConfiguration(monitor, timeout_ms)
+
+    def _getMonitor(self, reasoner):
+        """
+        Returns the progress monitor of a reasoner that was created with a
+        configuration from getReasonerConfiguration(), or None if the
+        reasoner has no monitor.
+        """
+        for monitor in self.monitors:
+            if monitor.reasoner is not None and monitor.reasoner == reasoner:
+                return monitor
+
+        return None
+
+    def getLimitError(self, err, reasoner):
+        """
+        Returns a ReasonerLimitError that explains why a reasoner stopped.
+
+        err: The Java exception thrown by the reasoner.
+        reasoner: The reasoner that threw the exception.
+        """
+        monitor = self._getMonitor(reasoner)
+        if not(isinstance(err, TimeOutException)) and monitor is not None:
+            if monitor.memory_exceeded:
+                return ReasonerLimitError(
+                    'The {0} reasoner was stopped because the Java heap usage '
+                    'exceeded the limit of {1} MB set by the '
+                    '"reasoner_max_memory" setting in the build configuration '
+                    'file.  The ontology might be too large or too complex '
+                    'for this reasoner.  You can try increasing the limit and '
+                    'the maximum Java heap size (e.g., with the "-Xmx" option '
+                    'for Java), or you can try a faster reasoner, such as '
+                    'ELK.'.format(monitor.reasoner_name, monitor.max_memory)
+                )
+
+        details = ''
+        if err.getMessage() is not None:
+            details = '  Details: ' + err.getMessage()
+
+        if isinstance(err, TimeOutException):
+            return ReasonerLimitError(
+                'The reasoner did not finish within the time limit of {0} '
+                'seconds set by the "reasoner_timeout" setting in the build '
+                'configuration file.  The ontology might be too large or too '
+                'complex for this reasoner.  You can try increasing the time '
+                'limit, or you can try a faster reasoner, such as '
+                'ELK.{1}'.format(self.timeout, details)
+            )
+
+        return ReasonerLimitError(
+            'The reasoner was interrupted before it could finish.' + details
+        )
+
+    def selectReasoner(self):
+        """
+        Chooses the fastest available reasoner that is complete for the
+        source ontology's imports closure, logs which reasoner was chosen and
+        why, and returns the name of the chosen reasoner.  If the imports
+        closure is in the OWL 2 EL profile and does not use any features that
+        ELK does not support (see getELKUnsupportedAxioms()), ELK is chosen;
+        otherwise, HermiT is chosen.  None of the available reasoners are
+        specialized for the OWL 2 QL or RL profiles, so for those profiles,
+        HermiT is still the best choice.  The selection is only made once, the
+        first time it is needed, and is kept until disposeReasoners() is
+        called.
+        """
+        if self.auto_reasoner is not None:
+            return self.auto_reasoner
+
+        owlont = self.getOntology().getOWLOntology()
+
+        is_el = OWL2ELProfile().checkOntology(owlont).isInProfile()
+        if is_el:
+            unsupported = getELKUnsupportedAxioms(owlont)
+
+        if is_el and unsupported.isEmpty():
+            self.auto_reasoner = 'elk'
+            reason = 'the ontology and its imports closure are in OWL 2 EL'
+        elif is_el:
+            self.auto_reasoner = 'hermit'
+            axiomtypes = sorted(set([
+                axiom.getAxiomType().getName() for axiom in unsupported
+            ]))
+            reason = (
+                'the ontology and its imports closure are in OWL 2 EL, but '
+                '{0} axioms use features that ELK does not support (axiom '
+                'types: {1})'.format(unsupported.size(), ', '.join(axiomtypes))
+            )
+        else:
+            self.auto_reasoner = 'hermit'
+            profiles = [
+                pname for pname, profile in (
+                    ('QL', OWL2QLProfile()), ('RL', OWL2RLProfile())
+                ) if profile.checkOntology(owlont).isInProfile()
+            ]
+            if len(profiles) > 0:
+                reason = (
+                    'the ontology and its imports closure are in OWL 2 {0}, '
+                    'but not in OWL 2 EL, and no faster reasoner for OWL 2 '
+                    '{0} is available'.format(' and '.join(profiles))
+                )
+            else:
+                reason = (
+                    'the ontology and its imports closure are not in the OWL '
+                    '2 EL, QL, or RL profiles'
+                )
+
+        logger.info(
+            'Automatically selected the {0} reasoner because {1}.'.format(
+                REASONER_NAMES[self.auto_reasoner], reason
+            )
+        )
+
+        return self.auto_reasoner
+
+    def resolveReasonerName(self, reasoner_name):
+        """
+        Returns the normalized (i.e., lower case) name of the reasoner that
+        getReasoner() uses for the string "reasoner_name".  If reasoner_name is
+        "auto", this is the name of the automatically selected reasoner.
+
+        reasoner_name: A string specifying a type of reasoner.
+        """
+        reasoner_name = reasoner_name.lower().strip()
+
+        if reasoner_name == AUTO_REASONER:
+            reasoner_name = self.selectReasoner()
+
+        return reasoner_name
+
+    def getReasoner(self, reasoner_name, buffering=None):
         """
         Returns an instance of a reasoner matching the value of the string
-        "reasoner_name".  Supported values are "ELK", "HermiT", "Pellet", or
-        "JFact" (the strings are not case sensitive).  ReasonerManager ensures
+        "reasoner_name".  Supported values are "ELK", "HermiT", "Pellet",
+        "JFact", or "auto" (the strings are not case sensitive).  For "auto",
+        the reasoner is chosen by selectReasoner().  ReasonerManager ensures
         that reasoner instances are effectively singletons (that is, subsequent
         requests for the same reasoner type return the same reasoner instance).
+        In buffering mode, a buffering reasoner is returned.
 
         reasoner_name: A string specifying the type of reasoner to instantiate.
+        buffering (optional): If True or False, return a buffering or
+            non-buffering reasoner, respectively, regardless of the buffering
+            mode.  If None, the buffering mode is used.
         """
-        reasoner_name = reasoner_name.lower().strip()
+        reasoner_name = self.resolveReasonerName(reasoner_name)
 
-        if reasoner_name not in self.reasoners:
+        if buffering is None:
+            buffering = self.buffering
+
+        if buffering:
+            reasoners = self.buffering_reasoners
+        else:
+            reasoners = self.reasoners
+
+        if reasoner_name not in reasoners:
             owlont = self.getOntology().getOWLOntology()
 
-            rfact = None
-            if reasoner_name == 'elk':
-                logger.info('Creating ELK reasoner...')
-                rfact = ElkReasonerFactory()
-            elif reasoner_name == 'hermit':
-                logger.info('Creating HermiT reasoner...')
-                rfact = HermiTReasonerFactory()
-            elif reasoner_name == 'pellet':
-                logger.info('Creating Pellet reasoner...')
-                rfact = PelletReasonerFactory()
-            elif reasoner_name == 'jfact':
-                logger.info('Creating JFact reasoner...')
-                rfact = JFactFactory()
-
-            if rfact is not None:
-                self.reasoners[reasoner_name] = rfact.createNonBufferingReasoner(owlont)
+            rfact = getReasonerFactory(reasoner_name)
+            logger.info(
+                'Creating {0} reasoner...'.format(REASONER_NAMES[reasoner_name])
+            )
+
+            config = self.getReasonerConfiguration(reasoner_name)
+            if buffering:
+                reasoner = rfact.createReasoner(owlont, config)
             else:
-                raise RuntimeError(
-                    'Unrecognized DL reasoner name: '
-                    + reasoner_name + '.'
+                reasoner = rfact.createNonBufferingReasoner(owlont, config)
+            config.getProgressMonitor().setReasoner(reasoner)
+
+            reasoners[reasoner_name] = reasoner
+
+        return reasoners[reasoner_name]
+
+    def flushReasoners(self):
+        """
+        Synchronizes all buffering reasoners with any pending ontology changes.
+        This should be called at the end of each batch of ontology changes,
+        before the reasoners are queried again.  Returns the time, in seconds,
+        that was spent re-synchronizing the reasoners.  Non-buffering
+        reasoners are always synchronized, so they are not affected.
+        """
+        elapsed = 0.0
+
+        for reasoner_name in self.buffering_reasoners:
+            reasoner = self.buffering_reasoners[reasoner_name]
+            changecnt = reasoner.getPendingChanges().size()
+            if changecnt == 0:
+                continue
+
+            starttime = time.time()
+            reasoner.flush()
+            r_elapsed = time.time() - starttime
+
+            logger.info(
+                'Synchronized the {0} reasoner with {1} pending ontology '
+                'changes in {2:.3g} s.'.format(
+                    reasoner_name, changecnt, r_elapsed
                 )
+            )
+            elapsed += r_elapsed
+
+        self.sync_time += elapsed
+
+        return elapsed
+
+    def getSyncTime(self):
+        """
+        Returns the total time, in seconds, that was spent re-synchronizing
+        buffering reasoners with the ontology.
+        """
+        return self.sync_time
+
+    def disposeReasoner(self, reasoner):
+        """
+        Runs the dispose() operation on a reasoner that was created with a
+        configuration from getReasonerConfiguration(), but that is not
+        managed by this ReasonerManager, and releases its progress monitor.
+
+        reasoner: An OWL API reasoner.
+        """
+        reasoner.dispose()
 
-        return self.reasoners[reasoner_name]
+        monitor = self._getMonitor(reasoner)
+        if monitor is not None:
+            self.monitors.remove(monitor)
+            monitor.setReasoner(None)
 
     def disposeReasoners(self):
         """
@@ -92,8 +565,12 @@ class ReasonerManager:
         guarantee that instances of reasoners returned by ReasonerManager will
         not outlive the ReasonerManager instance.
         """
-        for reasoner_name in self.reasoners:
-            self.reasoners[reasoner_name].dispose()
+        for reasoners in (self.reasoners, self.buffering_reasoners):
+            for reasoner_name in reasoners:
+                reasoners[reasoner_name].dispose()
 
         self.reasoners = {}
+        self.buffering_reasoners = {}
+        self.auto_reasoner = None
+        self.monitors = []
 
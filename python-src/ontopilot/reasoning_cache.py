@@ -0,0 +1,368 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+#
+# Provides a persistent cache for the results of running a reasoner on an
+# ontology.  Cached results are keyed by a hash of the logical axioms in the
+# ontology's imports closure, so results can be reused whenever the logical
+# content of an ontology is unchanged, e.g., when only labels, definitions, or
+# other annotations were edited.
+#
+
+# Python imports.
+from __future__ import unicode_literals
+import os
+import hashlib
+import json
+from ontopilot import logger
+
+# Java imports.
+from java.io import File, FileOutputStream
+from java.util import HashSet
+from org.semanticweb.owlapi.apibinding import OWLManager
+from org.semanticweb.owlapi.formats import FunctionalSyntaxDocumentFormat
+from org.semanticweb.owlapi.model.parameters import Imports as ImportsEnum
+
+
+# The name of the reasoning cache directory inside of the build directory.
+REASONING_CACHE_DIR = 'reasoning_cache'
+
+# The maximum number of distinct ontology states for which results are kept.
+# Older results are deleted when new results are stored.
+MAX_CACHED_STATES = 8
+
+
+def getProjectReasoningCache(config):
+    """
+    Returns a ReasoningCache for the build directory of a project, or None if
+    reasoning results should not be cached.
+
+    config: An OntoConfig object.
+    """
+    if not(config.getCacheReasoning()):
+        return None
+
+    return ReasoningCache(
+        os.path.join(config.getBuildDir(), REASONING_CACHE_DIR)
+    )
+
+
+class ReasoningCache:
+    """
+    Stores the results of reasoning over an ontology in a cache directory.
+    Each set of results is identified by a hash of the logical axioms in the
+    ontology's imports closure, as returned by getLogicalAxiomsHash(), and the
+    name of the reasoner that produced them.  Entailment check results (i.e.,
+    consistency and unsatisfiable classes), the inferred class hierarchy, and
+    the expanded excluded types are stored in a JSON file, and inferred axioms
+    are stored in OWL functional syntax files.
+    """
+    def __init__(self, cachedir):
+        """
+        cachedir: The path of the cache directory.  The directory is created
+            when results are first stored, if its parent directory exists.
+        """
+        self.cachedir = cachedir
+
+    def getLogicalAxiomsHash(self, ontology):
+        """
+        Returns a stable hash string for the logical axioms of an ontology and
+        its imports closure.  Axiom annotations and all non-logical axioms
+        (declarations, annotation assertions, etc.) are ignored, so ontologies
+        that only differ in their annotations get the same hash.
+
+        ontology: An Ontology object.
+        """
+        axiomstrs = set()
+        for axiom in ontology.getOWLOntology().getAxioms(ImportsEnum.INCLUDED):
+            if axiom.isLogicalAxiom():
+                axiomstrs.add(axiom.getAxiomWithoutAnnotations().toString())
+
+        # Sort the axiom strings so that the hash does not depend on the order
+        # in which the axioms are stored.
+        sha1 = hashlib.sha1()
+        for axiomstr in sorted(axiomstrs):
+            sha1.update(axiomstr.encode('utf-8'))
+            sha1.update(b'\n')
+
+        return sha1.hexdigest()
+
+    def _getBasePath(self, axhash, reasoner_str):
+        """
+        Returns the base path for all cache files for an ontology state and
+        reasoner.
+        """
+        return os.path.join(
+            self.cachedir, axhash + '-' + reasoner_str.lower().strip()
+        )
+
+    def _getInferencesPath(
+        self, axhash, reasoner_str, inference_types, variant=''
+    ):
+        """
+        Returns the path of the inferred axioms file for an ontology state,
+        reasoner, set of inference types, and variant string.
+        """
+        typestr = '\n'.join(sorted(inference_types))
+        if variant != '':
+            typestr += '\n' + variant
+        typehash = hashlib.sha1(typestr.encode('utf-8')).hexdigest()[:12]
+
+        return (
+            self._getBasePath(axhash, reasoner_str) + '-' + typehash + '.ofn'
+        )
+
+    def _readResults(self, axhash, reasoner_str):
+        """
+        Returns the dictionary of stored results for an ontology state and
+        reasoner, or an empty dictionary if there are no stored results.
+        """
+        respath = self._getBasePath(axhash, reasoner_str) + '.json'
+
+        try:
+            with open(respath) as fin:
+                results = json.load(fin)
+        except (IOError, ValueError):
+            return {}
+
+        if not(isinstance(results, dict)):
+            return {}
+
+        return results
+
+    def _writeResults(self, axhash, reasoner_str, results):
+        """
+        Writes the dictionary of results for an ontology state and reasoner.
+        Returns True if the results were written.
+        """
+        if not(self._checkCacheDir()):
+            return False
+
+        respath = self._getBasePath(axhash, reasoner_str) + '.json'
+        with open(respath, 'w') as fout:
+            json.dump(results, fout)
+
+        self._pruneCache()
+
+        return True
+
+    def _checkCacheDir(self):
+        """
+        Makes sure that the cache directory exists.  Returns False if the
+        directory does not exist and could not be created, in which case
+        results are not cached.
+        """
+        if os.path.isdir(self.cachedir):
+            return True
+
+        if not(os.path.isdir(os.path.dirname(os.path.abspath(self.cachedir)))):
+            return False
+
+        try:
+            os.mkdir(self.cachedir)
+        except OSError:
+            return os.path.isdir(self.cachedir)
+
+        return True
+
+    def _pruneCache(self):
+        """
+        Deletes the files for all but the MAX_CACHED_STATES most recently used
+        ontology states.
+        """
+        states = {}
+        for fname in os.listdir(self.cachedir):
+            axhash = fname.split('-', 1)[0]
+            fpath = os.path.join(self.cachedir, fname)
+            mtime = os.path.getmtime(fpath)
+            if axhash in states:
+                states[axhash] = max(states[axhash], mtime)
+            else:
+                states[axhash] = mtime
+
+        if len(states) <= MAX_CACHED_STATES:
+            return
+
+        by_age = sorted(states, key=lambda axhash: states[axhash], reverse=True)
+        expired = set(by_age[MAX_CACHED_STATES:])
+        for fname in os.listdir(self.cachedir):
+            if fname.split('-', 1)[0] in expired:
+                os.remove(os.path.join(self.cachedir, fname))
+
+    def getEntailmentResults(self, axhash, reasoner_str):
+        """
+        Returns the cached entailment check results for an ontology state as
+        a dictionary with the elements 'is_consistent' (a boolean) and
+        'unsatisfiable_classes' (a list of class IRI strings), or None if no
+        results are cached.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        """
+        results = self._readResults(axhash, reasoner_str)
+        if 'is_consistent' not in results:
+            return None
+
+        return {
+            'is_consistent': results['is_consistent'],
+            'unsatisfiable_classes': results.get('unsatisfiable_classes', [])
+        }
+
+    def storeEntailmentResults(self, axhash, reasoner_str, report):
+        """
+        Stores entailment check results for an ontology state.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        report: An entailment check report, as returned by
+            Ontology.checkEntailmentErrors().
+        """
+        results = self._readResults(axhash, reasoner_str)
+        results['is_consistent'] = report['is_consistent']
+        results['unsatisfiable_classes'] = [
+            owlclass.getIRI().toString()
+            for owlclass in report['unsatisfiable_classes']
+        ]
+
+        self._writeResults(axhash, reasoner_str, results)
+
+    def getClassHierarchy(self, axhash, reasoner_str):
+        """
+        Returns the cached inferred class hierarchy for an ontology state as a
+        dictionary that maps each class IRI string to a list of the IRI
+        strings of its direct superclasses, or None if no hierarchy is cached.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        """
+        return self._readResults(axhash, reasoner_str).get('superclasses')
+
+    def storeClassHierarchy(self, axhash, reasoner_str, superclasses):
+        """
+        Stores the inferred class hierarchy for an ontology state.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        superclasses: A dictionary that maps each class IRI string to a list
+            of the IRI strings of its direct superclasses.
+        """
+        results = self._readResults(axhash, reasoner_str)
+        results['superclasses'] = superclasses
+
+        self._writeResults(axhash, reasoner_str, results)
+
+    def getExcludedTypes(self, axhash, reasoner_str, specs_key):
+        """
+        Returns a list of the cached IRI strings of the excluded types for an
+        ontology state and a set of excluded types specifications, or None if
+        the excluded types are not cached.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        specs_key: A string that identifies the excluded types
+            specifications.
+        """
+        results = self._readResults(axhash, reasoner_str)
+
+        return results.get('excluded_types', {}).get(specs_key)
+
+    def storeExcludedTypes(self, axhash, reasoner_str, specs_key, iristrs):
+        """
+        Stores the excluded types for an ontology state and a set of excluded
+        types specifications.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        specs_key: A string that identifies the excluded types
+            specifications.
+        iristrs: A list of the IRI strings of the excluded types.
+        """
+        results = self._readResults(axhash, reasoner_str)
+        results.setdefault('excluded_types', {})[specs_key] = iristrs
+
+        self._writeResults(axhash, reasoner_str, results)
+
+    def getInferredAxioms(
+        self, axhash, reasoner_str, inference_types, variant=''
+    ):
+        """
+        Returns a Java set of the cached inferred axioms for an ontology state
+        and a set of inference types, or None if no axioms are cached.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        inference_types: A list of inference type strings.
+        variant (optional): A string that identifies any other settings that
+            affect which axioms are generated (e.g., excluded types).
+        """
+        axpath = self._getInferencesPath(
+            axhash, reasoner_str, inference_types, variant
+        )
+        if not(os.path.isfile(axpath)):
+            return None
+
+        # Use a separate ontology manager so that loading the cached axioms
+        # cannot interfere with any other ontologies.
+        oom = OWLManager.createOWLOntologyManager()
+        try:
+            cacheont = oom.loadOntologyFromOntologyDocument(File(axpath))
+        except Exception as err:
+            logger.warning(
+                'Unable to read the cached inferred axioms in "{0}": '
+                '{1}.'.format(axpath, err)
+            )
+            return None
+
+        # The OWL API adds declarations for all entities when it writes an
+        # ontology, so only keep the logical axioms.
+        axioms = HashSet()
+        for axiom in cacheont.getAxioms():
+            if axiom.isLogicalAxiom():
+                axioms.add(axiom)
+
+        return axioms
+
+    def storeInferredAxioms(
+        self, axhash, reasoner_str, inference_types, axioms, variant=''
+    ):
+        """
+        Stores the inferred axioms for an ontology state and a set of
+        inference types.
+
+        axhash: A logical axioms hash string.
+        reasoner_str: The name of the reasoner.
+        inference_types: A list of inference type strings.
+        axioms: A Java collection of OWL API axioms.
+        variant (optional): A string that identifies any other settings that
+            affect which axioms are generated (e.g., excluded types).
+        """
+        if not(self._checkCacheDir()):
+            return
+
+        axpath = self._getInferencesPath(
+            axhash, reasoner_str, inference_types, variant
+        )
+
+        oom = OWLManager.createOWLOntologyManager()
+        cacheont = oom.createOntology(HashSet(axioms))
+        foutputstream = FileOutputStream(File(axpath))
+        try:
+            oom.saveOntology(
+                cacheont, FunctionalSyntaxDocumentFormat(), foutputstream
+            )
+        finally:
+            foutputstream.close()
+
+        self._pruneCache()
@@ -70,11 +70,13 @@ class ReleaseBuildTarget(BuildTargetWithConfig):
         newargs.merge_imports = True
         self.mobt_merged = ModifiedOntoBuildTarget(newargs, False, self.config)
 
+        # Both modified ontology targets use the same compiled ontology target
+        # so that the compiled ontology is only built (and loaded) once.
         newargs = _ArgsType(args)
         newargs.merge_imports = True
         newargs.reason = True
         self.mobt_merged_reasoned = ModifiedOntoBuildTarget(
-            newargs, False, self.config
+            newargs, False, self.config, self.mobt_merged.getOntoBuildTarget()
         )
 
         self.addDependency(self.mobt_merged)
@@ -199,9 +201,31 @@ class ReleaseBuildTarget(BuildTargetWithConfig):
                 )
             )
 
+    def getTargetKey(self):
+        """
+        Extends the default target key with the release directory, which
+        depends on the release date.
+        """
+        return BuildTargetWithConfig.getTargetKey(self) + (self.release_dir,)
+
     def getBuildNotRequiredMsg(self):
         return 'The release files are already up to date.'
 
+    def _getSourceOntology(self, sourcepath):
+        """
+        Returns an Ontology object for a release source file.  If the source
+        ontology was built as part of this build run, a copy of the in-memory
+        build product is returned; otherwise, the source file is loaded.  A
+        copy is needed because the release IRIs must not be applied to build
+        products that might be shared with other build targets.
+
+        sourcepath: The location of the source ontology file.
+        """
+        if sourcepath in self.products:
+            return self.products[sourcepath].getCopy()
+        else:
+            return Ontology(sourcepath)
+
     def _isBuildRequired(self):
         """
         Checks if all of the release files already exist.  If not, returns
@@ -240,14 +264,14 @@ class ReleaseBuildTarget(BuildTargetWithConfig):
         # Create the release import module files.
         logger.info('Creating release import modules...')
         for fileinfo in self.imports_fileinfos:
-            ont = Ontology(fileinfo.sourcepath)
+            ont = self._getSourceOntology(fileinfo.sourcepath)
             ont.setOntologyID(fileinfo.destIRI, fileinfo.versionIRI)
             ont.saveOntology(fileinfo.destpath)
 
         # Create the release ontology files.
         logger.info('Creating release ontology files...')
         for fileinfo in self.ont_fileinfos:
-            ont = Ontology(fileinfo.sourcepath)
+            ont = self._getSourceOntology(fileinfo.sourcepath)
             ont.setOntologyID(fileinfo.destIRI, fileinfo.versionIRI)
 
             # Update the IRIs of any released import modules that are
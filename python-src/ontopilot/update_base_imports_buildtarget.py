@@ -24,6 +24,7 @@ from __future__ import unicode_literals
 import os
 from ontopilot import logger
 from ontology import Ontology
+import nethelper
 from buildtarget import BuildTargetWithConfig
 from imports_buildtarget import ImportsBuildTarget
 
@@ -134,6 +135,20 @@ class UpdateBaseImportsBuildTarget(BuildTargetWithConfig):
         self._retrieveAndCheckFilePaths()
 
         baseont = Ontology(self.base_ont_path)
+
+        # Check all import IRIs for redirects concurrently, reusing the
+        # results from previous builds, if possible.
+        nethelper.setRedirectCache(
+            os.path.join(
+                self.config.getBuildDir(), nethelper.REDIRECT_CACHE_FILE
+            ),
+            self.config.getRedirectCacheTTL()
+        )
+        baseont.prefetchImportRedirects(
+            [importinfo.iristr for importinfo in importinfos],
+            self.config.getImportsBuildThreads()
+        )
+
         # Add an import declaration for each import module.
         for importinfo in importinfos:
             baseont.addImport(importinfo.iristr, True)
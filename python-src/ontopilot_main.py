@@ -31,6 +31,7 @@ from ontopilot import UpdateBaseImportsBuildTarget
 from ontopilot import InferencePipelineBuildTarget
 from ontopilot import FindEntitiesBuildTarget
 from ontopilot import BuildTargetManager
+from ontopilot.download_manager import REFRESH_POLICIES
 
 # Java imports.
 
@@ -91,6 +92,15 @@ argp.add_argument(
     'a custom date for a release build.  The date must be in the format '
     'YYYY-MM-DD.'
 )
+argp.add_argument(
+    '--refresh_sources', type=str, required=False, default='never',
+    choices=REFRESH_POLICIES, help='The policy for refreshing previously '
+    'downloaded source ontologies when building import modules.  If "never" '
+    '(the default), existing local copies are always used.  If "check", each '
+    'source ontology is revalidated with its server and only downloaded again '
+    'if it has changed.  If "always", all source ontologies are downloaded '
+    'again.  Import modules are rebuilt if their source ontology changed.'
+)
 argp.add_argument(
     '-i', '--input_data', type=str, required=False, default='', help='The '
     'path to a source ontology/data set to use when running in inference '
@@ -98,6 +108,16 @@ argp.add_argument(
     'mode.  If no source path is provided, the input will be read from '
     'standard in.'
 )
+argp.add_argument(
+    '-b', '--batch_input', type=str, required=False, default=[],
+    action='append', help='The path to a source ontology/data file, or a '
+    'directory of such files, to process in batch mode when running in '
+    'inference pipeline mode.  This option can be repeated to specify multiple '
+    'files and/or directories.  In batch mode, the shared imports of the data '
+    'sets are only loaded and classified once, and the output path (--fileout) '
+    'must be a directory, which will receive one output file for each input '
+    'file.'
+)
 argp.add_argument(
     '-o', '--fileout', type=str, required=False, default='', help='The path '
     'to an output file to use when running in inference pipeline mode or '
@@ -117,10 +137,13 @@ argp.add_argument(
     )
 )
 argp.add_argument(
-    'taskarg', type=str, nargs='?', default='ontology', help='Additional '
+    'taskarg', type=str, nargs='*', default=['ontology'], help='Additional '
     'argument for the specified build task.  For the build task "make", this '
-    'should be either {0}.  For the build task "initialize", this should be '
-    'the name of an OWL file for a new ontology project.'.format(
+    'should be either {0}.  More than one "make" argument can be given (e.g., '
+    '"make imports ontology release"), in which case all of the build tasks '
+    'will be run in the order given and build steps shared by more than one '
+    'task will only be run once.  For the build task "initialize", this '
+    'should be the name of an OWL file for a new ontology project.'.format(
         buildtm.getBuildTargetNamesStr('taskarg', task='make')
     )
 )
@@ -130,15 +153,23 @@ args = argp.parse_args()
 if args.quiet:
     ontopilot.setLogLevel(logging.ERROR)
 
-# Get and run the appropriate build target.
+# Get and run the appropriate build targets.
 try:
-    target = buildtm.getBuildTarget(args, targetname_arg='task')
-    if target.isBuildRequired() or args.force:
-        target.run(args.force)
-        sys.exit(0)
-    else:
-        print '\n', target.getBuildNotRequiredMsg(), '\n'
-        sys.exit(0)
+    targets = buildtm.getBuildTargets(
+        args, targetname_arg='task', multiarg='taskarg'
+    )
+    for target in targets:
+        # A target might have already been run as a dependency of a previous
+        # build task.
+        if target.hasRun():
+            continue
+
+        if target.isBuildRequired() or args.force:
+            target.run(args.force)
+        else:
+            print '\n', target.getBuildNotRequiredMsg(), '\n'
+
+    sys.exit(0)
 except (ConfigError, RuntimeError) as err:
     print '\n', unicode(err), '\n'
     sys.exit(1)
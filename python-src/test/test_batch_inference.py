@@ -0,0 +1,168 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.ontology import Ontology
+from ontopilot.inferred_axiom_adder import InferredAxiomAdder
+from ontopilot.batch_inference import BatchInferencePipeline
+import unittest
+import tempfile
+import shutil
+import os.path
+
+# Java imports.
+from java.io import File
+from org.semanticweb.owlapi.model import IRI, AddImport
+
+
+class Test_BatchInferencePipeline(unittest.TestCase):
+    """
+    Tests the BatchInferencePipeline class.
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        # Create three data sets that import the test ontology.  The last
+        # data set also contains a TBox axiom.
+        self.datapaths = []
+        for cnt in range(3):
+            ont = self._getDataSet(cnt)
+
+            indv_ids = ['OBTO:91{0}0'.format(cnt), 'OBTO:91{0}1'.format(cnt)]
+            for indv_id in indv_ids:
+                ont.createNewIndividual(indv_id).addType('OBTO:0012')
+            ont.getExistingIndividual(indv_ids[0]).addObjectPropertyFact(
+                'OBTO:0001', indv_ids[1]
+            )
+            if cnt == 2:
+                ont.createNewClass('OBTO:0190').addSuperclass('OBTO:0012')
+
+            datapath = os.path.join(self.tmpdir, 'data{0}.owl'.format(cnt))
+            ont.saveOntology(datapath)
+            self.datapaths.append(datapath)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _getDataSet(self, cnt):
+        """
+        Returns a new, empty data set ontology that imports the test ontology.
+        """
+        importIRI = IRI.create(File('test_data/ontology.owl').getAbsoluteFile())
+
+        ont = Ontology()
+        ont.setOntologyID('http://example.org/data{0}.owl'.format(cnt))
+        ont.ontman.applyChange(AddImport(
+            ont.getOWLOntology(), ont.df.getOWLImportsDeclaration(importIRI)
+        ))
+
+        return ont
+
+    def _getAxioms(self, ontology, filename):
+        """
+        Saves an ontology and returns the axioms of the saved copy, so that
+        ontologies can be compared after serialization.
+        """
+        outpath = os.path.join(self.tmpdir, filename)
+        ontology.saveOntology(outpath)
+
+        return Ontology(outpath).getOWLOntology().getAxioms()
+
+    def test_processOntology(self):
+        """
+        Verifies that the results of batch processing are the same as the
+        results of running InferredAxiomAdder on each data set.
+        """
+        inftypes = ['subclasses', 'types', 'disjoint classes']
+
+        pipeline = BatchInferencePipeline('HermiT', inftypes, annotate=True)
+
+        tboxonts = []
+        for datapath in self.datapaths:
+            ont = Ontology(datapath)
+            iaa = InferredAxiomAdder(ont, 'HermiT')
+            iaa.addInferredAxioms(inftypes, annotate=True)
+            expected = self._getAxioms(ont, 'expected.owl')
+
+            outpath = os.path.join(self.tmpdir, 'out.owl')
+            pipeline.processOntology(datapath, outpath)
+            result = Ontology(outpath).getOWLOntology().getAxioms()
+
+            self.assertTrue(expected.equals(result))
+            tboxonts.append(pipeline.tboxont)
+
+        # All data sets that do not contain TBox axioms share the classified
+        # TBox.
+        self.assertIsNotNone(tboxonts[0])
+        self.assertIs(tboxonts[0], tboxonts[1])
+        self.assertIs(tboxonts[0], tboxonts[2])
+
+        pipeline.dispose()
+        self.assertIsNone(pipeline.tboxont)
+
+    def test_inconsistent(self):
+        """
+        Verifies that inconsistent data sets are detected even if no ABox
+        inferences are requested.
+        """
+        ont = self._getDataSet(3)
+        indv = ont.createNewIndividual('OBTO:9130')
+        indv.addType('OBTO:0010')
+        indv.addType('OBTO:0011')
+        datapath = os.path.join(self.tmpdir, 'data3.owl')
+        ont.saveOntology(datapath)
+
+        pipeline = BatchInferencePipeline('HermiT', ['subclasses'])
+        outpath = os.path.join(self.tmpdir, 'out.owl')
+        with self.assertRaisesRegexp(
+            RuntimeError, 'The ontology is inconsistent'
+        ):
+            pipeline.processOntology(datapath, outpath)
+
+        pipeline.dispose()
+
+    def test_nominals(self):
+        """
+        Verifies that data sets that use nominals are processed separately.
+        """
+        inftypes = ['subclasses', 'types']
+
+        ont = self._getDataSet(4)
+        indv_a = ont.createNewIndividual('OBTO:9140').getOWLAPIObj()
+        indv_b = ont.createNewIndividual('OBTO:9141').getOWLAPIObj()
+        prop = ont.df.getOWLObjectProperty(
+            IRI.create('http://purl.obolibrary.org/obo/OBTO_0001')
+        )
+        ont.addEntityAxiom(ont.df.getOWLClassAssertionAxiom(
+            ont.df.getOWLObjectHasValue(prop, indv_b), indv_a
+        ))
+        datapath = os.path.join(self.tmpdir, 'data4.owl')
+        ont.saveOntology(datapath)
+
+        expected_ont = Ontology(datapath)
+        iaa = InferredAxiomAdder(expected_ont, 'HermiT')
+        iaa.addInferredAxioms(inftypes)
+        expected = self._getAxioms(expected_ont, 'expected.owl')
+
+        pipeline = BatchInferencePipeline('HermiT', inftypes)
+        outpath = os.path.join(self.tmpdir, 'out.owl')
+        pipeline.processOntology(datapath, outpath)
+        result = Ontology(outpath).getOWLOntology().getAxioms()
+
+        self.assertTrue(expected.equals(result))
+        self.assertIsNone(pipeline.tboxont)
+
+        pipeline.dispose()
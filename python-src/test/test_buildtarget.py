@@ -160,6 +160,61 @@ class TestBuildTarget(unittest.TestCase):
         self.assertEqual(1, target1.run_cnt)
         self.assertEqual(1, target2.run_cnt)
 
+        # Test a dependency that is shared by two other dependencies.  The
+        # shared dependency's products should be merged without error.
+        shared = Target2()
+        target3 = Target1()
+        target3.build_products = {}
+        target3.addDependency(shared)
+        target4 = Target1()
+        target4.build_products = {'product 3': 'something new'}
+        target4.addDependency(shared)
+        target1 = Target1()
+        target1.addDependency(target3)
+        target1.addDependency(target4)
+        result = target1.run()
+        self.assertEqual(
+            {
+                'product 1': 'something',
+                'product 2': 'something else',
+                'product 3': 'something new'
+            },
+            result
+        )
+
+        # Verify that the products of a shared dependency that was already run
+        # are still passed to a dependent target that runs later.
+        shared = Target1()
+        target3 = Target2()
+        target3.addDependency(shared)
+        self.assertEqual(COMBINED_PRODUCTS, target3.run())
+        shared.build_required = False
+        target4 = Target2()
+        target4.addDependency(shared)
+        self.assertEqual(COMBINED_PRODUCTS, target4.run())
+
+        # Verify that a shared dependency is only run once during a build
+        # session, even when a build is forced, and that dependent targets
+        # still detect that the shared dependency was built.
+        shared = Target2()
+        target3 = Target1()
+        target3.build_products = {}
+        target3.addDependency(shared)
+        target4 = Target1()
+        target4.build_required = False
+        target4.build_products = {}
+        target4.addDependency(shared)
+        self.assertFalse(shared.hasRun())
+        target3.run(force_build=True)
+        self.assertTrue(shared.hasRun())
+        self.assertTrue(target4.isBuildRequired())
+        self.assertEqual(
+            {'product 2': 'something else'}, target4.run(force_build=True)
+        )
+        self.assertEqual(1, shared.run_cnt)
+        self.assertEqual(1, target3.run_cnt)
+        self.assertEqual(1, target4.run_cnt)
+
 
 # Define a dummy concrete build targets to test TestBuildTargetWithConfig.
 class Target1Config(BuildTargetWithConfig):
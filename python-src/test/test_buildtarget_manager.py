@@ -28,6 +28,25 @@ class Target3 (Target2):
 class Target4 (Target2):
     pass
 
+# Define build targets that can be shared when their dependency graphs are
+# merged.  SharedTarget instances are all interchangeable, and each
+# DependentTarget depends on its own SharedTarget instance.
+class SharedTarget (Target2):
+    def getTargetKey(self):
+        return (self.__class__,)
+class DependentTarget (Target1):
+    def __init__(self, args=None):
+        Target1.__init__(self, args)
+        self.shared = SharedTarget()
+        self.addDependency(self.shared)
+        self.build_products = {}
+    def getTargetKey(self):
+        return (self.__class__,)
+class DependentTarget1 (DependentTarget):
+    pass
+class DependentTarget2 (DependentTarget):
+    pass
+
 
 class ArgVals:
     """
@@ -321,3 +340,55 @@ class TestBuildTargetManager(unittest.TestCase):
         ):
             btr.getBuildTarget(args, targetname_arg='task')
 
+    def test_getBuildTargets(self):
+        btr = BuildTargetManager()
+        btr.addBuildTarget(Target1, task='target1')
+        btr.addBuildTarget(DependentTarget1, task='make', taskarg='dep1')
+        btr.addBuildTarget(DependentTarget2, task='make', taskarg='dep2')
+        btr.addBuildTarget(SharedTarget, task='make', taskarg='shared')
+
+        # Test an argument that does not have multiple values.
+        args = ArgVals(task='target1')
+        btargets = btr.getBuildTargets(args, 'task', 'taskarg')
+        self.assertEqual(1, len(btargets))
+        self.assertTrue(isinstance(btargets[0], Target1))
+
+        # Test multiple argument values with a dependency shared by both
+        # targets.  The shared dependency should be merged into a single
+        # instance, including the instance attributes that refer to it.
+        args = ArgVals(task='make', taskarg=['dep1', 'dep2'])
+        btargets = btr.getBuildTargets(args, 'task', 'taskarg')
+        self.assertEqual(2, len(btargets))
+        self.assertTrue(isinstance(btargets[0], DependentTarget1))
+        self.assertTrue(isinstance(btargets[1], DependentTarget2))
+        shared = btargets[0].dependencies[0]
+        self.assertIs(shared, btargets[1].dependencies[0])
+        self.assertIs(shared, btargets[0].shared)
+        self.assertIs(shared, btargets[1].shared)
+
+        # Running both targets should only run the shared dependency once, and
+        # the second target should still receive its products.
+        self.assertEqual(
+            {'product 2': 'something else'}, btargets[0].run(force_build=True)
+        )
+        self.assertEqual(
+            {'product 2': 'something else'}, btargets[1].run(force_build=True)
+        )
+        self.assertEqual(1, shared.run_cnt)
+        self.assertEqual(1, btargets[0].run_cnt)
+        self.assertEqual(1, btargets[1].run_cnt)
+
+        # Test a top-level target that is also a dependency of another target,
+        # and verify that duplicate argument values are removed.
+        args = ArgVals(task='make', taskarg=['dep1', 'shared', 'dep1'])
+        btargets = btr.getBuildTargets(args, 'task', 'taskarg')
+        self.assertEqual(2, len(btargets))
+        self.assertTrue(isinstance(btargets[1], SharedTarget))
+        self.assertIs(btargets[1], btargets[0].dependencies[0])
+
+        # Test an invalid argument value.
+        args = ArgVals(task='make', taskarg=['dep1', 'invalid'])
+        with self.assertRaisesRegexp(
+            RuntimeError, 'Unknown build target'
+        ):
+            btr.getBuildTargets(args, 'task', 'taskarg')
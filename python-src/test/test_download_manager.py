@@ -0,0 +1,246 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.download_manager import DownloadManager, DownloadError
+from ontopilot.download_manager import METADATA_SUFFIX, PARTIAL_SUFFIX
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+import threading
+import tempfile
+import shutil
+import os.path
+import unittest
+
+# Java imports.
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles requests for the stand-in HTTP server.  The served files, their
+    ETags, and a log of the received requests are stored as attributes of the
+    server object.
+    """
+    def log_message(self, format, *args):
+        # Don't clutter the test output.
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/ont.owl')
+            self.end_headers()
+            return
+
+        if self.path not in self.server.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = self.server.files[self.path]
+        etag = self.server.etags[self.path]
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        rangeval = self.headers.get('Range')
+        if rangeval is not None and self.headers.get('If-Range') == etag:
+            start = int(rangeval[len('bytes='):].rstrip('-'))
+            self.send_response(206)
+            self.send_header(
+                'Content-Range', 'bytes {0}-{1}/{2}'.format(
+                    start, len(body) - 1, len(body)
+                )
+            )
+            body = body[start:]
+        else:
+            self.send_response(200)
+
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestDownloadManager(unittest.TestCase):
+    """
+    Tests the DownloadManager class using a local stand-in HTTP server.
+    """
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), StandInRequestHandler)
+        self.server.files = {
+            '/ont.owl': b'<ontology version="1"/>',
+            '/ont2.owl': b'<ontology name="ont2"/>'
+        }
+        self.server.etags = {'/ont.owl': '"v1"', '/ont2.owl': '"a"'}
+        self.server.requests = []
+
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        self.baseurl = 'http://127.0.0.1:{0}'.format(
+            self.server.server_address[1]
+        )
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.destpath = os.path.join(self.tmpdir, 'ont.owl')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def _readFile(self, fpath):
+        with open(fpath, 'rb') as fin:
+            return fin.read()
+
+    def test_init(self):
+        with self.assertRaisesRegexp(
+            RuntimeError, 'Invalid source refresh policy'
+        ):
+            DownloadManager('sometimes')
+
+    def test_retrieve(self):
+        url = self.baseurl + '/ont.owl'
+
+        # Test a new download.
+        dm = DownloadManager()
+        self.assertTrue(dm.retrieve(url, self.destpath))
+        self.assertEqual(
+            self.server.files['/ont.owl'], self._readFile(self.destpath)
+        )
+        self.assertFalse(os.path.exists(self.destpath + PARTIAL_SUFFIX))
+        metadata = dm.readMetadata(self.destpath)
+        self.assertEqual('"v1"', metadata['etag'])
+        self.assertEqual(url, metadata['url'])
+        self.assertEqual(1, len(self.server.requests))
+
+        # A file should only be retrieved once per download manager.
+        self.assertFalse(dm.retrieve(url, self.destpath))
+        self.assertEqual(1, len(self.server.requests))
+
+        # With the "never" policy, the existing copy should be used without
+        # contacting the server.
+        dm = DownloadManager('never')
+        self.assertFalse(dm.retrieve(url, self.destpath))
+        self.assertEqual(1, len(self.server.requests))
+
+        # Test a redirect.
+        destpath = os.path.join(self.tmpdir, 'redirected.owl')
+        self.assertTrue(dm.retrieve(self.baseurl + '/redirect', destpath))
+        self.assertEqual(
+            self.server.files['/ont.owl'], self._readFile(destpath)
+        )
+        self.assertEqual(url, dm.readMetadata(destpath)['final_url'])
+
+        # Test a missing file.
+        with self.assertRaisesRegexp(DownloadError, 'HTTP status 404'):
+            dm.retrieve(
+                self.baseurl + '/missing.owl',
+                os.path.join(self.tmpdir, 'missing.owl')
+            )
+
+    def test_revalidation(self):
+        url = self.baseurl + '/ont.owl'
+        DownloadManager().retrieve(url, self.destpath)
+        self.server.requests = []
+
+        # Revalidate an unchanged file.
+        dm = DownloadManager('check')
+        self.assertFalse(dm.retrieve(url, self.destpath))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(
+            '"v1"', self.server.requests[0][1].get('if-none-match')
+        )
+
+        # Revalidate a changed file.
+        self.server.files['/ont.owl'] = b'<ontology version="2"/>'
+        self.server.etags['/ont.owl'] = '"v2"'
+        dm = DownloadManager('check')
+        self.assertTrue(dm.retrieve(url, self.destpath))
+        self.assertEqual(
+            self.server.files['/ont.owl'], self._readFile(self.destpath)
+        )
+        self.assertEqual('"v2"', dm.readMetadata(self.destpath)['etag'])
+
+        # Test the "always" policy.
+        self.server.requests = []
+        dm = DownloadManager('always')
+        self.assertTrue(dm.retrieve(url, self.destpath))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertNotIn('if-none-match', self.server.requests[0][1])
+
+    def test_resume(self):
+        url = self.baseurl + '/ont.owl'
+        body = self.server.files['/ont.owl']
+
+        # Simulate an interrupted download.
+        with open(self.destpath + PARTIAL_SUFFIX, 'wb') as fout:
+            fout.write(body[:10])
+        with open(self.destpath + METADATA_SUFFIX, 'w') as fout:
+            fout.write('{"partial": {"etag": "\\"v1\\"", "last_modified": ""}}')
+
+        dm = DownloadManager()
+        self.assertTrue(dm.retrieve(url, self.destpath))
+        self.assertEqual(body, self._readFile(self.destpath))
+        self.assertEqual(
+            'bytes=10-', self.server.requests[0][1].get('range')
+        )
+        self.assertNotIn('partial', dm.readMetadata(self.destpath))
+
+        # If the remote file changed since the interrupted download, the
+        # server sends the whole file, and the download should start over.
+        os.remove(self.destpath)
+        with open(self.destpath + PARTIAL_SUFFIX, 'wb') as fout:
+            fout.write(body[:10])
+        with open(self.destpath + METADATA_SUFFIX, 'w') as fout:
+            fout.write('{"partial": {"etag": "\\"v0\\"", "last_modified": ""}}')
+
+        dm = DownloadManager()
+        self.assertTrue(dm.retrieve(url, self.destpath))
+        self.assertEqual(body, self._readFile(self.destpath))
+
+    def test_retrieveAll(self):
+        downloads = [
+            (self.baseurl + '/ont.owl', self.destpath),
+            (self.baseurl + '/ont2.owl', os.path.join(self.tmpdir, 'ont2.owl')),
+            (self.baseurl + '/ont.owl', self.destpath)
+        ]
+
+        dm = DownloadManager()
+        downloaded = dm.retrieveAll(downloads, 4)
+        self.assertEqual(
+            sorted([self.destpath, downloads[1][1]]), sorted(downloaded)
+        )
+        self.assertEqual(2, len(self.server.requests))
+        for url, destpath in downloads:
+            self.assertEqual(
+                self.server.files[url[len(self.baseurl):]],
+                self._readFile(destpath)
+            )
+
+        # Test error reporting.
+        downloads.append(
+            (self.baseurl + '/missing.owl', os.path.join(self.tmpdir, 'm.owl'))
+        )
+        with self.assertRaisesRegexp(DownloadError, 'HTTP status 404'):
+            DownloadManager('always').retrieveAll(downloads, 2)
+
@@ -0,0 +1,144 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.ontology import Ontology
+from ontopilot.entailment_checker import TieredEntailmentChecker
+import unittest
+
+# Java imports.
+
+
+class Test_TieredEntailmentChecker(unittest.TestCase):
+    """
+    Tests the TieredEntailmentChecker class.
+    """
+    def setUp(self):
+        # Build an ontology with one class that is unsatisfiable because of
+        # OWL 2 EL axioms (OBTO:0102), one class that is unsatisfiable because
+        # of a non-EL axiom (OBTO:0105), and two satisfiable classes that do
+        # not depend on any non-EL axioms (OBTO:0106 and OBTO:0107).
+        self.ont = Ontology()
+        for cnt in range(8):
+            self.ont.createNewClass('OBTO:010' + str(cnt))
+
+        self.ont.getExistingClass('OBTO:0102').addSuperclass('OBTO:0100')
+        self.ont.getExistingClass('OBTO:0102').addSuperclass('OBTO:0101')
+        self.ont.getExistingClass('OBTO:0100').addDisjointWith('OBTO:0101')
+
+        self.ont.getExistingClass('OBTO:0105').addSuperclass('OBTO:0104')
+        self.ont.getExistingClass('OBTO:0105').addSuperclass('not OBTO:0104')
+        self.ont.getExistingClass('OBTO:0103').addSuperclass(
+            'OBTO:0100 or OBTO:0104'
+        )
+
+        self.ont.getExistingClass('OBTO:0107').addSuperclass('OBTO:0106')
+
+        self.checker = TieredEntailmentChecker(self.ont, 'HermiT')
+
+    def _getIRIStrs(self, report):
+        return set([
+            owlclass.getIRI().toString()
+            for owlclass in report['unsatisfiable_classes']
+        ])
+
+    def test_partitionAxioms(self):
+        axioms, nonel_axioms = self.checker._partitionAxioms()
+
+        self.assertEqual(7, axioms.size())
+        self.assertEqual(2, nonel_axioms.size())
+
+    def test_getTaintedEntities(self):
+        axioms, nonel_axioms = self.checker._partitionAxioms()
+        tainted = self.checker._getTaintedEntities(axioms, nonel_axioms)
+        tainted_iris = set([entity.getIRI().toString() for entity in tainted])
+
+        # OBTO:0103 and OBTO:0105 trigger non-EL axioms.  None of the other
+        # classes are subclasses of either class.
+        self.assertEqual(
+            {
+                'http://purl.obolibrary.org/obo/OBTO_0103',
+                'http://purl.obolibrary.org/obo/OBTO_0105'
+            },
+            tainted_iris
+        )
+
+    def test_checkEntailmentErrors(self):
+        expected = self._getIRIStrs(self.ont.checkEntailmentErrors('HermiT'))
+        self.assertEqual(
+            {
+                'http://purl.obolibrary.org/obo/OBTO_0102',
+                'http://purl.obolibrary.org/obo/OBTO_0105'
+            },
+            expected
+        )
+
+        # Test checking a module with the DL reasoner and falling back to the
+        # full ontology.
+        for max_fraction in (1.0, 0.0):
+            self.checker.MAX_MODULE_FRACTION = max_fraction
+            report = self.checker.checkEntailmentErrors()
+            self.assertTrue(report['is_consistent'])
+            self.assertEqual(expected, self._getIRIStrs(report))
+
+        # Test an ontology that is entirely in OWL 2 EL.
+        self.ont.removeEntity(self.ont.getExistingClass('OBTO:0103'))
+        self.ont.removeEntity(self.ont.getExistingClass('OBTO:0105'))
+        report = self.checker.checkEntailmentErrors()
+        self.assertTrue(report['is_consistent'])
+        self.assertEqual(
+            {'http://purl.obolibrary.org/obo/OBTO_0102'},
+            self._getIRIStrs(report)
+        )
+
+    def test_inconsistent(self):
+        testont = Ontology('test_data/inconsistent.owl')
+        report = testont.checkEntailmentErrors(tiered=True)
+        self.assertFalse(report['is_consistent'])
+        self.assertEqual(0, len(report['unsatisfiable_classes']))
+
+        # Without the instance of the unsatisfiable class, the ontology is
+        # consistent but incoherent.
+        testont.removeEntity(testont.getExistingIndividual('obo:OBTO_9000'))
+        report = testont.checkEntailmentErrors(tiered=True)
+        self.assertTrue(report['is_consistent'])
+        self.assertEqual(
+            {'http://purl.obolibrary.org/obo/OBTO_0011'},
+            self._getIRIStrs(report)
+        )
+
+    def test_ELKUnsupportedAxioms(self):
+        """
+        Tests an ontology in OWL 2 EL that is only inconsistent because of
+        axioms that ELK does not support.
+        """
+        testont = Ontology()
+        indv_a = testont.createNewIndividual('OBTO:8100').getOWLAPIObj()
+        indv_b = testont.createNewIndividual('OBTO:8101').getOWLAPIObj()
+        testont.addEntityAxiom(
+            testont.df.getOWLSameIndividualAxiom(indv_a, indv_b)
+        )
+        testont.addEntityAxiom(
+            testont.df.getOWLDifferentIndividualsAxiom(indv_a, indv_b)
+        )
+
+        checker = TieredEntailmentChecker(testont, 'HermiT')
+        axioms, nonel_axioms = checker._partitionAxioms()
+        self.assertEqual(2, axioms.size())
+        self.assertEqual(2, nonel_axioms.size())
+
+        report = checker.checkEntailmentErrors()
+        self.assertFalse(report['is_consistent'])
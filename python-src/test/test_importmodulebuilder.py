@@ -16,11 +16,17 @@
 
 # Python imports.
 from ontopilot.importmodulebuilder import ImportModuleBuilder
+from ontopilot.importmodulebuilder import (
+    FULL_BUILD, INCREMENTAL_BUILD, UNCHANGED_BUILD
+)
+from ontopilot.module_extractor import methods as me_methods, rel_axiom_types
 from ontopilot.ontology import Ontology
 from ontopilot.tablereader import TableRow
 from test_tablereader import TableStub
 import unittest
 import os.path
+import tempfile
+import shutil
 
 # Java imports.
 from java.util import HashSet
@@ -68,6 +74,14 @@ class TestImportModuleBuilder(unittest.TestCase):
                 testval[0], self.imb._getOutputFileName(testval[1])
             )
 
+        # Test a module name qualifier.
+        self.assertEqual(
+            'ontfile_branch_import_module.owl',
+            self.imb._getOutputFileName(
+                'http://import.ontology/iri/ontfile.owl', 'branch'
+            )
+        )
+
     def test_getModulePath(self):
         outputdir = os.path.join(self.td_path, 'imports')
 
@@ -93,6 +107,16 @@ class TestImportModuleBuilder(unittest.TestCase):
                 testval[0], self.imb.getModulePath(testval[1])
             )
 
+    def test_getSourceOntologyPath(self):
+        cachedir = os.path.join(self.td_path, 'imports', 'source_ontologies')
+
+        self.assertEqual(
+            os.path.join(cachedir, 'ontfile.owl'),
+            self.imb.getSourceOntologyPath(
+                'http://import.ontology/iri/ontfile.owl'
+            )
+        )
+
     def test_getModuleIRIStr(self):
         # Define the list of test values.  Each tuple is in the order
         # (expected_module_IRI, base_IRI, import_IRI).
@@ -122,3 +146,104 @@ class TestImportModuleBuilder(unittest.TestCase):
         ):
             self.imb.getModuleIRIStr('http://import.ontology/iri/ontfile.owl')
 
+    def test_getBuildStrategy(self):
+        ontIRI = 'http://import.ontology/iri/ontfile.owl'
+        tmpdir = tempfile.mkdtemp()
+        try:
+            imb = ImportModuleBuilder(self.baseIRI, self.mod_suffix, tmpdir)
+
+            sourcepath = os.path.join(tmpdir, 'ontfile.owl')
+            with open(sourcepath, 'w') as fout:
+                fout.write('source ontology')
+            fprint = imb._getSourceFingerprint(sourcepath)
+
+            termspecs = [
+                ('OBTO:0001', False, me_methods.SINGLE, ()),
+                (
+                    'OBTO:0010', False, me_methods.LOCALITY,
+                    (rel_axiom_types.DESCENDANTS,)
+                )
+            ]
+            termrows = [(None, termspec) for termspec in termspecs]
+
+            # Without a previous build, a full build is required.
+            strategy, state = imb._getBuildStrategy(ontIRI, '', fprint, termrows)
+            self.assertEqual(FULL_BUILD, strategy)
+            self.assertIsNone(state)
+
+            # Simulate a previous build.
+            with open(imb.getModulePath(ontIRI), 'w') as fout:
+                fout.write('module')
+            imb._writeModuleState(
+                ontIRI, '', fprint, termspecs,
+                ['http://purl.obolibrary.org/obo/OBTO_0001'], []
+            )
+
+            # Test unchanged terms in a different order.
+            strategy, state = imb._getBuildStrategy(
+                ontIRI, '', fprint, list(reversed(termrows))
+            )
+            self.assertEqual(UNCHANGED_BUILD, strategy)
+            self.assertEqual(set(termspecs), state['terms'])
+
+            # New single-entity terms can be added incrementally.
+            newrows = termrows + [
+                (None, ('OBTO:0020', False, me_methods.SINGLE, ()))
+            ]
+            strategy, state = imb._getBuildStrategy(ontIRI, '', fprint, newrows)
+            self.assertEqual(INCREMENTAL_BUILD, strategy)
+
+            # Test changes that require a full build.
+            changed_rows = [
+                # A new locality term.
+                termrows + [
+                    (None, ('OBTO:0020', False, me_methods.LOCALITY, ()))
+                ],
+                # A new term with related entities.
+                termrows + [
+                    (
+                        None, (
+                            'OBTO:0020', False, me_methods.SINGLE,
+                            (rel_axiom_types.ANCESTORS,)
+                        )
+                    )
+                ],
+                # A new excluded term.
+                termrows + [(None, ('OBTO:0020', True, None, ()))],
+                # A removed term.
+                termrows[:1]
+            ]
+            for rows in changed_rows:
+                strategy, state = imb._getBuildStrategy(
+                    ontIRI, '', fprint, rows
+                )
+                self.assertEqual(FULL_BUILD, strategy)
+
+            # A changed source ontology requires a full build.
+            with open(sourcepath, 'w') as fout:
+                fout.write('changed source ontology')
+            strategy, state = imb._getBuildStrategy(
+                ontIRI, '', imb._getSourceFingerprint(sourcepath), termrows
+            )
+            self.assertEqual(FULL_BUILD, strategy)
+
+            # Modules with excluded terms cannot be updated incrementally.
+            imb._writeModuleState(
+                ontIRI, '', fprint, termspecs, [],
+                ['http://purl.obolibrary.org/obo/OBTO_0011']
+            )
+            strategy, state = imb._getBuildStrategy(ontIRI, '', fprint, newrows)
+            self.assertEqual(FULL_BUILD, strategy)
+
+            # Malformed build state files require a full build.
+            statepath = imb.getModuleStatePath(ontIRI, '')
+            for statestr in ('{"source": ""}', '{"terms": [[]]}', '[1]'):
+                with open(statepath, 'w') as fout:
+                    fout.write(statestr)
+                strategy, state = imb._getBuildStrategy(
+                    ontIRI, '', fprint, termrows
+                )
+                self.assertEqual(FULL_BUILD, strategy)
+                self.assertIsNone(state)
+        finally:
+            shutil.rmtree(tmpdir)
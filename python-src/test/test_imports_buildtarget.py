@@ -99,3 +99,37 @@ class TestImportsBuildTarget(unittest.TestCase):
 
         self.assertEqual(expected, self.ibt.getImportsInfo())
 
+    def test_setModuleNameQualifiers(self):
+        # Simulate several import modules built from the same source ontology.
+        rows = []
+        for iristr, tfpath in (
+            ('http://purl.obolibrary.org/obo/ro.owl', 'ro_terms.csv'),
+            ('http://purl.obolibrary.org/obo/bco.owl', 'bco_terms.csv'),
+            ('http://purl.obolibrary.org/obo/bco.owl', 'other/ro_terms.csv'),
+            ('http://purl.obolibrary.org/obo/iao.owl', ''),
+            ('http://purl.obolibrary.org/obo/ro.owl', '')
+        ):
+            tr = TableRow(len(rows) + 1, TableStub())
+            tr['IRI'] = iristr
+            tr['abs_tfilepath'] = tfpath
+            rows.append(tr)
+
+        self.ibt.tablerows = rows
+        self.ibt._setModuleNameQualifiers()
+        self.assertEqual(
+            ['', 'bco_terms', 'ro_terms', '', ''],
+            [row['name_qualifier'] for row in rows]
+        )
+        self.assertEqual(
+            self.td_path + '/bco_ro_terms_ontname_import_module.owl',
+            self.ibt.getImportsInfo()[2].filename
+        )
+
+        # Test modules from the same source ontology that would have the same
+        # name.
+        rows[1]['abs_tfilepath'] = 'other/bco_terms.csv'
+        rows[2]['abs_tfilepath'] = 'bco_terms.csv'
+        with self.assertRaisesRegexp(
+            TableRowError, 'must use terms files with different names'
+        ):
+            self.ibt._setModuleNameQualifiers()
@@ -18,12 +18,17 @@
 from ontopilot.ontology import Ontology
 from ontopilot.inferred_axiom_adder import InferredAxiomAdder
 from ontopilot.inferred_axiom_adder import INFERENCE_TYPES
+from ontopilot.reasoning_cache import ReasoningCache
 from test_ontology import INDIVIDUAL_IRI
 import unittest
+import tempfile
+import shutil
+import threading
 #from testfixtures import LogCapture
 
 # Java imports.
 from java.lang import UnsupportedOperationException
+from java.util import HashSet
 from org.semanticweb.owlapi.model import IRI
 from org.semanticweb.owlapi.model import AxiomType
 
@@ -52,6 +57,24 @@ class NoOpReasoner:
         return stub
 
 
+class FailingAxiomGenerator:
+    """
+    A mock inferred axiom generator that throws an
+    UnsupportedOperationException when it is asked to generate axioms.  It
+    records the thread that called createAxioms(), so that tests can verify
+    where the generator ran.
+    """
+    def __init__(self):
+        self.thread = None
+
+    def getLabel(self):
+        return 'Failing generator'
+
+    def createAxioms(self, df, reasoner):
+        self.thread = threading.current_thread()
+        raise UnsupportedOperationException()
+
+
 class Test_InferredAxiomAdder(unittest.TestCase):
     """
     Tests the InferredAxiomAdder class.
@@ -160,8 +183,10 @@ class Test_InferredAxiomAdder(unittest.TestCase):
         axioms = self.owlont.getObjectPropertyAssertionAxioms(indv_47)
         self.assertEqual(0, axioms.size())
 
-        # Generate the inverse object property assertions.
-        self.iaa._addInversePropAssertions()
+        # Generate the inverse object property assertions.  Use the smallest
+        # possible batch size to test adding the new axioms in batches.
+        self.iaa.INVERSE_BATCH_SIZE = 1
+        self.assertEqual(4, self.iaa._addInversePropAssertions())
 
         # Verify that the correct number of new axioms have been created.
         axioms = self.owlont.getAxioms(AxiomType.OBJECT_PROPERTY_ASSERTION)
@@ -204,6 +229,42 @@ class Test_InferredAxiomAdder(unittest.TestCase):
         self.assertTrue(axiom.getSubject().equals(indv_49))
         self.assertTrue(axiom.getObject().equals(indv_48))
 
+        # All inverse assertions now exist, so running again should not add
+        # any new axioms.
+        self.assertEqual(0, self.iaa._addInversePropAssertions())
+        axioms = self.owlont.getAxioms(AxiomType.OBJECT_PROPERTY_ASSERTION)
+        self.assertEqual(new_axiom_cnt, axioms.size())
+
+    def test_addInversePropAssertionsOriginalOnly(self):
+        """
+        Tests that inverse property assertions are only generated for the
+        property assertions that existed before the call, regardless of the
+        batch size and the order in which the properties are processed.
+        """
+        # Create a chain of inverse properties: OBTO:0005 is the inverse of
+        # OBTO:0006, which is the inverse of OBTO:0007.
+        for prop_id in ('OBTO:0005', 'OBTO:0006', 'OBTO:0007'):
+            self.ont.createNewObjectProperty(prop_id)
+        self.ont.getExistingObjectProperty('OBTO:0005').addInverse('OBTO:0006')
+        self.ont.getExistingObjectProperty('OBTO:0006').addInverse('OBTO:0007')
+
+        ent = self.ont.createNewIndividual('OBTO:0050')
+        self.ont.createNewIndividual('OBTO:0051')
+        ent.addObjectPropertyFact('OBTO:0005', 'OBTO:0051')
+
+        self.iaa.INVERSE_BATCH_SIZE = 1
+        self.assertEqual(1, self.iaa._addInversePropAssertions())
+
+        indv_51 = self.ont.getExistingIndividual('OBTO:0051').getOWLAPIObj()
+        axioms = self.owlont.getObjectPropertyAssertionAxioms(indv_51)
+        self.assertEqual(1, axioms.size())
+        self.assertTrue(axioms.iterator().next().getProperty().equals(
+            self.ont.getExistingObjectProperty('OBTO:0006').getOWLAPIObj()
+        ))
+
+        # The new OBTO:0006 assertion is only used in the next call.
+        self.assertEqual(1, self.iaa._addInversePropAssertions())
+
     def test_loadExcludedTypes(self):
         exp_iris = {
             'http://purl.obolibrary.org/obo/OBTO_0011',
@@ -215,12 +276,188 @@ class Test_InferredAxiomAdder(unittest.TestCase):
         exctypes = self.iaa._getExcludedTypesFromFile(
             'test_data/excluded_types.csv'
         )
-        exctype_iris = set(
-            [classobj.getIRI().toString() for classobj in exctypes]
-        )
+        exctype_iris = set([iri.toString() for iri in exctypes])
 
         self.assertEqual(exp_iris, exctype_iris)
 
+    def test_getSubClasses(self):
+        class10 = self.ont.getExistingClass('OBTO:0010').getOWLAPIObj()
+
+        expected = set(
+            self.iaa.reasoner.getSubClasses(class10, False).getFlattened()
+        )
+        expected.discard(self.ont.df.getOWLNothing())
+        self.assertIn(
+            self.ont.getExistingClass('OBTO:0012').getOWLAPIObj(), expected
+        )
+
+        # Test with both the reasoner and a cached class hierarchy.
+        for superclasses in (None, self.iaa._getClassHierarchy()):
+            self.iaa.superclasses = superclasses
+            self.assertEqual(expected, self.iaa._getSubClasses(class10))
+
+        # Test with a precomputed subclass map.
+        subclass_map = self.iaa._getSubClassMap()
+        self.assertIn(
+            'http://purl.obolibrary.org/obo/OBTO_0012',
+            subclass_map['http://purl.obolibrary.org/obo/OBTO_0010']
+        )
+        self.assertEqual(
+            expected, self.iaa._getSubClasses(class10, subclass_map)
+        )
+
+        self.iaa.superclasses = None
+        self.assertIsNone(self.iaa._getSubClassMap())
+
+    def test_updateExcludedTypes(self):
+        self.iaa.loadExcludedTypes('test_data/excluded_types.csv')
+        expected = self.iaa._getExcludedTypesFromFile(
+            'test_data/excluded_types.csv'
+        )
+
+        self.iaa._updateExcludedTypes(None)
+        self.assertTrue(expected.equals(self.iaa.excluded_iris))
+        excluded_iris = self.iaa.excluded_iris
+
+        # The excluded types are not computed again if only the ABox changes.
+        self.ont.createNewIndividual('OBTO:8002').addType('OBTO:0010')
+        self.iaa._updateExcludedTypes(None)
+        self.assertIs(excluded_iris, self.iaa.excluded_iris)
+
+        # Test excluding subclasses.  The excluded types must be computed
+        # again after the TBox changes.
+        class10 = self.ont.getExistingClass('OBTO:0010').getOWLAPIObj()
+        self.iaa.excluded_specs = [(class10, False, False, True)]
+        self.ont.createNewClass('OBTO:0013').addSuperclass('OBTO:0010')
+
+        self.iaa._updateExcludedTypes(None)
+        self.assertIsNot(excluded_iris, self.iaa.excluded_iris)
+        self.assertEqual(
+            set([
+                owlclass.getIRI() for owlclass in
+                self.iaa._getSubClasses(class10)
+            ]),
+            set(self.iaa.excluded_iris)
+        )
+        self.assertTrue(self.iaa.excluded_iris.contains(
+            IRI.create('http://purl.obolibrary.org/obo/OBTO_0013')
+        ))
+
+        # Once the ontology uses nominals, ABox changes can affect the class
+        # hierarchy, so the excluded types must be computed again.
+        df = self.ont.df
+        nominal_axiom = df.getOWLSubClassOfAxiom(
+            self.ont.getExistingClass('OBTO:0011').getOWLAPIObj(),
+            df.getOWLObjectHasValue(
+                self.ont.getExistingObjectProperty('OBTO:0001').getOWLAPIObj(),
+                self.ont.getExistingIndividual('OBTO:8000').getOWLAPIObj()
+            )
+        )
+        self.ont.addEntityAxiom(nominal_axiom)
+        self.assertTrue(self.iaa.tbox_changes.uses_nominals)
+        self.iaa._updateExcludedTypes(None)
+        excluded_iris = self.iaa.excluded_iris
+
+        self.ont.createNewIndividual('OBTO:8003').addType('OBTO:0010')
+        self.iaa._updateExcludedTypes(None)
+        self.assertIsNot(excluded_iris, self.iaa.excluded_iris)
+
+        # Replacing the excluded types specifications or disposing of the
+        # InferredAxiomAdder removes the change listener from the ontology
+        # manager.
+        tbox_changes = self.iaa.tbox_changes
+        self.iaa.loadExcludedTypes('test_data/excluded_types.csv')
+        self.assertIsNot(tbox_changes, self.iaa.tbox_changes)
+        self.assertTrue(self.iaa.tbox_changes.uses_nominals)
+
+        self.iaa.dispose()
+        self.assertIsNone(self.iaa.tbox_changes)
+
+        count = tbox_changes.count
+        self.ont.createNewClass('OBTO:0014').addSuperclass('OBTO:0010')
+        self.assertEqual(count, tbox_changes.count)
+
+        # Without change tracking, the excluded types are always computed
+        # again.
+        self.iaa._updateExcludedTypes(None)
+        excluded_iris = self.iaa.excluded_iris
+        self.iaa._updateExcludedTypes(None)
+        self.assertIsNot(excluded_iris, self.iaa.excluded_iris)
+
+    def test_getRedundantSubclassOfAxioms(self):
+        testclass = self.ont.getExistingClass('OBTO:0012')
+        owlclass = testclass.getOWLAPIObj()
+
+        # OBTO_0012 is asserted to be a subclass of OBITO_0001, but it is
+        # inferred to be a subclass of OBTO_0010, which is a subclass of
+        # OBITO_0001.  Make the inferred axiom explicit.
+        testclass.addSuperclass('OBTO:0010')
+        self.assertEqual(
+            2, self.owlont.getSubClassAxiomsForSubClass(owlclass).size()
+        )
+
+        # The taxonomy built from the inferred "subclass of" axioms should
+        # match the class hierarchy from the reasoner.
+        generators = self.iaa._getGeneratorsList(['subclasses'])
+        axioms = self.iaa._generateInferredAxioms(generators, ['subclasses'])
+        taxonomy = self.iaa._getTaxonomyFromAxioms(axioms)
+        hierarchy = self.iaa._getClassHierarchy()
+        for iristr in hierarchy:
+            if len(hierarchy[iristr]) > 0:
+                self.assertEqual(hierarchy[iristr], taxonomy[iristr])
+
+        # Test finding the redundant axioms with both the taxonomy and the
+        # reasoner.
+        for superclasses in (taxonomy, None):
+            self.iaa.superclasses = superclasses
+            redundants = self.iaa._getRedundantSubclassOfAxioms(self.owlont)
+
+            self.assertEqual(1, len(redundants))
+            axiom = list(redundants)[0]
+            self.assertTrue(axiom.getSubClass().equals(owlclass))
+            self.assertEqual(
+                'http://purl.obolibrary.org/obo/OBITO_0001',
+                axiom.getSuperClass().asOWLClass().getIRI().toString()
+            )
+
+    def test_getFinalInferredAxioms(self):
+        df = self.ont.df
+        oldaxioms = self.owlont.getAxioms()
+
+        class10 = self.ont.getExistingClass('OBTO:0010').getOWLAPIObj()
+        class11 = self.ont.getExistingClass('OBTO:0011').getOWLAPIObj()
+        class12 = self.ont.getExistingClass('OBTO:0012').getOWLAPIObj()
+        indv = self.ont.getExistingIndividual('OBTO:8001').getOWLAPIObj()
+
+        explicit = oldaxioms.iterator().next()
+        trivial = df.getOWLSubClassOfAxiom(class12, df.getOWLThing())
+        excluded = df.getOWLClassAssertionAxiom(class11, indv)
+        kept_sc = df.getOWLSubClassOfAxiom(class12, class10)
+        kept_ca = df.getOWLClassAssertionAxiom(class12, indv)
+        axioms = HashSet([explicit, trivial, excluded, kept_sc, kept_ca])
+
+        self.iaa.excluded_iris = HashSet([class11.getIRI()])
+
+        # Test without annotations.
+        final_axioms = self.iaa._getFinalInferredAxioms(axioms, oldaxioms, False)
+        self.assertEqual({kept_sc, kept_ca}, set(final_axioms))
+
+        # Test with annotations.  The annotated axioms should be equal to the
+        # original axioms if annotations are ignored.
+        final_axioms = self.iaa._getFinalInferredAxioms(axioms, oldaxioms, True)
+        self.assertEqual(2, final_axioms.size())
+        self.assertEqual(
+            {kept_sc, kept_ca},
+            {axiom.getAxiomWithoutAnnotations() for axiom in final_axioms}
+        )
+        annotprop = df.getOWLAnnotationProperty(self.iaa.INFERRED_ANNOT_IRI)
+        for axiom in final_axioms:
+            annots = axiom.getAnnotations()
+            self.assertEqual(1, annots.size())
+            annot = annots.iterator().next()
+            self.assertTrue(annot.getProperty().equals(annotprop))
+            self.assertEqual('true', annot.getValue().getLiteral())
+
     def test_excludeTypes(self):
         """
         Tests the functionality of specifying classes to exclude from inferred
@@ -361,6 +598,116 @@ class Test_InferredAxiomAdder(unittest.TestCase):
             axioms.iterator().next().containsEntityInSignature(disjointclass)
         )
 
+    def test_reasoningCache(self):
+        """
+        Tests that cached reasoning results are used, without running the
+        reasoner, if only the annotations of an ontology have changed, and
+        that the results are the same as with the reasoner.
+        """
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache = ReasoningCache(tmpdir)
+            inftypes = ['subclasses', 'types', 'disjoint classes']
+
+            self.iaa.setReasoningCache(cache)
+            self.iaa.loadExcludedTypes('test_data/excluded_types.csv')
+            self.iaa.addInferredAxioms(inftypes)
+            expected = set([
+                axiom.toString() for axiom in self.owlont.getAxioms()
+                if axiom.isLogicalAxiom()
+            ])
+
+            # Load the ontology again and modify an annotation.
+            ont2 = Ontology('test_data/ontology.owl')
+            ont2.getExistingClass('OBTO:0010').addLabel('a new label')
+            iaa2 = InferredAxiomAdder(ont2, 'hermit')
+            iaa2.setReasoningCache(cache)
+            iaa2.loadExcludedTypes('test_data/excluded_types.csv')
+
+            # Replace the reasoner with one that fails for every method call
+            # to verify that the reasoner is not used.
+            noop = NoOpReasoner()
+            ont2.getReasonerManager().reasoners['hermit'] = noop
+            iaa2.reasoner = noop
+
+            iaa2.addInferredAxioms(inftypes)
+            self.assertEqual(0, noop.total_calls)
+
+            self.assertEqual(
+                expected, set([
+                    axiom.toString()
+                    for axiom in ont2.getOWLOntology().getAxioms()
+                    if axiom.isLogicalAxiom()
+                ])
+            )
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_generateInferredAxioms(self):
+        """
+        Tests that generating inferred axioms concurrently gives the same
+        results as generating them sequentially.
+        """
+        inftypes = [
+            'subclasses', 'equivalent classes', 'types', 'disjoint classes',
+            'subobject properties', 'property values'
+        ]
+        generators = self.iaa._getGeneratorsList(inftypes)
+
+        expected = self.iaa._generateInferredAxioms(generators, inftypes)
+        self.assertFalse(expected.isEmpty())
+
+        self.iaa.setInferenceThreads(4)
+        axioms = self.iaa._generateInferredAxioms(generators, inftypes)
+        self.assertTrue(expected.equals(axioms))
+
+        # Test that errors in worker threads are reported by the main thread.
+        failing = FailingAxiomGenerator()
+        with self.assertRaises(UnsupportedOperationException):
+            self.iaa._generateInferredAxioms(
+                generators + [failing], inftypes
+            )
+        self.assertIsNotNone(failing.thread)
+        self.assertIsNot(threading.current_thread(), failing.thread)
+
+    def test_bufferingReasoner(self):
+        """
+        Tests that using a buffering reasoner gives the same results as using
+        a non-buffering reasoner.
+        """
+        inftypes = ['subclasses', 'types', 'disjoint classes']
+
+        ont2 = Ontology('test_data/ontology.owl')
+        iaa2 = InferredAxiomAdder(ont2, 'hermit', buffering=True)
+        # The buffering mode of the ontology's ReasonerManager is not changed.
+        rman2 = ont2.getReasonerManager()
+        self.assertFalse(rman2.isBufferingMode())
+        self.assertIs(iaa2.reasoner, rman2.getReasoner('hermit', True))
+
+        # Changes that are made after the buffering reasoner is created must
+        # also be processed.
+        for testont in (self.ont, ont2):
+            testont.createNewClass('OBTO:0190').addSuperclass('OBTO:0012')
+        self.assertFalse(iaa2.reasoner.getPendingChanges().isEmpty())
+
+        self.iaa.addInferredAxioms(inftypes, add_inverses=True)
+        expected = set([
+            axiom.toString() for axiom in self.owlont.getAxioms()
+        ])
+
+        iaa2.addInferredAxioms(inftypes, add_inverses=True)
+        self.assertEqual(
+            expected, set([
+                axiom.toString() for axiom in ont2.getOWLOntology().getAxioms()
+            ])
+        )
+
+        # The buffering reasoner should be synchronized with the ontology, and
+        # other users of the ontology still get non-buffering reasoners.
+        self.assertTrue(iaa2.reasoner.getPendingChanges().isEmpty())
+        self.assertFalse(rman2.isBufferingMode())
+        self.assertIsNot(iaa2.reasoner, rman2.getReasoner('hermit'))
+
     def test_inconsistent(self):
         """
         Tests that attempts to add inferred axioms to an inconsistent ontology
@@ -0,0 +1,76 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.memory_budget import MemoryBudget
+import threading
+import unittest
+
+# Java imports.
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """
+    Tests the MemoryBudget class.
+    """
+    def setUp(self):
+        self.budget = MemoryBudget(100)
+
+    def test_reserve(self):
+        self.assertEqual(100, self.budget.getBudget())
+        self.assertEqual(0, self.budget.getReserved())
+
+        # A reservation larger than the budget should be granted if nothing
+        # else is reserved.
+        self.assertTrue(self.budget.canReserve(200))
+        self.budget.reserve(200)
+        self.assertEqual(200, self.budget.getReserved())
+        self.assertFalse(self.budget.canReserve(1))
+        self.budget.release(200)
+        self.assertEqual(0, self.budget.getReserved())
+
+        # Test reservations that fit within the budget.
+        self.budget.reserve(60)
+        self.assertTrue(self.budget.canReserve(40))
+        self.assertFalse(self.budget.canReserve(41))
+        self.budget.reserve(40)
+        self.assertEqual(100, self.budget.getReserved())
+        self.budget.release(40)
+        self.budget.release(60)
+        self.assertEqual(0, self.budget.getReserved())
+
+    def test_reserveBlocking(self):
+        # Verify that a reservation that does not fit blocks until enough
+        # memory is released.
+        self.budget.reserve(80)
+
+        reserved = threading.Event()
+        def reserveMem():
+            self.budget.reserve(50)
+            reserved.set()
+
+        thread = threading.Thread(target=reserveMem)
+        thread.start()
+
+        reserved.wait(0.2)
+        self.assertFalse(reserved.is_set())
+        self.assertEqual(80, self.budget.getReserved())
+
+        self.budget.release(80)
+        thread.join(5)
+        self.assertTrue(reserved.is_set())
+        self.assertEqual(50, self.budget.getReserved())
+
@@ -17,6 +17,7 @@
 # Python imports.
 from ontopilot.ontology import Ontology
 from ontopilot.module_extractor import ModuleExtractor
+from ontopilot.module_extractor import LocalityModuleExtractor
 from ontopilot.module_extractor import methods as me_methods, rel_axiom_types
 import unittest
 
@@ -27,6 +28,34 @@ from org.semanticweb.owlapi.model import OWLFunctionalDataPropertyAxiom
 from org.semanticweb.owlapi.model import OWLTransitiveObjectPropertyAxiom
 
 
+class Test_ExtractMethods(unittest.TestCase):
+    """
+    Tests the _ExtractMethods class.
+    """
+    def setUp(self):
+        pass
+
+    def test_getMethodFromStr(self):
+        self.assertEqual(me_methods.SINGLE, me_methods.getMethodFromStr('single'))
+        self.assertEqual(
+            me_methods.LOCALITY, me_methods.getMethodFromStr('Locality')
+        )
+        self.assertEqual(
+            me_methods.LOCALITY, me_methods.getMethodFromStr('locality-star')
+        )
+        self.assertEqual(
+            me_methods.LOCALITY_BOT, me_methods.getMethodFromStr('LOCALITY-BOT')
+        )
+        self.assertEqual(
+            me_methods.LOCALITY_TOP, me_methods.getMethodFromStr('locality-top')
+        )
+
+        with self.assertRaisesRegexp(
+            RuntimeError, 'Invalid module extraction method'
+        ):
+            me_methods.getMethodFromStr('locality-middle')
+
+
 class Test_RelatedAxiomTypes(unittest.TestCase):
     """
     Tests the _RelatedAxiomTypes class.
@@ -580,6 +609,56 @@ class Test_ModuleExtractor(unittest.TestCase):
         )
         self.assertEqual(6, len(axiomset))
 
+    def test_relationshipIndex(self):
+        """
+        Verifies that searches using a RelationshipIndex return exactly the
+        same results as the non-indexed searches.
+        """
+        # Add some extra relationships so that every kind of relationship is
+        # represented in the test ontology.
+        ent = self.ont.getExistingClass('OBTO:0010')
+        self.ont.createNewClass('OBTO:0013')
+        ent.addEquivalentTo('OBTO:0013')
+        self.ont.createNewClass('OBTO:9999')
+        self.ont.getExistingClass('OBITO:0001').addSuperclass('OBTO:9999')
+
+        all_rel_types = set(rel_axiom_types.strings.values())
+
+        indexed_me = ModuleExtractor(self.ont)
+        rel_index = indexed_me.useRelationshipIndex()
+        self.assertFalse(rel_index.isBuilt())
+
+        entities = set()
+        entities.update(self.owlont.getClassesInSignature(True))
+        entities.update(self.owlont.getObjectPropertiesInSignature(True))
+        entities.update(self.owlont.getDataPropertiesInSignature(True))
+        entities.update(self.owlont.getAnnotationPropertiesInSignature(False))
+        entities.update(self.owlont.getIndividualsInSignature(True))
+
+        for entity in entities:
+            for rel_type in all_rel_types:
+                self.assertEqual(
+                    self.me.getDirectlyRelatedComponents(entity, {rel_type}),
+                    indexed_me.getDirectlyRelatedComponents(entity, {rel_type})
+                )
+
+            self.assertEqual(
+                self.me.getRelatedComponents(entity, all_rel_types),
+                indexed_me.getRelatedComponents(entity, all_rel_types)
+            )
+
+        self.assertTrue(rel_index.isBuilt())
+
+        # Verify that the index can be shared by another extractor.
+        owlent = self.ont.getExistingClass('OBITO:0001').getOWLAPIObj()
+        entset, axiomset = ModuleExtractor(
+            self.ont, rel_index
+        ).getRelatedComponents(owlent, {rel_axiom_types.DESCENDANTS})
+        self._compareEntitySets(
+            ['OBITO:0001', 'OBTO:0010', 'OBTO:0011', 'OBTO:0012'], entset
+        )
+        self.assertEqual(3, len(axiomset))
+
     def test_extractSingleTerms(self):
         """
         Tests building an import module using only the single-term extraction
@@ -761,6 +840,56 @@ class Test_ModuleExtractor(unittest.TestCase):
         axioms = owlont.getSubClassAxiomsForSuperClass(ent.getOWLAPIObj())
         self.assertTrue(axioms.isEmpty())
 
+    def test_localityModuleExtractor(self):
+        lme = LocalityModuleExtractor(self.ont)
+        self.assertEqual(0, lme.getMemoSize())
+
+        sig1 = {
+            self.ont.getExistingClass('OBTO:0010').getOWLAPIObj(),
+            self.ont.getExistingObjectProperty('OBTO:0001').getOWLAPIObj()
+        }
+        sig2 = {self.ont.getExistingClass('OBTO:0011').getOWLAPIObj()}
+
+        axioms1 = lme.extract(sig1)
+        self.assertTrue(axioms1.size() > 0)
+        self.assertEqual(1, lme.getMemoSize())
+
+        # Verify that an identical signature reuses the memoized module.
+        self.assertIs(axioms1, lme.extract(set(sig1)))
+        self.assertEqual(1, lme.getMemoSize())
+
+        # Test extracting several signatures at once.
+        results = lme.extractAll([sig1, sig2, sig1])
+        self.assertEqual(3, len(results))
+        self.assertIs(axioms1, results[0])
+        self.assertIs(axioms1, results[2])
+        self.assertEqual(2, lme.getMemoSize())
+
+        # The results should match those from a new extractor.
+        self.assertEqual(
+            set(results[1]), set(LocalityModuleExtractor(self.ont).extract(sig2))
+        )
+
+        lme.clearMemo()
+        self.assertEqual(0, lme.getMemoSize())
+
+        # Verify that ModuleExtractor instances can share the extractor.
+        me1 = ModuleExtractor(self.ont, locality_extractor=lme)
+        me1.addEntity('OBTO:0010', me_methods.LOCALITY)
+        me1.addEntity('OBTO:0001', me_methods.LOCALITY)
+        module1 = me1.extractModule('http://test.mod/id1')
+
+        me2 = ModuleExtractor(self.ont, locality_extractor=lme)
+        me2.addEntity('OBTO:0001', me_methods.LOCALITY)
+        me2.addEntity('OBTO:0010', me_methods.LOCALITY)
+        module2 = me2.extractModule('http://test.mod/id2')
+
+        self.assertEqual(1, lme.getMemoSize())
+        self.assertEqual(
+            module1.getOWLOntology().getAxiomCount(),
+            module2.getOWLOntology().getAxiomCount()
+        )
+
     def test_extractLocality(self):
         """
         Tests building an import module using only the syntactic locality
@@ -777,3 +906,26 @@ class Test_ModuleExtractor(unittest.TestCase):
 
         #module.saveOntology('test_mod.owl')
 
+    def test_extractLocalityBotTop(self):
+        """
+        Tests building import modules with the BOT and TOP syntactic locality
+        extraction methods.  A BOT module for a class should include the
+        class's superclasses, and a TOP module should include its subclasses.
+        """
+        self.ont.createNewClass('OBTO:0013').addSuperclass('OBTO:0010')
+
+        self.me.addEntity('OBTO:0010', me_methods.LOCALITY_BOT)
+        bot_module = self.me.extractModule('http://test.mod/bot')
+
+        self.assertIsNotNone(bot_module.getExistingClass('OBTO:0010'))
+        self.assertIsNotNone(bot_module.getExistingClass('OBITO:0001'))
+        self.assertIsNone(bot_module.getExistingClass('OBTO:0013'))
+
+        self.me.clearSignatures()
+        self.me.addEntity('OBTO:0010', me_methods.LOCALITY_TOP)
+        top_module = self.me.extractModule('http://test.mod/top')
+
+        self.assertIsNotNone(top_module.getExistingClass('OBTO:0010'))
+        self.assertIsNotNone(top_module.getExistingClass('OBTO:0012'))
+        self.assertIsNotNone(top_module.getExistingClass('OBTO:0013'))
+
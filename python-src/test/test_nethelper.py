@@ -17,18 +17,162 @@
 # Python imports.
 import ontopilot.nethelper as nethelper
 from ontopilot.nethelper import NotFoundError, ConnectionFailError
+from ontopilot.nethelper import RedirectCache
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+import threading
+import tempfile
+import shutil
+import os.path
 import unittest
 #from testfixtures import LogCapture
 
 # Java imports.
 
 
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles HEAD requests for a local stand-in HTTP server that supports
+    persistent connections.  Each handler instance serves one connection, so
+    the server counts the handler instances to track the number of
+    connections.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.conn_cnt += 1
+
+    def log_message(self, format, *args):
+        # Don't clutter the test output.
+        pass
+
+    def do_HEAD(self):
+        with self.server.lock:
+            self.server.request_cnt += 1
+
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/final')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    A stand-in HTTP server that handles each connection on its own thread, so
+    that idle persistent connections do not block other connections.
+    """
+    daemon_threads = True
+
+
 class Test_nethelper(unittest.TestCase):
     """
     Tests the methods in the nethelper module.
     """
     def setUp(self):
-        pass
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), KeepAliveRequestHandler
+        )
+        self.server.conn_cnt = 0
+        self.server.request_cnt = 0
+        self.server.lock = threading.Lock()
+
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        self.baseurl = 'http://127.0.0.1:{0}'.format(
+            self.server.server_address[1]
+        )
+
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Close any pooled keep-alive connections so the server can stop.
+        nethelper._pool.closeAll()
+        self.server.shutdown()
+        self.server.server_close()
+
+        nethelper.setRedirectCache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_connectionPool(self):
+        # Successive requests to the same host should share a connection.
+        for cnt in range(3):
+            result = nethelper.httpHEAD(self.baseurl + '/ont.owl')
+            self.assertEqual(200, result.status)
+
+        self.assertEqual(3, self.server.request_cnt)
+        self.assertEqual(1, self.server.conn_cnt)
+
+    def test_RedirectCache(self):
+        cachefile = os.path.join(self.tmpdir, 'cache.json')
+
+        cache = RedirectCache(cachefile, 3600)
+        self.assertIsNone(cache.lookup('http://a.iri/ont.owl'))
+        cache.store('http://a.iri/ont.owl', 'http://b.iri/ont.owl')
+        cache.store('http://c.iri/ont.owl', '')
+        self.assertEqual(
+            'http://b.iri/ont.owl', cache.lookup('http://a.iri/ont.owl')
+        )
+        self.assertEqual('', cache.lookup('http://c.iri/ont.owl'))
+
+        # Verify that the results are persisted.
+        cache.save()
+        cache = RedirectCache(cachefile, 3600)
+        self.assertEqual(
+            'http://b.iri/ont.owl', cache.lookup('http://a.iri/ont.owl')
+        )
+        self.assertEqual('', cache.lookup('http://c.iri/ont.owl'))
+
+        # Verify that expired results are not used.
+        cache = RedirectCache(cachefile, 0)
+        self.assertIsNone(cache.lookup('http://a.iri/ont.owl'))
+
+        # Verify that an invalid cache file is ignored.
+        with open(cachefile, 'w') as fout:
+            fout.write('invalid')
+        cache = RedirectCache(cachefile, 3600)
+        self.assertIsNone(cache.lookup('http://a.iri/ont.owl'))
+
+    def test_redirectCaching(self):
+        cachefile = os.path.join(self.tmpdir, 'cache.json')
+        nethelper.setRedirectCache(cachefile, 3600)
+
+        # Test prefetching.
+        nethelper.prefetchRedirects(
+            [self.baseurl + '/redirect', self.baseurl + '/ont.owl'], 4
+        )
+        self.assertEqual(3, self.server.request_cnt)
+
+        # The cached results should not require any new requests.
+        self.assertEqual(
+            self.baseurl + '/final',
+            nethelper.checkForRedirect(self.baseurl + '/redirect')
+        )
+        self.assertEqual(
+            '', nethelper.checkForRedirect(self.baseurl + '/ont.owl')
+        )
+        self.assertEqual(3, self.server.request_cnt)
+
+        # The results should also be available to later builds.
+        nethelper.setRedirectCache(cachefile, 3600)
+        self.assertEqual(
+            self.baseurl + '/final',
+            nethelper.checkForRedirect(self.baseurl + '/redirect')
+        )
+        self.assertEqual(3, self.server.request_cnt)
+
+        # Failed checks should not be cached.
+        nethelper.prefetchRedirects(['http://127.0.0.1:9/ont.owl'], 1)
+        with self.assertRaisesRegexp(
+            ConnectionFailError, 'TCP connection error'
+        ):
+            nethelper.checkForRedirect('http://127.0.0.1:9/ont.owl')
 
     def test_httpHEAD(self):
         # Check a valid HTTP URI.
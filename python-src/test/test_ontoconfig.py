@@ -457,6 +457,72 @@ class TestOntoConfig(unittest.TestCase):
         self.oc.set('Imports', 'import_mod_suffix', suffix)
         self.assertEqual(suffix, self.oc.getImportModSuffix())
 
+    def test_getImportsBuildThreads(self):
+        # Check the default value, which should be at least 1.
+        self.assertGreaterEqual(self.oc.getImportsBuildThreads(), 1)
+
+        # Check an explicitly provided value.
+        self.oc.set('Imports', 'build_threads', '3')
+        self.assertEqual(3, self.oc.getImportsBuildThreads())
+
+        # Verify that invalid values are properly handled.
+        for badval in ('-1', 'invalid', '2.5'):
+            self.oc.set('Imports', 'build_threads', badval)
+            with self.assertRaisesRegexp(
+                ConfigError, 'Invalid value for the "build_threads" setting'
+            ):
+                self.oc.getImportsBuildThreads()
+
+    def test_getImportsMaxMemory(self):
+        # Check the default value.
+        self.assertEqual(0, self.oc.getImportsMaxMemory())
+
+        # Check an explicitly provided value.
+        self.oc.set('Imports', 'max_build_memory', '2048')
+        self.assertEqual(2048, self.oc.getImportsMaxMemory())
+
+        # Verify that invalid values are properly handled.
+        self.oc.set('Imports', 'max_build_memory', '2 GB')
+        with self.assertRaisesRegexp(
+            ConfigError, 'Invalid value for the "max_build_memory" setting'
+        ):
+            self.oc.getImportsMaxMemory()
+
+    def test_getRedirectCacheTTL(self):
+        # Check the default value.
+        self.assertEqual(24 * 3600, self.oc.getRedirectCacheTTL())
+
+        # Check explicitly provided values.
+        self.oc.set('Imports', 'redirect_cache_ttl', '2')
+        self.assertEqual(7200, self.oc.getRedirectCacheTTL())
+        self.oc.set('Imports', 'redirect_cache_ttl', '0')
+        self.assertEqual(0, self.oc.getRedirectCacheTTL())
+
+        # Verify that invalid values are properly handled.
+        self.oc.set('Imports', 'redirect_cache_ttl', '-1')
+        with self.assertRaisesRegexp(
+            ConfigError, 'Invalid value for the "redirect_cache_ttl" setting'
+        ):
+            self.oc.getRedirectCacheTTL()
+
+    def test_getIRICatalogFile(self):
+        # Check the default value.
+        self.assertEqual('', self.oc.getIRICatalogFile())
+
+        # Check an explicitly provided value.
+        self.oc.set('Imports', 'catalog_file', 'catalog/catalog-v001.xml')
+        self.assertEqual(
+            os.path.join(self.td_path, 'catalog/catalog-v001.xml'),
+            self.oc.getIRICatalogFile()
+        )
+
+        # Verify that a missing catalog file is properly handled.
+        self.oc.set('Imports', 'catalog_file', 'catalog/missing.xml')
+        with self.assertRaisesRegexp(
+            ConfigError, 'The IRI catalog file .* could not be found'
+        ):
+            self.oc.getIRICatalogFile()
+
     def test_getReasonerStr(self):
         # Check the default value.
         self.assertEqual('HermiT', self.oc.getReasonerStr())
@@ -469,6 +535,10 @@ class TestOntoConfig(unittest.TestCase):
         self.oc.set('Reasoning', 'reasoner', 'hermit')
         self.assertEqual('hermit', self.oc.getReasonerStr())
 
+        # Test automatic reasoner selection.
+        self.oc.set('Reasoning', 'reasoner', 'Auto')
+        self.assertEqual('Auto', self.oc.getReasonerStr())
+
         # Verify that invalid strings are properly handled.
         self.oc.set('Reasoning', 'reasoner', 'invalid')
         with self.assertRaisesRegexp(
@@ -530,6 +600,83 @@ class TestOntoConfig(unittest.TestCase):
         self.oc.set('Reasoning', 'preprocess_inverses', 'true')
         self.assertTrue(self.oc.getPreprocessInverses())
 
+    def test_getInferenceThreads(self):
+        # Check the default value.
+        self.assertEqual(1, self.oc.getInferenceThreads())
+
+        # Check explicitly provided values.
+        self.oc.set('Reasoning', 'inference_threads', '3')
+        self.assertEqual(3, self.oc.getInferenceThreads())
+        self.oc.set('Reasoning', 'inference_threads', '0')
+        self.assertGreaterEqual(self.oc.getInferenceThreads(), 1)
+
+        # Verify that invalid values are properly handled.
+        self.oc.set('Reasoning', 'inference_threads', 'many')
+        with self.assertRaisesRegexp(
+            ConfigError, 'Invalid value for the "inference_threads" setting'
+        ):
+            self.oc.getInferenceThreads()
+
+    def test_getBufferingReasoner(self):
+        self.assertFalse(self.oc.getBufferingReasoner())
+
+        self.oc.set('Reasoning', 'buffering_reasoner', 'true')
+        self.assertTrue(self.oc.getBufferingReasoner())
+
+        self.oc.set('Reasoning', 'buffering_reasoner', 'false')
+        self.assertFalse(self.oc.getBufferingReasoner())
+
+    def test_getCacheReasoning(self):
+        self.assertTrue(self.oc.getCacheReasoning())
+
+        self.oc.set('Reasoning', 'cache_reasoning', 'false')
+        self.assertFalse(self.oc.getCacheReasoning())
+
+        self.oc.set('Reasoning', 'cache_reasoning', 'true')
+        self.assertTrue(self.oc.getCacheReasoning())
+
+    def test_getReasonerLimits(self):
+        # Check the default values.
+        self.assertEqual(0, self.oc.getReasonerTimeout())
+        self.assertEqual(0, self.oc.getReasonerMaxMemory())
+
+        self.oc.set('Reasoning', 'reasoner_timeout', '600')
+        self.assertEqual(600, self.oc.getReasonerTimeout())
+        self.oc.set('Reasoning', 'reasoner_max_memory', '4096')
+        self.assertEqual(4096, self.oc.getReasonerMaxMemory())
+
+        # Test invalid values.
+        self.oc.set('Reasoning', 'reasoner_timeout', '-1')
+        with self.assertRaisesRegexp(ConfigError, 'reasoner_timeout'):
+            self.oc.getReasonerTimeout()
+        self.oc.set('Reasoning', 'reasoner_max_memory', 'lots')
+        with self.assertRaisesRegexp(ConfigError, 'reasoner_max_memory'):
+            self.oc.getReasonerMaxMemory()
+
+    def test_getPartitionABox(self):
+        self.assertFalse(self.oc.getPartitionABox())
+
+        self.oc.set('Reasoning', 'partition_abox', 'True')
+        self.assertTrue(self.oc.getPartitionABox())
+
+    def test_getABoxPartitionSize(self):
+        self.assertEqual(10000, self.oc.getABoxPartitionSize())
+
+        self.oc.set('Reasoning', 'abox_partition_size', '0')
+        self.assertEqual(10000, self.oc.getABoxPartitionSize())
+
+        self.oc.set('Reasoning', 'abox_partition_size', '500')
+        self.assertEqual(500, self.oc.getABoxPartitionSize())
+
+    def test_getTieredEntailmentCheck(self):
+        self.assertFalse(self.oc.getTieredEntailmentCheck())
+
+        self.oc.set('Reasoning', 'tiered_entailment_check', 'true')
+        self.assertTrue(self.oc.getTieredEntailmentCheck())
+
+        self.oc.set('Reasoning', 'tiered_entailment_check', 'false')
+        self.assertFalse(self.oc.getTieredEntailmentCheck())
+
     def test_getExcludedTypesFile(self):
         # Test the default case.
         self.assertEqual('', self.oc.getExcludedTypesFile())
@@ -223,6 +223,32 @@ class Test_Ontology(unittest.TestCase):
             self.ont.getExistingIndividual(entIRI)
         )
 
+    def test_addEntityAxioms(self):
+        df = self.ont.df
+        owlclass = df.getOWLClass(IRI.create(NULL_IRI))
+        axioms = [
+            df.getOWLDeclarationAxiom(owlclass),
+            df.getOWLAnnotationAssertionAxiom(
+                df.getRDFSLabel(), owlclass.getIRI(),
+                df.getOWLLiteral('new class')
+            )
+        ]
+
+        self.assertIsNone(self.ont.getExistingClass(NULL_IRI))
+
+        self.ont.addEntityAxioms(axioms)
+
+        for axiom in axioms:
+            self.assertTrue(self.owlont.containsAxiom(axiom))
+
+        # Verify that the new label can be used to find the class.
+        self.assertIsNotNone(self.ont.getExistingClass("'new class'"))
+
+        # Adding an empty collection of axioms should do nothing.
+        axiomcnt = self.owlont.getAxiomCount()
+        self.ont.addEntityAxioms([])
+        self.assertEqual(axiomcnt, self.owlont.getAxiomCount())
+
     def test_removeEntity(self):
         classobj = self.ont.getExistingClass(CLASS_IRI)
         self.assertIsNotNone(classobj)
@@ -263,6 +289,38 @@ class Test_Ontology(unittest.TestCase):
         imports_IRI_strs = [iri.toString() for iri in self.ont.getImports()]
         self.assertEqual(expected, imports_IRI_strs)
 
+    def test_getCopy(self):
+        ontcopy = self.ont.getCopy()
+        copyowlont = ontcopy.getOWLOntology()
+
+        # The copy should share the source ontology's manager, have an
+        # anonymous ID, and have the same axioms and imports.
+        self.assertTrue(
+            ontcopy.getOntologyManager() is self.ont.getOntologyManager()
+        )
+        self.assertTrue(copyowlont.getOntologyID().isAnonymous())
+        self.assertTrue(
+            copyowlont.getAxioms().equals(self.owlont.getAxioms())
+        )
+        self.assertEqual(self.ont.getImports(), ontcopy.getImports())
+        self.assertTrue(
+            copyowlont.getAnnotations().equals(self.owlont.getAnnotations())
+        )
+
+        # Verify that changing the copy does not change the source ontology.
+        ontcopy.createNewClass(NULL_IRI)
+        self.assertIsNotNone(ontcopy.getExistingClass(NULL_IRI))
+        self.assertIsNone(self.ont.getExistingClass(NULL_IRI))
+
+        # Test copying the ontology ID to a copy in a different manager.
+        emptyont = Ontology()
+        ontcopy = self.ont.getCopy(emptyont.getOntologyManager(), True)
+        self.assertTrue(
+            ontcopy.getOWLOntology().getOntologyID().equals(
+                self.owlont.getOntologyID()
+            )
+        )
+
     def test_addImport(self):
         importIRI = IRI.create('file:/local/path/ont.owl')
 
@@ -16,13 +16,20 @@
 
 # Python imports.
 import ontopilot.oom_manager as oom_man
+from ontopilot.oom_manager import CatalogIRIMapper, CatalogError
 import unittest
+import os.path
+import urllib, urlparse
+import time
 #from testfixtures import LogCapture
 
 # Java imports.
 from org.semanticweb.owlapi.apibinding import OWLManager
 from org.semanticweb.owlapi.model import IRI
 from org.semanticweb.owlapi.util import SimpleIRIMapper
+from java.io import File
+from java.lang import System
+from java.lang.ref import WeakReference
 
 
 class Test_OOMManager(unittest.TestCase):
@@ -101,3 +108,134 @@ class Test_OOMManager(unittest.TestCase):
                 ontIRI, IRI.create('http://conflicting.iri')
             )
 
+    def test_releaseOOMs(self):
+        """
+        Verifies that the OOM manager does not keep OOMs, or the ontologies
+        they have loaded, from being garbage collected.
+        """
+        ontfile = File(os.path.abspath('test_data/ontology.owl'))
+
+        refs = []
+        for cnt in range(4):
+            oom = oom_man.getNewOWLOntologyManager()
+            owlont = oom.loadOntologyFromOntologyDocument(ontfile)
+            refs.append((WeakReference(oom), WeakReference(owlont)))
+
+        # Adding a mapping after the OOMs were created should not require
+        # references to them.
+        oom_man.addNewIRIMapping(
+            IRI.create('http://release.test/iri/ont.owl'),
+            IRI.create('http://release.test/doc/ont.owl')
+        )
+        del oom, owlont
+
+        # Garbage collection is only a request to the JVM, so try a few times
+        # before concluding that the objects are still reachable.
+        for cnt in range(20):
+            System.gc()
+            if all(ref.get() is None for pair in refs for ref in pair):
+                break
+            time.sleep(0.1)
+
+        for oomref, ontref in refs:
+            self.assertIsNone(oomref.get())
+            self.assertIsNone(ontref.get())
+
+    def test_CatalogIRIMapper(self):
+        mapper = CatalogIRIMapper()
+
+        mapper.addExactMapping(
+            'http://some.ontology/iri/ont.owl', 'file:///exact/ont.owl'
+        )
+        mapper.addPrefixMapping(
+            'http://some.ontology/', 'file:///mirror/'
+        )
+        mapper.addPrefixMapping(
+            'http://some.ontology/iri/', 'file:///iri_mirror/'
+        )
+        self.assertEqual((1, 2), mapper.getMappingCounts())
+
+        # Define the list of test values.  Each tuple is in the order
+        # (ontology_IRI, expected_document_IRI).
+        testvals = [
+            # Exact mappings take precedence over prefix mappings.
+            ('http://some.ontology/iri/ont.owl', 'file:///exact/ont.owl'),
+            # The longest matching prefix should be used.
+            ('http://some.ontology/iri/ont2.owl', 'file:///iri_mirror/ont2.owl'),
+            ('http://some.ontology/other.owl', 'file:///mirror/other.owl'),
+            ('http://some.ontology/', 'file:///mirror/'),
+            # IRIs that are not mapped.
+            ('http://some.ontolog', None),
+            ('http://other.ontology/iri/ont.owl', None),
+            ('', None)
+        ]
+
+        for testval in testvals:
+            self.assertEqual(testval[1], mapper.lookup(testval[0]))
+
+            docIRI = mapper.getDocumentIRI(IRI.create(testval[0]))
+            if testval[1] is None:
+                self.assertIsNone(docIRI)
+            else:
+                self.assertTrue(docIRI.equals(IRI.create(testval[1])))
+
+        # Replacing a prefix mapping should not change the prefix count.
+        mapper.addPrefixMapping('http://some.ontology/', 'file:///mirror2/')
+        self.assertEqual((1, 2), mapper.getMappingCounts())
+        self.assertEqual(
+            'file:///mirror2/other.owl',
+            mapper.lookup('http://some.ontology/other.owl')
+        )
+
+        with self.assertRaisesRegexp(CatalogError, 'IRI prefix is empty'):
+            mapper.addPrefixMapping('', 'file:///mirror/')
+
+        # Verify that an OOM uses a mapper that is shared with it.
+        oom = OWLManager.createOWLOntologyManager()
+        oom.getIRIMappers().add(mapper)
+        self.assertTrue(
+            oom_man.lookupDocumentIRI(
+                oom, IRI.create('http://some.ontology/other.owl')
+            ).equals(IRI.create('file:///mirror2/other.owl'))
+        )
+
+    def test_loadCatalogFile(self):
+        catalogdir = os.path.abspath('test_data/catalog')
+        baseurl = urlparse.urljoin(
+            'file://localhost', urllib.pathname2url(catalogdir) + '/'
+        )
+
+        mapper = CatalogIRIMapper()
+        mapper.loadCatalogFile(os.path.join(catalogdir, 'catalog-v001.xml'))
+
+        # The catalog files reference each other, but each file should only
+        # be loaded once.
+        self.assertEqual((2, 2), mapper.getMappingCounts())
+
+        # Define the list of test values.  Each tuple is in the order
+        # (ontology_IRI, expected_document_IRI).
+        testvals = [
+            ('http://purl.obolibrary.org/obo/bfo.owl', baseurl + 'bfo.owl'),
+            (
+                'http://purl.obolibrary.org/obo/pato.owl',
+                baseurl + 'obo/pato.owl'
+            ),
+            (
+                'http://purl.obolibrary.org/obo/ro/core.owl',
+                baseurl + 'mirror/ro/core.owl'
+            ),
+            (
+                'http://other.ontology/iri/ont.owl',
+                'http://mirror.site/ont.owl'
+            ),
+            ('http://other.ontology/iri/ont2.owl', None)
+        ]
+
+        for testval in testvals:
+            self.assertEqual(testval[1], mapper.lookup(testval[0]))
+
+        # Test error handling.
+        with self.assertRaisesRegexp(
+            CatalogError, 'Unable to read the IRI catalog file'
+        ):
+            mapper.loadCatalogFile(os.path.join(catalogdir, 'missing.xml'))
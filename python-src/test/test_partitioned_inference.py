@@ -0,0 +1,180 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.ontology import Ontology
+from ontopilot.inferred_axiom_adder import InferredAxiomAdder
+from ontopilot.partitioned_inference import ABoxPartitioner
+from ontopilot.partitioned_inference import PartitionedInferredAxiomAdder
+import unittest
+
+# Java imports.
+from org.semanticweb.owlapi.model import AxiomType
+from org.semanticweb.owlapi.model.parameters import Imports
+
+
+def getTestOntology():
+    """
+    Returns the test ontology with additional individuals.  The ABox of the
+    ontology has three connected components: {OBTO:8000, OBTO:8001},
+    {OBTO:8002, OBTO:8003}, and {OBTO:8004}.
+    """
+    ont = Ontology('test_data/ontology.owl')
+
+    for indv_id in ('OBTO:8002', 'OBTO:8003', 'OBTO:8004'):
+        ont.createNewIndividual(indv_id).addType('OBTO:0012')
+    ont.getExistingIndividual('OBTO:8002').addObjectPropertyFact(
+        'OBTO:0001', 'OBTO:8003'
+    )
+
+    return ont
+
+
+def addNominalClass(ont):
+    """
+    Adds the class OBTO:0190 to an ontology from getTestOntology() and
+    defines it as equivalent to the nominal {OBTO:8004}.  Because OBTO:8004 is
+    an instance of OBTO:0012, the ABox then entails that OBTO:0190 is a
+    subclass of OBTO:0012.
+    """
+    newclass = ont.createNewClass('OBTO:0190').getOWLAPIObj()
+    indv = ont.getExistingIndividual('OBTO:8004').getOWLAPIObj()
+    ont.addEntityAxiom(ont.df.getOWLEquivalentClassesAxiom(
+        newclass, ont.df.getOWLObjectOneOf(indv)
+    ))
+
+
+class Test_ABoxPartitioner(unittest.TestCase):
+    """
+    Tests the ABoxPartitioner class.
+    """
+    def setUp(self):
+        self.ont = getTestOntology()
+        self.partitioner = ABoxPartitioner(self.ont)
+
+    def test_getComponents(self):
+        components = self.partitioner.getComponents()
+
+        indv_sets = []
+        for component in components:
+            indvs = set()
+            for axiom in component:
+                indvs.update([
+                    indv.getIRI().getShortForm()
+                    for indv in axiom.getIndividualsInSignature()
+                ])
+            indv_sets.append(indvs)
+
+        self.assertEqual(3, len(indv_sets))
+        for expected in (
+            {'OBTO_8000', 'OBTO_8001'}, {'OBTO_8002', 'OBTO_8003'},
+            {'OBTO_8004'}
+        ):
+            self.assertIn(expected, indv_sets)
+
+    def test_getTBoxAxioms(self):
+        tbox_axioms = self.partitioner.getTBoxAxioms()
+
+        # The TBox should include all of the class axioms but none of the
+        # axioms about individuals.
+        for axiom in tbox_axioms:
+            self.assertFalse(axiom.isOfType(AxiomType.ABoxAxiomTypes))
+            self.assertEqual(0, axiom.getIndividualsInSignature().size())
+
+        subclass_axioms = self.ont.getOWLOntology().getAxioms(
+            AxiomType.SUBCLASS_OF, Imports.INCLUDED
+        )
+        self.assertTrue(tbox_axioms.containsAll(subclass_axioms))
+
+    def test_getTBoxComponent(self):
+        # Without nominals, no ABox axioms are needed for TBox inferences.
+        self.assertTrue(self.partitioner.getTBoxComponent().isEmpty())
+
+        addNominalClass(self.ont)
+        partitioner = ABoxPartitioner(self.ont)
+        component = partitioner.getTBoxComponent()
+
+        self.assertEqual(1, component.size())
+        self.assertEqual(
+            'OBTO_8004',
+            component.iterator().next().getIndividual().getIRI().getShortForm()
+        )
+
+    def test_getPartitions(self):
+        # With a large partition size, all components are combined.
+        partitions = self.partitioner.getPartitions()
+        self.assertEqual(1, len(partitions))
+        self.assertEqual(7, partitions[0].size())
+
+        # Components are never split.
+        partitions = self.partitioner.getPartitions(1)
+        self.assertEqual(3, len(partitions))
+        self.assertEqual([3, 3, 1], [part.size() for part in partitions])
+
+        partitions = self.partitioner.getPartitions(4)
+        self.assertEqual(2, len(partitions))
+        self.assertEqual([3, 4], [part.size() for part in partitions])
+
+
+class Test_PartitionedInferredAxiomAdder(unittest.TestCase):
+    """
+    Tests the PartitionedInferredAxiomAdder class.
+    """
+    def test_addInferredAxioms(self):
+        """
+        Verifies that the results of partitioned reasoning are the same as the
+        results of reasoning over the whole ontology.
+        """
+        inftypes = ['subclasses', 'types', 'disjoint classes']
+
+        expected_ont = getTestOntology()
+        iaa = InferredAxiomAdder(expected_ont, 'HermiT')
+        iaa.addInferredAxioms(inftypes, annotate=True)
+        expected = expected_ont.getOWLOntology().getAxioms()
+
+        for threadcnt in (1, 4):
+            ont = getTestOntology()
+            piaa = PartitionedInferredAxiomAdder(ont, 'HermiT', threadcnt)
+            piaa.setMaxPartitionSize(1)
+            piaa.addInferredAxioms(inftypes, annotate=True)
+
+            self.assertTrue(expected.equals(ont.getOWLOntology().getAxioms()))
+
+    def test_nominals(self):
+        """
+        Verifies that TBox axioms that are entailed by ABox axioms through
+        nominals are found by partitioned reasoning.
+        """
+        inftypes = ['subclasses', 'types']
+
+        expected_ont = getTestOntology()
+        addNominalClass(expected_ont)
+        iaa = InferredAxiomAdder(expected_ont, 'HermiT')
+        iaa.addInferredAxioms(inftypes)
+        expected = expected_ont.getOWLOntology().getAxioms()
+
+        ont = getTestOntology()
+        addNominalClass(ont)
+        piaa = PartitionedInferredAxiomAdder(ont, 'HermiT')
+        piaa.setMaxPartitionSize(1)
+        piaa.addInferredAxioms(inftypes)
+
+        subclass_axiom = ont.df.getOWLSubClassOfAxiom(
+            ont.getExistingClass('OBTO:0190').getOWLAPIObj(),
+            ont.getExistingClass('OBTO:0012').getOWLAPIObj()
+        )
+        self.assertTrue(expected.contains(subclass_axiom))
+        self.assertTrue(expected.equals(ont.getOWLOntology().getAxioms()))
@@ -16,7 +16,9 @@
 
 # Python imports.
 from ontopilot.ontology import Ontology
-from ontopilot.reasoner_manager import ReasonerManager
+from ontopilot.reasoner_manager import ReasonerManager, ReasonerLimitError
+from ontopilot.reasoner_manager import ReasonerProgressLogger
+from ontopilot.reasoner_manager import getReasonerFactory
 import unittest
 #from testfixtures import LogCapture
 
@@ -25,6 +27,9 @@ from org.semanticweb.elk.owlapi import ElkReasoner
 from org.semanticweb.HermiT import Reasoner as HermitReasoner
 from com.clarkparsia.pellet.owlapiv3 import PelletReasoner
 from uk.ac.manchester.cs.jfact import JFactReasoner
+from java.lang import Long
+from org.semanticweb.owlapi.reasoner import TimeOutException
+from org.semanticweb.owlapi.reasoner import ReasonerInterruptedException
 
 
 class Test_ReasonerManager(unittest.TestCase):
@@ -33,6 +38,7 @@ class Test_ReasonerManager(unittest.TestCase):
     """
     def setUp(self):
         ont = Ontology('test_data/ontology.owl')
+        self.ont = ont
         self.rman = ReasonerManager(ont)
 
     def test_getReasoner(self):
@@ -58,3 +64,172 @@ class Test_ReasonerManager(unittest.TestCase):
         self.assertIsInstance(reasoner, JFactReasoner)
         self.assertIs(reasoner, self.rman.getReasoner('jfact'))
 
+    def test_selectReasoner(self):
+        """
+        Tests automatic reasoner selection based on the OWL 2 profile of an
+        ontology.
+        """
+        # A simple class hierarchy is in OWL 2 EL.
+        ont = Ontology()
+        for class_id in ('OBTO:0100', 'OBTO:0101', 'OBTO:0102'):
+            ont.createNewClass(class_id)
+        ont.getExistingClass('OBTO:0101').addSuperclass('OBTO:0100')
+
+        rman = ReasonerManager(ont)
+        self.assertEqual('elk', rman.selectReasoner())
+        self.assertEqual('elk', rman.resolveReasonerName('Auto'))
+        reasoner = rman.getReasoner('auto')
+        self.assertIsInstance(reasoner, ElkReasoner)
+        self.assertIs(reasoner, rman.getReasoner('ELK'))
+
+        # Explicit reasoner names are not changed.
+        self.assertEqual('hermit', rman.resolveReasonerName(' HermiT'))
+
+        # Unions are not allowed in OWL 2 EL, QL, or RL superclasses.
+        rman.disposeReasoners()
+        ont.getExistingClass('OBTO:0100').addSuperclass(
+            'OBTO:0101 or OBTO:0102'
+        )
+        self.assertEqual('hermit', rman.selectReasoner())
+        self.assertIsInstance(rman.getReasoner('auto'), HermitReasoner)
+
+        # SameIndividual axioms are in OWL 2 EL, but ELK does not support them.
+        ont = Ontology()
+        indv_a = ont.createNewIndividual('OBTO:8100').getOWLAPIObj()
+        indv_b = ont.createNewIndividual('OBTO:8101').getOWLAPIObj()
+        ont.addEntityAxiom(ont.df.getOWLSameIndividualAxiom(indv_a, indv_b))
+
+        rman = ReasonerManager(ont)
+        self.assertEqual('hermit', rman.selectReasoner())
+
+    def test_reasonerLimits(self):
+        # Without limits, reasoners should not time out.
+        self.assertEqual(
+            Long.MAX_VALUE, self.rman.getReasoner('HermiT').getTimeOut()
+        )
+
+        self.rman.disposeReasoners()
+        self.rman.setReasonerLimits(600, 4096)
+        for reasoner_name in ('ELK', 'HermiT'):
+            reasoner = self.rman.getReasoner(reasoner_name)
+            self.assertEqual(600000, reasoner.getTimeOut())
+
+        # Reasoners should still work normally.
+        self.assertTrue(self.rman.getReasoner('HermiT').isConsistent())
+
+        # Test the error messages.
+        hermit = self.rman.getReasoner('HermiT')
+        err = self.rman.getLimitError(TimeOutException(), hermit)
+        self.assertIsInstance(err, ReasonerLimitError)
+        self.assertRegexpMatches(str(err), '600 seconds .* "reasoner_timeout"')
+
+        self.rman._getMonitor(hermit).memory_exceeded = True
+        err = self.rman.getLimitError(ReasonerInterruptedException(), hermit)
+        self.assertRegexpMatches(str(err), '4096 MB .* "reasoner_max_memory"')
+
+        # Memory errors are only reported for the reasoner that exceeded the
+        # limit, and never for timeouts.
+        elk = self.rman.getReasoner('ELK')
+        err = self.rman.getLimitError(ReasonerInterruptedException(), elk)
+        self.assertRegexpMatches(str(err), 'interrupted')
+        err = self.rman.getLimitError(TimeOutException(), hermit)
+        self.assertRegexpMatches(str(err), '600 seconds .* "reasoner_timeout"')
+
+        # Disposing of an unmanaged reasoner releases its progress monitor.
+        monitorcnt = len(self.rman.monitors)
+        config = self.rman.getReasonerConfiguration('HermiT')
+        reasoner = getReasonerFactory('HermiT').createNonBufferingReasoner(
+            self.ont.getOWLOntology(), config
+        )
+        config.getProgressMonitor().setReasoner(reasoner)
+        self.assertEqual(monitorcnt + 1, len(self.rman.monitors))
+
+        self.rman.disposeReasoner(reasoner)
+        self.assertEqual(monitorcnt, len(self.rman.monitors))
+        self.assertIsNone(self.rman._getMonitor(reasoner))
+
+    def test_ReasonerProgressLogger(self):
+        class ReasonerStub:
+            def __init__(self):
+                self.interrupted = False
+
+            def interrupt(self):
+                self.interrupted = True
+
+        # Test that the reasoner is not interrupted without a memory limit.
+        monitor = ReasonerProgressLogger('HermiT')
+        reasoner = ReasonerStub()
+        monitor.setReasoner(reasoner)
+        monitor.reasonerTaskStarted('Classifying...')
+        monitor.reasonerTaskProgressChanged(5, 10)
+        monitor.reasonerTaskBusy()
+        monitor.reasonerTaskProgressChanged(10, 10)
+        monitor.reasonerTaskStopped()
+        self.assertEqual(10, monitor.last_step)
+        self.assertFalse(reasoner.interrupted)
+        self.assertFalse(monitor.memory_exceeded)
+
+        # Use a memory limit that is certain to be exceeded.
+        monitor = ReasonerProgressLogger('HermiT', 1)
+        monitor.setReasoner(reasoner)
+        monitor.reasonerTaskStarted('Classifying...')
+        monitor.reasonerTaskProgressChanged(1, 10)
+        self.assertTrue(reasoner.interrupted)
+        self.assertTrue(monitor.memory_exceeded)
+
+    def test_bufferingMode(self):
+        """
+        Tests that buffering reasoners are managed separately from
+        non-buffering reasoners and are only synchronized with the ontology
+        when they are flushed.
+        """
+        nb_reasoner = self.rman.getReasoner('ELK')
+
+        self.assertFalse(self.rman.isBufferingMode())
+        self.rman.setBufferingMode(True)
+        self.assertTrue(self.rman.isBufferingMode())
+
+        reasoner = self.rman.getReasoner('ELK')
+        self.assertIsInstance(reasoner, ElkReasoner)
+        self.assertIsNot(nb_reasoner, reasoner)
+        self.assertIs(reasoner, self.rman.getReasoner('elk'))
+        self.assertEqual('BUFFERING', reasoner.getBufferingMode().name())
+
+        # An explicit buffering argument overrides the buffering mode.
+        self.assertIs(nb_reasoner, self.rman.getReasoner('ELK', False))
+
+        # Without any pending changes, flushing should not do anything.
+        self.assertEqual(0.0, self.rman.flushReasoners())
+        self.assertEqual(0.0, self.rman.getSyncTime())
+
+        # Make OBTO:0012 a subclass of a new class.
+        newclass = self.ont.createNewClass('OBTO:0099')
+        self.ont.getExistingClass('OBTO:0012').addSuperclass('OBTO:0099')
+        owlclass = self.ont.getExistingClass('OBTO:0012').getOWLAPIObj()
+
+        # The non-buffering reasoner should see the change immediately, but
+        # the buffering reasoner should only see it after a flush.
+        self.assertTrue(
+            nb_reasoner.getSuperClasses(owlclass, True).containsEntity(
+                newclass.getOWLAPIObj()
+            )
+        )
+        self.assertFalse(
+            reasoner.getSuperClasses(owlclass, True).containsEntity(
+                newclass.getOWLAPIObj()
+            )
+        )
+        self.assertFalse(reasoner.getPendingChanges().isEmpty())
+
+        self.assertTrue(self.rman.flushReasoners() >= 0.0)
+        self.assertTrue(reasoner.getPendingChanges().isEmpty())
+        self.assertTrue(
+            reasoner.getSuperClasses(owlclass, True).containsEntity(
+                newclass.getOWLAPIObj()
+            )
+        )
+
+        # Switching back should return the original non-buffering reasoner.
+        self.rman.setBufferingMode(False)
+        self.assertIs(nb_reasoner, self.rman.getReasoner('ELK'))
+        self.assertIs(reasoner, self.rman.getReasoner('ELK', True))
@@ -0,0 +1,182 @@
+# Copyright (C) 2017 Brian J. Stucky
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Python imports.
+from ontopilot.ontology import Ontology
+from ontopilot.reasoning_cache import ReasoningCache
+import ontopilot.reasoning_cache as reasoning_cache
+import unittest
+import os.path
+import tempfile
+import shutil
+
+# Java imports.
+from java.util import HashSet
+from org.semanticweb.owlapi.model import IRI
+
+
+class Test_ReasoningCache(unittest.TestCase):
+    """
+    Tests the ReasoningCache class.
+    """
+    def setUp(self):
+        self.ont = Ontology('test_data/ontology.owl')
+        self.df = self.ont.df
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.cachedir = os.path.join(self.tmpdir, 'reasoning_cache')
+        self.cache = ReasoningCache(self.cachedir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_getLogicalAxiomsHash(self):
+        axhash = self.cache.getLogicalAxiomsHash(self.ont)
+
+        # The hash should be stable.
+        self.assertEqual(axhash, self.cache.getLogicalAxiomsHash(self.ont))
+        self.assertEqual(
+            axhash, self.cache.getLogicalAxiomsHash(
+                Ontology('test_data/ontology.owl')
+            )
+        )
+
+        # Annotation changes should not change the hash.
+        ontclass = self.ont.getExistingClass('OBTO:0010')
+        ontclass.addLabel('a new label')
+        ontclass.addDefinition('A new definition.')
+        self.ont.createNewClass('OBTO:0099')
+        self.assertEqual(axhash, self.cache.getLogicalAxiomsHash(self.ont))
+
+        # Logical changes should change the hash.
+        ontclass.addSuperclass('OBTO:0099')
+        self.assertNotEqual(axhash, self.cache.getLogicalAxiomsHash(self.ont))
+
+    def test_entailmentResults(self):
+        self.assertIsNone(self.cache.getEntailmentResults('hash1', 'HermiT'))
+
+        # Results should be cached even if the cache directory does not exist
+        # yet.
+        owlclass = self.df.getOWLClass(
+            IRI.create('http://purl.obolibrary.org/obo/OBTO_0010')
+        )
+        report = {
+            'is_consistent': True, 'unsatisfiable_classes': [owlclass]
+        }
+        self.cache.storeEntailmentResults('hash1', 'HermiT', report)
+
+        self.assertEqual(
+            {
+                'is_consistent': True,
+                'unsatisfiable_classes': [owlclass.getIRI().toString()]
+            },
+            self.cache.getEntailmentResults('hash1', 'hermit')
+        )
+
+        # Results from other reasoners should not be used.
+        self.assertIsNone(self.cache.getEntailmentResults('hash1', 'ELK'))
+
+        # Storing the class hierarchy should not overwrite other results.
+        superclasses = {'http://a.class/iri': ['http://a.superclass/iri']}
+        self.cache.storeClassHierarchy('hash1', 'HermiT', superclasses)
+        self.assertEqual(
+            superclasses, self.cache.getClassHierarchy('hash1', 'HermiT')
+        )
+        self.assertTrue(
+            self.cache.getEntailmentResults('hash1', 'HermiT')['is_consistent']
+        )
+
+        # Without a valid parent directory, nothing should be cached.
+        badcache = ReasoningCache(
+            os.path.join(self.tmpdir, 'missing', 'reasoning_cache')
+        )
+        badcache.storeEntailmentResults('hash1', 'HermiT', report)
+        self.assertIsNone(badcache.getEntailmentResults('hash1', 'HermiT'))
+
+    def test_inferredAxioms(self):
+        inftypes = ['subclasses', 'types']
+
+        self.assertIsNone(
+            self.cache.getInferredAxioms('hash1', 'HermiT', inftypes)
+        )
+
+        axioms = HashSet()
+        for axiom in self.ont.getOWLOntology().getAxioms():
+            if axiom.isLogicalAxiom():
+                axioms.add(axiom)
+        self.cache.storeInferredAxioms('hash1', 'HermiT', inftypes, axioms)
+
+        # The order of the inference types should not matter.
+        cached = self.cache.getInferredAxioms(
+            'hash1', 'HermiT', ['types', 'subclasses']
+        )
+        self.assertTrue(cached.equals(axioms))
+
+        self.assertIsNone(
+            self.cache.getInferredAxioms('hash1', 'HermiT', ['subclasses'])
+        )
+
+        # Axioms stored for a different variant should not be used.
+        self.assertIsNone(
+            self.cache.getInferredAxioms('hash1', 'HermiT', inftypes, 'excl')
+        )
+        self.cache.storeInferredAxioms(
+            'hash1', 'HermiT', inftypes, HashSet(), 'excl'
+        )
+        cached = self.cache.getInferredAxioms(
+            'hash1', 'HermiT', inftypes, 'excl'
+        )
+        self.assertEqual(0, cached.size())
+        cached = self.cache.getInferredAxioms('hash1', 'HermiT', inftypes)
+        self.assertTrue(cached.equals(axioms))
+
+    def test_excludedTypes(self):
+        iristrs = [
+            'http://purl.obolibrary.org/obo/OBTO_0010',
+            'http://purl.obolibrary.org/obo/OBTO_0011'
+        ]
+
+        self.assertIsNone(self.cache.getExcludedTypes('hash1', 'HermiT', 'k1'))
+
+        self.cache.storeExcludedTypes('hash1', 'HermiT', 'k1', iristrs)
+        self.cache.storeExcludedTypes('hash1', 'HermiT', 'k2', [])
+        self.assertEqual(
+            iristrs, self.cache.getExcludedTypes('hash1', 'HermiT', 'k1')
+        )
+        self.assertEqual(
+            [], self.cache.getExcludedTypes('hash1', 'HermiT', 'k2')
+        )
+        self.assertIsNone(self.cache.getExcludedTypes('hash2', 'HermiT', 'k1'))
+
+    def test_pruneCache(self):
+        report = {'is_consistent': True, 'unsatisfiable_classes': []}
+
+        for cnt in range(reasoning_cache.MAX_CACHED_STATES + 2):
+            self.cache.storeEntailmentResults(
+                'hash{0}'.format(cnt), 'HermiT', report
+            )
+            # Make sure the results files have distinct modification times.
+            respath = os.path.join(self.cachedir, 'hash{0}-hermit.json'.format(cnt))
+            os.utime(respath, (cnt * 100, cnt * 100))
+
+        # Trigger a final pruning.
+        self.cache.storeEntailmentResults('hash99', 'HermiT', report)
+
+        self.assertEqual(
+            reasoning_cache.MAX_CACHED_STATES, len(os.listdir(self.cachedir))
+        )
+        self.assertIsNone(self.cache.getEntailmentResults('hash0', 'HermiT'))
+        self.assertIsNotNone(self.cache.getEntailmentResults('hash99', 'HermiT'))